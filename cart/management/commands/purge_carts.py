@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from cart.purge import BATCH_SIZE, purge_carts
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned anonymous carts"
+    # python manage.py purge_carts  (daily cron, after clearsessions)
+    # Anonymous carts whose session is gone, and empty ones older than a
+    # day, are deleted with their items in batches.
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Carts deleted per batch",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the carts",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_carts(
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        verb = "Would purge" if options["dry_run"] else "Purged"
+        self.stdout.write(self.style.SUCCESS(f"✔ {verb} {purged} carts"))
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-16 11:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    """One line per product without variant, holding every quantity"""
+    CartItem = apps.get_model("cart", "CartItem")
+    duplicates = (
+        CartItem.objects.filter(variant__isnull=True)
+        .values("cart", "product")
+        .annotate(keep=Min("pk"), quantity=Sum("quantity"), rows=Count("pk"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates.iterator():
+        CartItem.objects.filter(pk=row["keep"]).update(
+            quantity=row["quantity"]
+        )
+        CartItem.objects.filter(
+            cart=row["cart"], product=row["product"], variant__isnull=True
+        ).exclude(pk=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cart", "0002_cart_district"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_lines, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("variant__isnull", True)),
+                fields=("cart", "product"),
+                name="cart_item_product_without_variant_uniq",
+            ),
+        ),
+    ]
@@ -1,15 +1,14 @@
 import logging
-import math
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
 
+from cart.summary import CartSummary
 from catalog.models import Product, ProductVariant
 from core.models import BaseModel
 from locations.models import District
-from shipping.models import ShippingRate
 
 User = get_user_model()
 
@@ -55,55 +54,26 @@ class Cart(BaseModel):
         return Decimal(total).quantize(Decimal("0.01"))
 
     @property
-    def cod_charge(self, payment_method="cod"):
+    def summary(self):
         """
-        1% Cash On Delivery charge based on subtotal
+        CartSummary of the cart as it is now, a new one on every use.
+        Pages share one per request: cart.utils.get_cart_summary
         """
-        if payment_method != "cod":
-            return Decimal("0.00")
-
-        chargeable_subtotal = sum(
-            item.total_price for item in self.shipping_charge_items
-        )
-
-        if chargeable_subtotal <= 0:
-            return Decimal("0.00")
+        return CartSummary(self)
 
-        return (Decimal(chargeable_subtotal) * Decimal("0.01")).quantize(
-            Decimal("0.01")
-        )
-
-    def get_cod_charge(self, payment_method="cod"):  # order create
+    @property
+    def cod_charge(self):
         """
         1% Cash On Delivery charge based on subtotal
         """
-        if payment_method != "cod":
-            return Decimal("0.00")
+        return self.summary.cod_charge()
 
-        chargeable_subtotal = sum(
-            item.total_price for item in self.shipping_charge_items
-        )
-
-        if chargeable_subtotal <= 0:
-            return Decimal("0.00")
-
-        return (Decimal(chargeable_subtotal) * Decimal("0.01")).quantize(
-            Decimal("0.01")
-        )
+    def get_cod_charge(self, payment_method="cod"):  # order create
+        return self.summary.cod_charge(payment_method)
 
     def get_shipping_weight(self):
         """Calculate total weight for shipping in KG"""
-        total_weight = Decimal("0.00")
-
-        for item in self.shipping_charge_items:
-            if item.variant:
-                weight = item.variant.weight or item.product.weight or 0
-            else:
-                weight = item.product.weight or 0
-
-            total_weight += weight * item.quantity
-
-        return total_weight
+        return self.summary.shipping_weight
 
     # def get_shipping_charge(self):
     #     """
@@ -138,62 +108,12 @@ class Cart(BaseModel):
 
     @property
     def get_shipping_charge(self):
-        """
-        Shipping logic:
-        - 1st KG = 70৳
-        - Extra KG = 20৳ per KG
-        - Zone based
-        """
-
-        if not self.district:
-            return Decimal("0.00")
-
-        weight = Decimal(self.get_shipping_weight() or 0)
-        logger.info(f"Weight: {weight}")
-
-        # 🚫 No chargeable items
-        if weight <= 0:
-            return Decimal("0.00")
-
-        shipping_zone = self.district.shipping_zone
-        if not shipping_zone:
-            return Decimal("0.00")
-
-        # Base rate (first 1 KG)
-        base_rate = ShippingRate.objects.filter(
-            shipping_zone=shipping_zone,
-            calculation_type="weight",
-            min_weight=Decimal("0.00"),
-            max_weight=Decimal("1.00"),
-        ).first()
-
-        # Extra KG rate (above 1 KG)
-        extra_rate = ShippingRate.objects.filter(
-            shipping_zone=shipping_zone,
-            calculation_type="weight",
-            min_weight=Decimal("1.00"),
-            max_weight__isnull=True,
-        ).first()
-
-        if not base_rate:
-            return Decimal("0.00")
-
-        total = base_rate.rate_per_kg
-        logger.info(f"{'*' * 10} base rate: {total}\n")
-
-        # Extra weight calculation
-        if weight > 1 and extra_rate:
-            extra_weight = Decimal(math.ceil(weight - 1))
-            extra_total = extra_weight * extra_rate.rate_per_kg
-            logger.info(f"{'*' * 10} extra_total: {extra_total}\n")
-            total += extra_total
-
-        return total.quantize(Decimal("0.01"))
+        return self.summary.shipping_charge
 
     @property
     def grand_total(self):
         # + self.cod_charge for Merchant
-        return self.subtotal + self.get_shipping_charge
+        return self.summary.grand_total
 
 
 class CartItem(BaseModel):
@@ -212,6 +132,14 @@ class CartItem(BaseModel):
 
     class Meta:
         unique_together = ["cart", "product", "variant"]
+        constraints = [
+            # unique_together never matches NULL variants
+            models.UniqueConstraint(
+                fields=["cart", "product"],
+                condition=models.Q(variant__isnull=True),
+                name="cart_item_product_without_variant_uniq",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
@@ -0,0 +1,52 @@
+# cart/purge.py
+import logging
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+EMPTY_CART_AGE = timedelta(days=1)  # the visitor may still be shopping
+BATCH_SIZE = 1000  # carts per delete
+
+
+def purgeable_carts(now=None):
+    """
+    Anonymous carts nobody will come back to:
+    - their session expired or is gone, nothing can find them again
+    - empty and untouched for EMPTY_CART_AGE
+    Customer carts are kept, they follow the customer.
+    """
+    now = now or timezone.now()
+    live_session = Session.objects.filter(
+        session_key=OuterRef("session_key"), expire_date__gt=now
+    )
+    has_items = CartItem.objects.filter(cart=OuterRef("pk"))
+    return Cart.objects.filter(customer__isnull=True).filter(
+        ~Exists(live_session)
+        | (~Exists(has_items) & Q(updated_at__lt=now - EMPTY_CART_AGE))
+    )
+
+
+def purge_carts(batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Delete purgeable carts and their items batch by batch in pk order,
+    so each delete stays short. Returns the number of carts.
+    """
+    now = timezone.now()
+    carts = purgeable_carts(now).order_by("pk").values_list("pk", flat=True)
+    last_pk, purged = 0, 0
+    while batch := list(carts.filter(pk__gt=last_pk)[:batch_size]):
+        last_pk = batch[-1]
+        if dry_run:
+            purged += len(batch)
+            continue
+        # checked again, a visitor may have added an item meanwhile
+        _, deleted = purgeable_carts(now).filter(pk__in=batch).delete()
+        purged += deleted.get(Cart._meta.label, 0)
+    logger.info(f"{'*' * 10} purged {purged} carts\n")
+    return purged
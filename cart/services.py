@@ -0,0 +1,70 @@
+# cart/services.py
+"""
+Cart changes as single statements. Quantities move with F() expressions
+inside the database, so two tabs adding the same product both count,
+and no line is read just to be saved back.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+
+
+def add_item(cart, product, variant=None, quantity=1):
+    """
+    Add quantity of a product to the cart: an UPDATE of its line, an
+    INSERT when it has none. True when the line is new.
+    """
+    lines = CartItem.objects.filter(
+        cart=cart, product=product, variant=variant
+    )
+    changes = {
+        "quantity": F("quantity") + quantity,
+        "updated_at": timezone.now(),
+    }
+    if lines.update(**changes):
+        return False
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(
+                cart=cart, product=product, variant=variant, quantity=quantity
+            )
+        return True
+    except IntegrityError:  # inserted by a concurrent request
+        lines.update(**changes)
+        return False
+
+
+def set_quantity(cart, item_id, quantity):
+    """Quantity of a line of the cart, False when it has no such line"""
+    return bool(
+        CartItem.objects.filter(pk=item_id, cart=cart).update(
+            quantity=max(quantity, 1), updated_at=timezone.now()
+        )
+    )
+
+
+def change_quantity(cart, item_id, delta):
+    """Add delta to a line's quantity, never below 1"""
+    return bool(
+        CartItem.objects.filter(pk=item_id, cart=cart).update(
+            quantity=Greatest(F("quantity") + delta, 1),
+            updated_at=timezone.now(),
+        )
+    )
+
+
+def remove_item(cart, item_id):
+    """Delete a line of the cart, False when it has no such line"""
+    deleted, _ = CartItem.objects.filter(pk=item_id, cart=cart).delete()
+    return bool(deleted)
+
+
+def set_district(cart, district):
+    """Deliver the cart to a district"""
+    Cart.objects.filter(pk=cart.pk).update(
+        district=district, updated_at=timezone.now()
+    )
+    cart.district = district
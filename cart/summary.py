@@ -0,0 +1,80 @@
+# cart/summary.py
+from decimal import Decimal
+
+from shipping.engine import FREE, get_shipping_engine
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+class CartSummary:
+    """
+    Everything the cart pages show about a cart, worked out once: one
+    query for the items with their products and variants, the shipping
+    charge from the shipping engine. Build it after changing the cart,
+    it does not follow later changes.
+    """
+
+    def __init__(self, cart):
+        self.cart = cart
+        self.items = list(
+            cart.items.select_related("product__summary", "variant")
+        )
+        self.total_items = sum(item.quantity for item in self.items)
+        self.subtotal = Decimal(
+            sum(item.total_price for item in self.items)
+        ).quantize(CENT)
+
+        # Items that are NOT free shipping
+        chargeable = [
+            item for item in self.items if not item.product.is_free_shipping
+        ]
+        self.chargeable_subtotal = Decimal(
+            sum(item.total_price for item in chargeable)
+        )
+        # total weight for shipping in KG
+        self.shipping_weight = sum(
+            (
+                (
+                    (item.variant.weight if item.variant else None)
+                    or item.product.weight
+                    or 0
+                )
+                * item.quantity
+                for item in chargeable
+            ),
+            ZERO,
+        )
+
+        self.engine = get_shipping_engine()
+        # 🚫 No chargeable items, nothing to ship for a fee
+        self.chargeable = bool(chargeable)
+        self.quote = FREE
+        if self.chargeable:
+            self.quote = self.engine.quote(
+                cart.district_id, self.shipping_weight, self.subtotal
+            )
+        self.shipping_charge = self.quote.shipping
+        # + self.cod_charge() for Merchant
+        self.grand_total = self.subtotal + self.shipping_charge
+
+    def cod_charge(self, payment_method="cod"):
+        """
+        Cash On Delivery charge (1% by default) based on subtotal
+        """
+        if payment_method != "cod":
+            return ZERO
+        return self.engine.cod_charge(self.chargeable_subtotal)
+
+    def district_quotes(self):
+        """(district, ShippingQuote) of every district for this cart"""
+        if not self.chargeable:
+            return [(district, FREE) for district in self.engine.districts]
+        return self.engine.district_quotes(self.shipping_weight, self.subtotal)
+
+    def zone_charges(self):
+        """{zone id: shipping charge}, districts of a zone pay the same"""
+        return {
+            district.shipping_zone_id: quote.shipping
+            for district, quote in self.district_quotes()
+        }
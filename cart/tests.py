@@ -1,3 +1,330 @@
-# from django.test import TestCase  # noqa
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import IntegrityError, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from cart.purge import purge_carts
+from cart.services import add_item
+from cart.utils import get_cart_summary
+from catalog.models import Category, Product, ProductVariant
+from core.utils.reference_data import clear_reference_data, get_reference_data
+from locations.models import District, Division
+from shipping.models import ShippingMethod, ShippingRate, ShippingZone
+
+
+class CartSummaryTest(TestCase):
+    """Test cases for the per request cart summary"""
+
+    def setUp(self):
+        # rows of this test must not outlive it in the process
+        self.addCleanup(clear_reference_data)
+        division = Division.objects.create(name="Dhaka")
+        zone = ShippingZone.objects.create(name="Dhaka City")
+        method = ShippingMethod.objects.create(
+            name="Standard", delivery_type="standard"
+        )
+        for min_weight, max_weight, rate in ((0, 1, 70), (1, None, 20)):
+            ShippingRate.objects.create(
+                shipping_method=method,
+                shipping_zone=zone,
+                calculation_type="weight",
+                min_weight=min_weight,
+                max_weight=max_weight,
+                rate_per_kg=rate,
+            )
+        district = District.objects.create(
+            division=division, shipping_zone=zone, name="Dhaka"
+        )
+        category = Category.objects.create(name="Phones")
+        phone, case = [
+            Product.objects.create(
+                name=name,
+                sku=name,
+                category=category,
+                base_price=Decimal("100.00"),
+                weight=Decimal("0.80"),
+                is_free_shipping=free,
+            )
+            for name, free in (("Phone", False), ("Case", True))
+        ]
+        self.cart = Cart.objects.create(district=district)
+        CartItem.objects.create(cart=self.cart, product=phone, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=case, quantity=1)
+
+    def test_totals(self):
+        get_reference_data()  # the rates are in memory
+        with self.assertNumQueries(1):
+            summary = self.cart.summary
+        self.assertEqual(summary.total_items, 3)
+        self.assertEqual(summary.subtotal, Decimal("300.00"))
+        # free shipping items weigh nothing: 1.6 KG, 70 + 1 extra KG
+        self.assertEqual(summary.shipping_weight, Decimal("1.60"))
+        self.assertEqual(summary.shipping_charge, Decimal("90.00"))
+        self.assertEqual(summary.grand_total, Decimal("390.00"))
+        self.assertEqual(summary.cod_charge(), Decimal("2.00"))
+        self.assertEqual(summary.cod_charge("bkash"), Decimal("0.00"))
+
+        # the model's properties agree
+        self.assertEqual(self.cart.grand_total, summary.grand_total)
+
+        self.cart.district = None
+        self.assertEqual(self.cart.summary.shipping_charge, 0)
+
+    def test_memoized_per_request(self):
+        request = RequestFactory().get("/")
+        summary = get_cart_summary(request, self.cart)
+        with self.assertNumQueries(0):
+            same = get_cart_summary(
+                request, Cart(pk=self.cart.pk, district=self.cart.district)
+            )
+        self.assertIs(same, summary)
+
+
+@override_settings(CART_WIDGET_HYDRATION=False)
+class LazyCartTest(TestCase):
+    """Test cases for carts created on the first change only"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Phone", sku="P1", category=category, base_price=1
+        )
+
+    def test_reads_create_nothing(self):
+        for url in (
+            reverse("product_detail", args=[self.product.slug]),
+            reverse("cart_detail"),
+            reverse("cart_widget"),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse(Cart.objects.exists())
+        self.assertRedirects(
+            self.client.get(reverse("checkout")), reverse("cart_detail")
+        )
+
+    def test_first_change_creates_cart(self):
+        url = reverse("add_to_cart", args=[self.product.slug])
+        self.client.get(url)
+        self.client.get(url)
+        cart = Cart.objects.get()
+        self.assertEqual(cart.session_key, self.client.session.session_key)
+        self.assertEqual(cart.items.get().quantity, 2)
+
+        response = self.client.get(reverse("cart_detail"))
+        self.assertEqual(response.context["cart_summary"].total_items, 2)
+
+    def _cart(self, expired=False, items=0, days=0):
+        session = SessionStore()
+        session.create()
+        if expired:
+            Session.objects.filter(pk=session.session_key).update(
+                expire_date=timezone.now() - timedelta(minutes=1)
+            )
+        cart = Cart.objects.create(session_key=session.session_key)
+        if items:
+            CartItem.objects.create(
+                cart=cart, product=self.product, quantity=items
+            )
+        Cart.objects.filter(pk=cart.pk).update(
+            updated_at=timezone.now() - timedelta(days=days)
+        )
+        return cart
+
+    def test_purge(self):
+        kept = [
+            self._cart(items=1, days=30),  # still reachable
+            self._cart(),  # empty, but just made
+            Cart.objects.create(
+                customer=get_user_model().objects.create_user(
+                    email="buyer@example.com", password="secret"
+                )
+            ),
+        ]
+        self._cart(expired=True, items=1)
+        self._cart(days=2)
+        self._cart(days=3)
+
+        self.assertEqual(purge_carts(dry_run=True), 3)
+        self.assertEqual(Cart.objects.count(), 6)
+        self.assertEqual(purge_carts(batch_size=2), 3)
+        self.assertEqual(
+            sorted(Cart.objects.values_list("pk", flat=True)),
+            [cart.pk for cart in kept],
+        )
+        self.assertEqual(CartItem.objects.count(), 1)
+
+
+class CartApiTest(TestCase):
+    """Test cases for the JSON cart api"""
+
+    def setUp(self):
+        self.addCleanup(clear_reference_data)
+        method = ShippingMethod.objects.create(
+            name="Standard", delivery_type="standard"
+        )
+        division = Division.objects.create(name="Dhaka")
+        self.city, self.outside = [
+            ShippingZone.objects.create(name=name)
+            for name in ("Dhaka City", "Outside Dhaka")
+        ]
+        for min_weight, max_weight, rate in ((0, 1, 70), (1, None, 20)):
+            ShippingRate.objects.create(
+                shipping_method=method,
+                shipping_zone=self.city,
+                calculation_type="weight",
+                min_weight=min_weight,
+                max_weight=max_weight,
+                rate_per_kg=rate,
+            )
+        ShippingRate.objects.create(
+            shipping_method=method,
+            shipping_zone=self.outside,
+            calculation_type="flat",
+            flat_rate=130,
+        )
+        self.dhaka, self.sylhet = [
+            District.objects.create(
+                division=division, shipping_zone=zone, name=name
+            )
+            for zone, name in ((self.city, "Dhaka"), (self.outside, "Sylhet"))
+        ]
+        category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Phone",
+            sku="P1",
+            category=category,
+            base_price=Decimal("100.00"),
+            weight=Decimal("0.80"),
+        )
+
+    def _add(self, **data):
+        return self.client.post(
+            reverse("cart_api_add", args=[self.product.slug]), data
+        )
+
+    def test_add(self):
+        response = self._add()
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data["line"]["quantity"], 1)
+        self.assertEqual(
+            data["totals"],
+            {
+                "total_items": 1,
+                "subtotal": "100.00",
+                "shipping_charge": "70.00",
+                "grand_total": "170.00",
+                "district": self.dhaka.pk,
+                "zone_charges": {
+                    str(self.city.pk): "70.00",
+                    str(self.outside.pk): "130.00",
+                },
+            },
+        )
+
+        # the same line grows, 2.4 KG: 70 + 2 started KG at 20
+        response = self._add(quantity=2)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["line"]["quantity"], 3)
+        self.assertEqual(data["line"]["total_price"], "300.00")
+        self.assertEqual(data["totals"]["shipping_charge"], "110.00")
+        self.assertEqual(CartItem.objects.get().quantity, 3)
+
+        self.assertEqual(self._add(quantity=0).status_code, 400)
+        self.assertEqual(self._add(variant=999).status_code, 404)
+
+    def test_add_variant(self):
+        variant = ProductVariant.objects.create(
+            product=self.product, price=Decimal("120.00")
+        )
+        data = self._add(variant=variant.pk, quantity=2).json()
+        self.assertEqual(data["line"]["variant"], variant.pk)
+        self.assertEqual(data["line"]["total_price"], "240.00")
+        self._add()  # the product without variant is a line of its own
+        self.assertEqual(CartItem.objects.count(), 2)
+
+        # the detail page posts the selected variant to the api
+        response = self.client.get(
+            reverse("product_detail", args=[self.product.slug])
+        )
+        self.assertContains(
+            response, reverse("cart_api_add", args=[self.product.slug])
+        )
+
+    def test_update_and_remove(self):
+        self._add()
+        item = CartItem.objects.get()
+        url = reverse("cart_api_update", args=[item.pk])
+
+        data = self.client.post(url, {"delta": -1}).json()
+        self.assertEqual(data["line"]["quantity"], 1)  # never below 1
+        data = self.client.post(url, {"quantity": 5}).json()
+        self.assertEqual(data["line"]["quantity"], 5)
+        self.assertEqual(data["totals"]["subtotal"], "500.00")
+        self.assertEqual(
+            self.client.post(url, {"quantity": 0}).status_code, 400
+        )
+
+        # lines of other carts are out of reach
+        other = CartItem.objects.create(
+            cart=Cart.objects.create(), product=self.product
+        )
+        self.assertEqual(
+            self.client.post(
+                reverse("cart_api_update", args=[other.pk]), {"delta": 1}
+            ).status_code,
+            404,
+        )
+        self.assertEqual(
+            self.client.post(
+                reverse("cart_api_remove", args=[other.pk])
+            ).status_code,
+            404,
+        )
+
+        data = self.client.post(
+            reverse("cart_api_remove", args=[item.pk])
+        ).json()
+        self.assertEqual(data["removed"], item.pk)
+        self.assertEqual(data["totals"]["total_items"], 0)
+        self.assertFalse(CartItem.objects.filter(pk=item.pk).exists())
+
+    def test_district(self):
+        self._add()
+        url = reverse("cart_api_district")
+        data = self.client.post(url, {"district": self.sylhet.pk}).json()
+        self.assertEqual(data["totals"]["shipping_charge"], "130.00")
+        self.assertEqual(data["totals"]["grand_total"], "230.00")
+        self.assertEqual(Cart.objects.get().district, self.sylhet)
+        self.assertEqual(
+            self.client.post(url, {"district": 999}).status_code, 404
+        )
+
+        summary = self.client.get(reverse("cart_api_summary")).json()
+        self.assertEqual(summary["totals"]["district"], self.sylhet.pk)
+
+    def test_summary_creates_nothing(self):
+        response = self.client.get(reverse("cart_api_summary"))
+        self.assertEqual(response.json()["totals"]["total_items"], 0)
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(
+            self.client.post(reverse("cart_api_summary")).status_code, 405
+        )
+
+    def test_one_line_without_variant(self):
+        cart = Cart.objects.create()
+        self.assertTrue(add_item(cart, self.product))
+        self.assertFalse(add_item(cart, self.product, quantity=2))
+        self.assertEqual(cart.items.get().quantity, 3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CartItem.objects.create(cart=cart, product=self.product)
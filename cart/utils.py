@@ -1,23 +1,116 @@
 # cart/utils.py
+from django.db.models import Count, Max
+from django.utils.functional import cached_property
+
 from cart.models import Cart
+from core.utils.reference_data import reference_table
 from locations.models import District
 
 
 def get_or_create_cart(request):
-    district = District.objects.filter(name="Dhaka").first()
+    """
+    The request's cart, created with the visitor's session when missing.
+    Only for changing a cart, reads go through get_cart / LazyCart.
+    """
+    cart = get_cart(request)
+    if cart is not None:
+        return cart
+
+    # cart default set inside dhaka
+    defaults = {"district": reference_table(District).get_by("name", "Dhaka")}
     if request.user.is_authenticated:
-        cart, _ = Cart.objects.get_or_create(customer=request.user)
+        cart, _ = Cart.objects.get_or_create(
+            customer=request.user, defaults=defaults
+        )
     else:
         if not request.session.session_key:
             request.session.create()
         cart, _ = Cart.objects.get_or_create(
-            session_key=request.session.session_key
+            session_key=request.session.session_key, defaults=defaults
         )
+    return cart
 
-    if (
-        cart and not cart.district and district
-    ):  # cart default set inside dhaka
-        cart.district = district
-        cart.save()
 
-    return cart
+def get_cart(request):
+    """The request's cart if it has one, never creates anything"""
+    if request.user.is_authenticated:
+        return Cart.objects.filter(customer=request.user).first()
+    if request.session.session_key:
+        return Cart.objects.filter(
+            session_key=request.session.session_key
+        ).first()
+    return None
+
+
+def get_cart_summary(request, cart):
+    """
+    CartSummary of the cart, built once per request: the page, the
+    header and the cart widget show the same totals. Ask for it after
+    the request has changed the cart.
+    """
+    summary = getattr(request, "_cart_summary", None)
+    if summary is None or summary.cart.pk != cart.pk:
+        summary = request._cart_summary = cart.summary
+    return summary
+
+
+class LazyCart:
+    """
+    The request's cart, read without writing anything: a visitor who
+    never changes a cart costs no session and no Cart row, crawlers
+    included. get_or_create() makes both on the first change.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def cart(self):
+        """The existing cart, or None"""
+        return get_cart(self.request)
+
+    @property
+    def summary(self):
+        """CartSummary of the existing cart, or None"""
+        if self.cart is None:
+            return None
+        return get_cart_summary(self.request, self.cart)
+
+    def get_or_create(self):
+        """The cart to change, created when the visitor has none"""
+        if self.cart is None:
+            self.cart = get_or_create_cart(self.request)
+        return self.cart
+
+
+def get_lazy_cart(request):
+    """The request's LazyCart, one per request"""
+    if not hasattr(request, "_lazy_cart"):
+        request._lazy_cart = LazyCart(request)
+    return request._lazy_cart
+
+
+def cart_state(request):
+    """
+    (item count, latest updated_at) of the request's cart and its items
+    and products, one query. Reads only, so a conditional GET never
+    creates a cart or a session.
+    """
+    if request.user.is_authenticated:
+        carts = Cart.objects.filter(customer=request.user)
+    elif request.session.session_key:
+        carts = Cart.objects.filter(session_key=request.session.session_key)
+    else:
+        return 0, None
+    state = carts.order_by().aggregate(
+        count=Count("items", distinct=True),
+        cart=Max("updated_at"),
+        item=Max("items__updated_at"),
+        product=Max("items__product__updated_at"),
+    )
+    latest = [
+        state[key]
+        for key in ("cart", "item", "product")
+        if state[key] is not None
+    ]
+    return state["count"], max(latest, default=None)
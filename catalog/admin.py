@@ -1,6 +1,8 @@
 import nested_admin
 from django.contrib import admin
 
+from core.utils.exports import ExportActionsMixin
+
 from .models import (
     Brand,
     Category,
@@ -128,7 +130,7 @@ class ProductVariantInline(nested_admin.NestedStackedInline):
 
 
 @admin.register(Product)
-class ProductAdmin(nested_admin.NestedModelAdmin):
+class ProductAdmin(ExportActionsMixin, nested_admin.NestedModelAdmin):
     list_display = (
         "name",
         "category",
@@ -235,6 +237,30 @@ class ProductAdmin(nested_admin.NestedModelAdmin):
         ProductVariantInline,
     ]
 
+    actions = ["export_csv", "export_xlsx"]
+    # same columns as catalog.importer, an export can be imported back
+    export_columns = (
+        ("sku", "sku"),
+        ("name", "name"),
+        ("slug", "slug"),
+        ("category", "category__slug"),
+        ("brand", "brand__slug"),
+        ("short_description", "short_description"),
+        ("description", "description"),
+        ("base_price", "base_price"),
+        ("compare_price", "compare_price"),
+        ("cost_price", "cost_price"),
+        ("stock_quantity", "stock_quantity"),
+        ("track_inventory", "track_inventory"),
+        ("allow_backorder", "allow_backorder"),
+        ("weight", "weight"),
+        ("is_active", "is_active"),
+        ("is_featured", "is_featured"),
+        ("is_new", "is_new"),
+        ("is_free_shipping", "is_free_shipping"),
+    )
+    export_filename = "products"
+
 
 # ==========================
 # ATTRIBUTES
@@ -0,0 +1,56 @@
+# catalog/api/pagination.py
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.utils.pagination import keyset_paginate
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    DRF adapter of core.utils.pagination: opaque ?after= / ?before=
+    cursors over (-created_at, id), no COUNT(*) and no OFFSET.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page = keyset_paginate(
+            queryset,
+            after=request.query_params.get("after"),
+            before=request.query_params.get("before"),
+            per_page=self.get_page_size(request),
+        )
+        return list(self.page)
+
+    def _link(self, param, cursor):
+        if cursor is None:
+            return None
+        other = "before" if param == "after" else "after"
+        url = remove_query_param(self.request.build_absolute_uri(), other)
+        return replace_query_param(url, param, cursor)
+
+    def get_next_link(self):
+        return self._link("after", self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link("before", self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
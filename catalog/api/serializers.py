@@ -0,0 +1,333 @@
+# catalog/api/serializers.py
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from catalog.models import (
+    Brand,
+    Category,
+    Product,
+    ProductFeature,
+    ProductImage,
+    ProductSpecification,
+    ProductSummary,
+    ProductVariant,
+    VariantAttribute,
+)
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """
+    Serializes only the requested fields, see CatalogViewSet.
+
+    plan: field -> what reading it needs
+        "select_related" / "prefetch_related": loaded with the page
+        "depends": (model, lookup to the serialized pks) pairs whose
+                   updated_at and row count are part of the ETag
+    list_fields: default fieldset of list responses, all for detail
+    deferred: heavy columns only loaded when requested
+    """
+
+    plan = {}
+    list_fields = None
+    deferred = ()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def absolute_url(self, image):
+        if not image:
+            return None
+        request = self.context.get("request")
+        return request.build_absolute_uri(image.url) if request else image.url
+
+
+OPTIONS_PREFETCH = Prefetch(
+    "variant_attributes",
+    queryset=VariantAttribute.objects.filter(is_active=True).select_related(
+        "attribute", "color"
+    ),
+)
+
+
+class VariantSerializer(SparseFieldsetSerializer):
+    in_stock = serializers.BooleanField(source="is_in_stock", read_only=True)
+    options = serializers.SerializerMethodField()
+
+    plan = {
+        "options": {
+            "prefetch_related": [OPTIONS_PREFETCH],
+            "depends": [(VariantAttribute, "variant")],
+        },
+    }
+
+    class Meta:
+        model = ProductVariant
+        fields = [
+            "id",
+            "product",
+            "sku",
+            "price",
+            "compare_price",
+            "stock_quantity",
+            "in_stock",
+            "image",
+            "is_default",
+            "options",
+            "updated_at",
+        ]
+
+    def get_options(self, variant):
+        return [
+            {
+                "attribute": option.attribute.slug if option.attribute else "",
+                "name": option.attribute.name if option.attribute else "",
+                "value": option.value,
+                "color": option.color.code if option.color else None,
+            }
+            for option in variant.variant_attributes.all()
+        ]
+
+
+class CategoryRefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ["id", "slug", "name", "bn_name"]
+
+
+class BrandRefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Brand
+        fields = ["id", "slug", "name"]
+
+
+class CategorySerializer(SparseFieldsetSerializer):
+    list_fields = ["id", "name", "bn_name", "slug", "parent", "depth", "image"]
+
+    class Meta:
+        model = Category
+        fields = [
+            "id",
+            "name",
+            "bn_name",
+            "slug",
+            "parent",
+            "depth",
+            "description",
+            "icon",
+            "image",
+            "is_featured",
+            "is_main_menu",
+            "updated_at",
+        ]
+
+
+class BrandSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Brand
+        fields = [
+            "id",
+            "name",
+            "slug",
+            "logo",
+            "description",
+            "website",
+            "updated_at",
+        ]
+
+
+SUMMARY_PLAN = {
+    "select_related": ["summary"],
+    "depends": [(ProductSummary, "product")],
+}
+
+
+class ProductSerializer(SparseFieldsetSerializer):
+    category = CategoryRefSerializer(read_only=True)
+    brand = BrandRefSerializer(read_only=True)
+    image = serializers.SerializerMethodField()
+    rating_avg = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
+    min_price = serializers.SerializerMethodField()
+    max_price = serializers.SerializerMethodField()
+    in_stock = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
+    variants = VariantSerializer(
+        many=True,
+        read_only=True,
+        fields=[
+            field
+            for field in VariantSerializer.Meta.fields
+            if field != "product"
+        ],
+    )
+    features = serializers.SlugRelatedField(
+        many=True, read_only=True, slug_field="title"
+    )
+    specifications = serializers.SerializerMethodField()
+
+    plan = {
+        "category": {
+            "select_related": ["category"],
+            "depends": [(Category, "products")],
+        },
+        "brand": {
+            "select_related": ["brand"],
+            "depends": [(Brand, "products")],
+        },
+        "image": SUMMARY_PLAN,
+        "rating_avg": SUMMARY_PLAN,
+        "review_count": SUMMARY_PLAN,
+        "min_price": SUMMARY_PLAN,
+        "max_price": SUMMARY_PLAN,
+        "in_stock": SUMMARY_PLAN,
+        "images": {
+            "prefetch_related": [
+                Prefetch(
+                    "images",
+                    queryset=ProductImage.objects.filter(is_active=True),
+                )
+            ],
+            "depends": [(ProductImage, "product")],
+        },
+        "variants": {
+            "prefetch_related": [
+                Prefetch(
+                    "variants",
+                    queryset=ProductVariant.objects.filter(
+                        is_active=True
+                    ).prefetch_related(OPTIONS_PREFETCH),
+                )
+            ],
+            "depends": [
+                (ProductVariant, "product"),
+                (VariantAttribute, "variant__product"),
+            ],
+        },
+        "features": {
+            "prefetch_related": [
+                Prefetch(
+                    "features",
+                    queryset=ProductFeature.objects.filter(
+                        is_active=True
+                    ).order_by("order"),
+                )
+            ],
+            "depends": [(ProductFeature, "product")],
+        },
+        "specifications": {
+            "prefetch_related": [
+                Prefetch(
+                    "specifications",
+                    queryset=ProductSpecification.objects.filter(
+                        is_active=True
+                    ).select_related("attribute"),
+                )
+            ],
+            "depends": [(ProductSpecification, "product")],
+        },
+    }
+    list_fields = [
+        "id",
+        "name",
+        "slug",
+        "sku",
+        "base_price",
+        "compare_price",
+        "discount_percentage",
+        "category",
+        "brand",
+        "image",
+        "rating_avg",
+        "review_count",
+        "min_price",
+        "max_price",
+        "in_stock",
+        "is_new",
+        "is_free_shipping",
+        "updated_at",
+    ]
+    deferred = ("description",)
+
+    class Meta:
+        model = Product
+        fields = [
+            "id",
+            "name",
+            "slug",
+            "sku",
+            "short_description",
+            "description",
+            "base_price",
+            "compare_price",
+            "discount_percentage",
+            "category",
+            "brand",
+            "image",
+            "rating_avg",
+            "review_count",
+            "min_price",
+            "max_price",
+            "in_stock",
+            "is_featured",
+            "is_new",
+            "is_bestseller",
+            "is_top_rated",
+            "is_free_shipping",
+            "weight",
+            "images",
+            "variants",
+            "features",
+            "specifications",
+            "published_at",
+            "created_at",
+            "updated_at",
+        ]
+
+    def _summary(self, product):
+        return getattr(product, "summary", None)
+
+    def get_image(self, product):
+        summary = self._summary(product)
+        return self.absolute_url(summary.primary_image) if summary else None
+
+    def get_rating_avg(self, product):
+        summary = self._summary(product)
+        return str(summary.rating_avg) if summary else None
+
+    def get_review_count(self, product):
+        summary = self._summary(product)
+        return summary.review_count if summary else 0
+
+    def get_min_price(self, product):
+        summary = self._summary(product)
+        return str(summary.min_price if summary else product.base_price)
+
+    def get_max_price(self, product):
+        summary = self._summary(product)
+        return str(summary.max_price if summary else product.base_price)
+
+    def get_in_stock(self, product):
+        summary = self._summary(product)
+        return summary.in_stock if summary else product.is_in_stock
+
+    def get_images(self, product):
+        return [
+            {
+                "image": self.absolute_url(image.image),
+                "alt_text": image.alt_text,
+                "is_primary": image.is_primary,
+            }
+            for image in product.images.all()
+        ]
+
+    def get_specifications(self, product):
+        return [
+            {
+                "attribute": spec.attribute.name if spec.attribute else "",
+                "value": spec.value,
+            }
+            for spec in product.specifications.all()
+        ]
@@ -0,0 +1,17 @@
+# catalog/api/urls.py
+from rest_framework.routers import DefaultRouter
+
+from catalog.api.views import (
+    BrandViewSet,
+    CategoryViewSet,
+    ProductViewSet,
+    VariantViewSet,
+)
+
+router = DefaultRouter()
+router.register("products", ProductViewSet, basename="api-product")
+router.register("categories", CategoryViewSet, basename="api-category")
+router.register("brands", BrandViewSet, basename="api-brand")
+router.register("variants", VariantViewSet, basename="api-variant")
+
+urlpatterns = router.urls
@@ -0,0 +1,215 @@
+# catalog/api/views.py
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from catalog.api.pagination import KeysetCursorPagination
+from catalog.api.serializers import (
+    BrandSerializer,
+    CategorySerializer,
+    ProductSerializer,
+    VariantSerializer,
+)
+from catalog.models import Brand, Category, Product, ProductVariant
+from core.utils.conditional import (
+    build_validators,
+    not_modified,
+    queryset_state,
+    set_validators,
+)
+
+# columns the conditional check reads before anything is serialized
+STATE_FIELDS = ("id", "created_at", "updated_at")
+
+
+class CatalogViewSet(viewsets.GenericViewSet):
+    """
+    Public read-only catalog endpoint.
+
+    ?fields=a,b  sparse fieldset, the query is planned from it: only the
+                 joins and prefetches the fields need are run
+    Pages and objects carry ETag/Last-Modified built from updated_at and
+    row counts of everything the fields read, so a client revalidating
+    an unchanged response gets a 304 before any row is serialized.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []  # nothing here is per-user
+    filter_backends = []  # ordering is fixed by the keyset cursor
+    pagination_class = KeysetCursorPagination
+    lookup_field = "slug"
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if response.status_code in (200, 304):
+            # shared caches may keep it, but must revalidate every time
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def get_fields(self):
+        serializer_class = self.get_serializer_class()
+        available = serializer_class.Meta.fields
+        requested = self.request.query_params.get("fields")
+        if not requested:
+            if self.action == "list" and serializer_class.list_fields:
+                return list(serializer_class.list_fields)
+            return list(available)
+
+        fields = [field.strip() for field in requested.split(",")]
+        unknown = set(fields) - set(available)
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Unknown fields: {', '.join(sorted(unknown))}"}
+            )
+        return fields
+
+    def plan_queryset(self, queryset, fields):
+        """Joins and prefetches of the requested fields only"""
+        serializer_class = self.get_serializer_class()
+        select, prefetch = set(), []
+        for field in fields:
+            plan = serializer_class.plan.get(field, {})
+            select.update(plan.get("select_related", []))
+            for lookup in plan.get("prefetch_related", []):
+                if lookup not in prefetch:
+                    prefetch.append(lookup)
+
+        deferred = [
+            field for field in serializer_class.deferred if field not in fields
+        ]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+    def get_validators(self, rows, fields):
+        """(etag, last_modified) of a response serializing rows"""
+        serializer_class = self.get_serializer_class()
+        pks = [row.pk for row in rows]
+        states = [
+            (
+                tuple(pks),
+                max((row.updated_at for row in rows), default=None),
+            )
+        ]
+        depends = []
+        for field in fields:
+            for dependency in serializer_class.plan.get(field, {}).get(
+                "depends", []
+            ):
+                if dependency not in depends:
+                    depends.append(dependency)
+        for model, lookup in depends if pks else []:
+            states.append(
+                queryset_state(model.objects.filter(**{f"{lookup}__in": pks}))
+            )
+        return build_validators(
+            states, sorted(fields), self.request.get_full_path()
+        )
+
+    def load(self, pks, fields):
+        """Full rows of pks in the given order"""
+        rows = self.plan_queryset(
+            self.get_queryset().filter(pk__in=pks), fields
+        ).in_bulk()
+        return [rows[pk] for pk in pks if pk in rows]
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        page = self.paginate_queryset(self.get_queryset().only(*STATE_FIELDS))
+        etag, last_modified = self.get_validators(page, fields)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(
+            self.load([row.pk for row in page], fields),
+            many=True,
+            fields=fields,
+        )
+        response = self.get_paginated_response(serializer.data)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        row = get_object_or_404(
+            self.get_queryset().only(*STATE_FIELDS),
+            **{self.lookup_field: kwargs[self.lookup_field]},
+        )
+        etag, last_modified = self.get_validators([row], fields)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(
+            self.load([row.pk], fields)[0], fields=fields
+        )
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+
+class ProductViewSet(CatalogViewSet):
+    """
+    ?category=<slug>  products of the category and its subcategories
+    ?brand=<slug>
+    """
+
+    serializer_class = ProductSerializer
+
+    def get_queryset(self):
+        queryset = Product.objects.all()
+        category_slug = self.request.query_params.get("category")
+        if category_slug:
+            category = get_object_or_404(Category, slug=category_slug)
+            queryset = category.get_subtree_products()
+        queryset = queryset.filter(is_active=True).defer("search_vector")
+        brand_slug = self.request.query_params.get("brand")
+        if brand_slug:
+            queryset = queryset.filter(brand__slug=brand_slug)
+        return queryset
+
+
+class CategoryViewSet(CatalogViewSet):
+    """?parent=<slug> children of a category, ?parent= roots"""
+
+    serializer_class = CategorySerializer
+
+    def get_queryset(self):
+        queryset = Category.objects.filter(is_active=True)
+        if "parent" in self.request.query_params:
+            parent_slug = self.request.query_params["parent"]
+            if parent_slug:
+                queryset = queryset.filter(parent__slug=parent_slug)
+            else:
+                queryset = queryset.filter(parent__isnull=True)
+        return queryset
+
+
+class BrandViewSet(CatalogViewSet):
+    serializer_class = BrandSerializer
+
+    def get_queryset(self):
+        return Brand.objects.filter(is_active=True)
+
+
+class VariantViewSet(CatalogViewSet):
+    """?product=<slug>"""
+
+    serializer_class = VariantSerializer
+    lookup_field = "pk"
+
+    def get_queryset(self):
+        queryset = ProductVariant.objects.filter(
+            is_active=True, product__is_active=True
+        )
+        product_slug = self.request.query_params.get("product")
+        if product_slug:
+            queryset = queryset.filter(product__slug=product_slug)
+        return queryset
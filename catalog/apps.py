@@ -3,3 +3,15 @@ from django.apps import AppConfig
 
 class CatalogConfig(AppConfig):
     name = "catalog"
+
+    def ready(self):
+        import catalog.signals.autocomplete  # noqa
+        import catalog.signals.images  # noqa
+        import catalog.signals.search  # noqa
+        import catalog.signals.summary  # noqa
+        import catalog.signals.variants  # noqa
+
+        # after summary, so sections are invalidated and the facet index
+        # (the category page ETag) moves once it is refreshed
+        import catalog.signals.facets  # noqa isort: skip
+        import catalog.signals.fragments  # noqa isort: skip
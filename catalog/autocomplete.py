@@ -0,0 +1,223 @@
+# catalog/autocomplete.py
+import bisect
+import logging
+import threading
+import time
+import unicodedata
+
+from django.core.cache import cache
+from django.db import connection
+
+from catalog.models import Brand, Category, Product
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "catalog:autocomplete:version"
+RELOAD_INTERVAL = 60  # seconds, min gap between cross-worker reloads
+MAX_KEY_WORDS = 6  # index word starts of the first n words only
+
+
+def normalize(text):
+    return unicodedata.normalize("NFC", text or "").casefold().strip()
+
+
+def index_keys(*labels):
+    """Every word start of every label, so "galaxy s24" matches "s24" """
+    keys = set()
+    for label in labels:
+        words = normalize(label).split()
+        for position in range(min(len(words), MAX_KEY_WORDS)):
+            keys.add(" ".join(words[position:]))
+    return keys
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index: a bisect plus a short forward scan,
+    no DB access. Entries are (kind, label, slug) payloads.
+    """
+
+    def __init__(self):
+        self._keys = []  # sorted list of (key, entry_id)
+        self._entries = {}  # entry_id -> (payload, keys)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def build(cls, items):
+        """Bulk build with one sort instead of n inserts"""
+        index = cls()
+        for entry_id, payload, keys in items:
+            index._entries[entry_id] = (payload, keys)
+            index._keys.extend((key, entry_id) for key in keys)
+        index._keys.sort()
+        return index
+
+    def add(self, entry_id, payload, keys):
+        with self._lock:
+            self._remove(entry_id)
+            for key in keys:
+                bisect.insort(self._keys, (key, entry_id))
+            self._entries[entry_id] = (payload, keys)
+
+    def remove(self, entry_id):
+        with self._lock:
+            self._remove(entry_id)
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            position = bisect.bisect_left(self._keys, (key, entry_id))
+            if position < len(self._keys) and self._keys[position] == (
+                key,
+                entry_id,
+            ):
+                del self._keys[position]
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect.bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(results) < limit:
+                key, entry_id = self._keys[position]
+                if not key.startswith(prefix):
+                    break
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    results.append(self._entries[entry_id][0])
+                position += 1
+        return results
+
+
+# ==================== Index sources ====================
+def product_item(pk, name, sku, slug):
+    return ("product", pk), ("product", name, slug), index_keys(name, sku)
+
+
+def category_item(pk, name, bn_name, slug):
+    return (
+        ("category", pk),
+        ("category", bn_name or name, slug),
+        index_keys(name, bn_name),
+    )
+
+
+def brand_item(pk, name, slug):
+    return ("brand", pk), ("brand", name, slug), index_keys(name)
+
+
+def iter_index_items():
+    for row in Category.objects.filter(is_active=True).values_list(
+        "pk", "name", "bn_name", "slug"
+    ):
+        yield category_item(*row)
+
+    for row in Brand.objects.filter(is_active=True).values_list(
+        "pk", "name", "slug"
+    ):
+        yield brand_item(*row)
+
+    for row in (
+        Product.objects.filter(is_active=True)
+        .values_list("pk", "name", "sku", "slug")
+        .iterator(chunk_size=2000)
+    ):
+        yield product_item(*row)
+
+
+# ==================== Process-local singleton ====================
+_state = {"index": None, "version": None, "loaded_at": 0.0}
+_load_lock = threading.Lock()
+
+
+def current_version():
+    return cache.get(VERSION_CACHE_KEY, 0)
+
+
+def bump_version():
+    """Tell other workers their index is stale"""
+    cache.add(VERSION_CACHE_KEY, 0, timeout=None)
+    try:
+        return cache.incr(VERSION_CACHE_KEY)
+    except ValueError:  # evicted between add and incr
+        cache.set(VERSION_CACHE_KEY, 1, timeout=None)
+        return 1
+
+
+def load_index():
+    """Full (re)build, swapped in atomically when ready"""
+    version = current_version()
+    started = time.monotonic()
+    index = PrefixIndex.build(iter_index_items())
+    _state.update(index=index, version=version, loaded_at=time.monotonic())
+    logger.info(
+        f"{'*' * 10} autocomplete index: {len(index)} entries "
+        f"in {time.monotonic() - started:.2f}s\n"
+    )
+    return index
+
+
+def warm_index():
+    """Load at worker start, never take the worker down"""
+    try:
+        with _load_lock:
+            if _state["index"] is None:
+                load_index()
+    except Exception:
+        logger.exception("autocomplete index warm-up failed")
+
+
+def _reload_in_background():
+    if not _load_lock.acquire(blocking=False):
+        return  # a reload is already running
+
+    def run():
+        try:
+            load_index()
+        except Exception:
+            logger.exception("autocomplete index reload failed")
+        finally:
+            connection.close()  # thread-local connection
+            _load_lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_index():
+    if _state["index"] is None:
+        with _load_lock:
+            if _state["index"] is None:
+                load_index()
+    elif (
+        current_version() != _state["version"]
+        and time.monotonic() - _state["loaded_at"] > RELOAD_INTERVAL
+    ):
+        # changed in another worker: keep serving the old index meanwhile
+        _reload_in_background()
+    return _state["index"]
+
+
+def suggest(term, limit=10):
+    return get_index().search(term, limit=limit)
+
+
+def update_entry(entry_id, payload=None, keys=None):
+    """Apply one change locally (if loaded) and bump the shared version"""
+    index = _state["index"]
+    if index is not None:
+        if payload is None:
+            index.remove(entry_id)
+        else:
+            index.add(entry_id, payload, keys)
+    version = bump_version()
+    if index is not None and _state["version"] == version - 1:
+        _state["version"] = version  # nothing missed, stay current
@@ -0,0 +1,454 @@
+# catalog/facets.py
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Trim
+from django.utils import timezone
+
+from catalog.models import (
+    Category,
+    Product,
+    ProductSpecification,
+    VariantAttribute,
+)
+
+logger = logging.getLogger(__name__)
+
+GENERATION_CACHE_KEY = "catalog:facets:generation"
+FACET_CACHE_TIMEOUT = 60 * 60  # bounds staleness of a lost cache update
+STALE_TIMEOUT = 60 * 60 * 24  # previous index, served during a rebuild
+LOCK_TIMEOUT = 60  # seconds, longer than any index build
+WAIT_TIMEOUT = 5  # seconds a request waits for another worker's build
+LOCAL_INDEXES = 64  # categories whose bitsets a process keeps
+
+# lower bounds in BDT, the last band is open-ended
+PRICE_BANDS = [0, 1000, 5000, 10000, 25000, 50000, 100000]
+
+# spec facets with more values than this are free text, not filters
+MAX_SPEC_VALUES = 30
+
+SPEC_PREFIX = "spec_"
+
+
+def price_band(price):
+    """(value, label) of the band containing price"""
+    lower = max(bound for bound in PRICE_BANDS if bound <= price)
+    position = PRICE_BANDS.index(lower)
+    if position + 1 < len(PRICE_BANDS):
+        upper = PRICE_BANDS[position + 1]
+        return f"{lower}-{upper}", f"৳ {lower} - {upper}"
+    return f"{lower}-", f"৳ {lower}+"
+
+
+def load_facet_values(products):
+    """
+    Facet values of every product in the queryset, in three queries:
+    {product_id: [(facet, title, value, label), ...]}
+    """
+    values = defaultdict(list)
+    for pk, price, brand_slug, brand_name in products.values_list(
+        "pk", "base_price", "brand__slug", "brand__name"
+    ):
+        values[pk].append(("price", "Price", *price_band(price)))
+        if brand_slug:
+            values[pk].append(("brand", "Brand", brand_slug, brand_name))
+
+    for pk, color in (
+        VariantAttribute.objects.filter(
+            variant__product__in=products,
+            variant__is_active=True,
+            is_active=True,
+            color__isnull=False,
+        )
+        .values_list("variant__product_id", "color__name")
+        .distinct()
+    ):
+        values[pk].append(("color", "Color", color, color))
+
+    for pk, slug, name, value in ProductSpecification.objects.filter(
+        product__in=products, is_active=True, attribute__isnull=False
+    ).values_list("product_id", "attribute__slug", "attribute__name", "value"):
+        value = value.strip()
+        if value:
+            values[pk].append((f"{SPEC_PREFIX}{slug}", name, value, value))
+
+    return values
+
+
+def selection_condition(selected):
+    """
+    Q matching products with the selected facet values, the SQL twin of
+    FacetIndex.match(): OR within a facet, AND across facets
+    """
+    condition = Q()
+    for facet, values in selected.items():
+        if facet == "price":
+            matches = Q()
+            for value in values:
+                lower, upper = value.split("-")
+                band = Q(base_price__gte=lower)
+                if upper:
+                    band &= Q(base_price__lt=upper)
+                matches |= band
+        elif facet == "brand":
+            matches = Q(brand__slug__in=values)
+        elif facet == "color":
+            matches = Exists(
+                VariantAttribute.objects.filter(
+                    variant__product=OuterRef("pk"),
+                    variant__is_active=True,
+                    is_active=True,
+                    color__name__in=values,
+                )
+            )
+        else:
+            matches = Exists(
+                ProductSpecification.objects.annotate(
+                    trimmed=Trim("value")
+                ).filter(
+                    product=OuterRef("pk"),
+                    is_active=True,
+                    attribute__slug=facet.removeprefix(SPEC_PREFIX),
+                    trimmed__in=values,
+                )
+            )
+        condition &= matches
+    return condition
+
+
+class FacetIndex:
+    """
+    Per-category facet bitsets. Every product of the subtree gets a bit
+    position; each facet value keeps a Python int with the bits of its
+    products set, so filtering and counting are AND/OR plus popcount.
+    """
+
+    def __init__(self):
+        self.product_ids = []  # bit position -> product id
+        self.positions = {}  # product id -> bit position
+        self.bits = 0  # every indexed product
+        # facet -> {"title": title, "values": {value: [label, bits]}}
+        self.facets = {}
+        # last change of a product of the subtree or of its card
+        self.changed_at = timezone.now()
+
+    @property
+    def state(self):
+        """(products, changed_at) of the subtree, for page validators"""
+        return len(self.positions), self.changed_at
+
+    @classmethod
+    def build(cls, values):
+        index = cls()
+        for product_id, product_values in values.items():
+            index.set_product(product_id, product_values)
+        return index
+
+    def set_product(self, product_id, product_values):
+        """Add a product or replace its facet values"""
+        self.changed_at = timezone.now()
+        position = self.positions.get(product_id)
+        if position is None:
+            position = len(self.product_ids)
+            self.product_ids.append(product_id)
+            self.positions[product_id] = position
+            self.bits |= 1 << position
+        else:
+            self._clear(1 << position)
+
+        for facet, title, value, label in product_values:
+            entry = self.facets.setdefault(
+                facet, {"title": title, "values": {}}
+            )
+            entry["title"] = title
+            bucket = entry["values"].setdefault(value, [label, 0])
+            bucket[0] = label
+            bucket[1] |= 1 << position
+
+    def remove_product(self, product_id):
+        position = self.positions.pop(product_id, None)
+        self.changed_at = timezone.now()
+        if position is not None:
+            self.product_ids[position] = None  # keep the other positions
+            self.bits &= ~(1 << position)
+            self._clear(1 << position)
+
+    def _clear(self, mask):
+        for facet in list(self.facets):
+            values = self.facets[facet]["values"]
+            for value in list(values):
+                values[value][1] &= ~mask
+                if not values[value][1]:
+                    del values[value]
+            if not values:
+                del self.facets[facet]
+
+    def parse_selection(self, querydict):
+        """{facet: {values}} for the known facets in request.GET"""
+        selected = {}
+        for facet, entry in self.facets.items():
+            values = {
+                value
+                for value in querydict.getlist(facet)
+                if value in entry["values"]
+            }
+            if values:
+                selected[facet] = values
+        return selected
+
+    def _facet_bits(self, facet, values):
+        """OR within a facet"""
+        bits = 0
+        for value in values:
+            bits |= self.facets[facet]["values"][value][1]
+        return bits
+
+    def match(self, selected, exclude=None):
+        """AND across facets, optionally ignoring one of them"""
+        bits = self.bits
+        for facet, values in selected.items():
+            if facet != exclude:
+                bits &= self._facet_bits(facet, values)
+        return bits
+
+    def mask(self, product_ids):
+        """Bits of the indexed products among product_ids"""
+        bits = 0
+        for product_id in product_ids:
+            position = self.positions.get(product_id)
+            if position is not None:
+                bits |= 1 << position
+        return bits
+
+    def counts(self, selected, within=None):
+        """
+        Facets for the sidebar. Counts of a facet ignore its own
+        selection, so picking one brand still shows the other brands.
+        within: mask() of the products the page is limited to, the
+        results of a search
+        """
+        facets = []
+        for facet, entry in self.facets.items():
+            values = entry["values"]
+            if facet.startswith(SPEC_PREFIX) and not (
+                1 < len(values) <= MAX_SPEC_VALUES
+            ):
+                continue
+
+            base = self.match(selected, exclude=facet)
+            if within is not None:
+                base &= within
+            chosen = selected.get(facet, set())
+            options = []
+            for value, (label, bits) in values.items():
+                count = (bits & base).bit_count()
+                if count or value in chosen:
+                    options.append(
+                        {
+                            "value": value,
+                            "label": label,
+                            "count": count,
+                            "selected": value in chosen,
+                        }
+                    )
+            if options:
+                options.sort(key=lambda option: _sort_key(facet, option))
+                facets.append(
+                    {"key": facet, "title": entry["title"], "values": options}
+                )
+
+        facets.sort(key=lambda facet: _FACET_ORDER.get(facet["key"], 9))
+        return facets
+
+
+_FACET_ORDER = {"brand": 0, "price": 1, "color": 2}
+
+
+def _sort_key(facet, option):
+    if facet == "price":
+        return int(option["value"].split("-")[0]), ""
+    return 0, option["label"].casefold()
+
+
+# ==================== Cached per-category indexes ====================
+def current_generation():
+    return cache.get(GENERATION_CACHE_KEY, 0)
+
+
+def bump_generation():
+    """Drop every cached index (category moves, brand/color renames)"""
+    cache.add(GENERATION_CACHE_KEY, 0, timeout=None)
+    try:
+        cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:  # evicted between add and incr
+        cache.set(GENERATION_CACHE_KEY, 1, timeout=None)
+
+
+def _cache_key(generation, category_id):
+    return f"catalog:facets:{generation}:{category_id}"
+
+
+def _stamp_key(generation, category_id):
+    return f"catalog:facets:stamp:{generation}:{category_id}"
+
+
+def _lock_key(category_id):
+    return f"catalog:facets:lock:{category_id}"
+
+
+# category id -> (generation, state, index), most recently used last
+_local_indexes = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _remember(generation, category_id, index):
+    with _local_lock:
+        _local_indexes[category_id] = (generation, index.state, index)
+        _local_indexes.move_to_end(category_id)
+        while len(_local_indexes) > LOCAL_INDEXES:
+            _local_indexes.popitem(last=False)
+
+
+def _store(generation, category_id, index):
+    """The shared copy, then the stamp processes compare theirs with"""
+    cache.set(_cache_key(generation, category_id), index, FACET_CACHE_TIMEOUT)
+    cache.set(
+        _stamp_key(generation, category_id), index.state, FACET_CACHE_TIMEOUT
+    )
+
+
+def build_facet_index(category):
+    products = category.get_subtree_products().filter(is_active=True)
+    index = FacetIndex.build(load_facet_values(products))
+    logger.info(
+        f"{'*' * 10} facet index for {category.slug}: "
+        f"{len(index.positions)} products\n"
+    )
+    return index
+
+
+def facet_state(category):
+    """
+    The state of the category's index for page validators, read from
+    its small stamp key: a revalidation never loads the bitsets
+    """
+    stamp = cache.get(_stamp_key(current_generation(), category.pk))
+    if stamp is None:
+        return get_facet_index(category).state
+    return stamp
+
+
+def get_facet_index(category):
+    """
+    The category's index. A process keeps the bitsets in memory while
+    the shared stamp says they are current, and loads the shared copy
+    once they are not. After a generation bump only the request holding
+    the lock rebuilds it, the others serve the previous index
+    meanwhile, like core.utils.fragment_cache.
+    """
+    generation = current_generation()
+    stamp = cache.get(_stamp_key(generation, category.pk))
+    with _local_lock:
+        local = _local_indexes.get(category.pk)
+    if stamp is not None and local is not None:
+        if local[:2] == (generation, stamp):
+            return local[2]
+
+    key = _cache_key(generation, category.pk)
+    stale_key = f"catalog:facets:stale:{category.pk}"
+    index = cache.get(key)
+    if index is not None:
+        _remember(generation, category.pk, index)
+        return index
+
+    if cache.add(_lock_key(category.pk), 1, LOCK_TIMEOUT):
+        try:
+            index = build_facet_index(category)
+            _store(generation, category.pk, index)
+            cache.set(stale_key, index, STALE_TIMEOUT)
+        finally:
+            cache.delete(_lock_key(category.pk))
+        _remember(generation, category.pk, index)
+        return index
+
+    index = cache.get(stale_key)
+    if index is not None:
+        return index
+
+    # cold cache: wait for the lock holder instead of piling on the DB
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        index = cache.get(key)
+        if index is not None:
+            _remember(generation, category.pk, index)
+            return index
+    return build_facet_index(category)
+
+
+def _acquire(lock_key):
+    """cache.add() lock, waiting up to WAIT_TIMEOUT for its holder"""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def _ancestor_ids(path):
+    return [int(pk) for pk in path.split("/") if pk]
+
+
+def refresh_product_facets(product_ids, stale_category_ids=()):
+    """
+    Patch the cached indexes of the categories containing these products
+    instead of rebuilding them, each under the category's lock so
+    concurrent patches and builds do not lose each other's changes.
+    stale_category_ids are categories the products may have left (moved
+    or deleted).
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+
+    products = Product.objects.filter(pk__in=product_ids)
+    values = load_facet_values(products.filter(is_active=True))
+    ancestors = {
+        pk: set(_ancestor_ids(path))
+        for pk, path in products.values_list("pk", "category__path")
+    }
+
+    category_ids = set().union(*ancestors.values())
+    for path in Category.objects.filter(pk__in=stale_category_ids).values_list(
+        "path", flat=True
+    ):
+        category_ids.update(_ancestor_ids(path))
+
+    generation = current_generation()
+    for category_id in category_ids:
+        key = _cache_key(generation, category_id)
+        lock_key = _lock_key(category_id)
+        if not _acquire(lock_key):
+            # a build or patch holds it too long: drop the index, the
+            # next request builds it with this change
+            cache.delete_many([key, _stamp_key(generation, category_id)])
+            continue
+        try:
+            index = cache.get(key)
+            if index is None:
+                continue
+            for product_id in product_ids:
+                if category_id in ancestors.get(product_id, ()) and (
+                    product_id in values
+                ):
+                    index.set_product(product_id, values[product_id])
+                else:
+                    index.remove_product(product_id)
+            _store(generation, category_id, index)
+        finally:
+            cache.delete(lock_key)
@@ -0,0 +1,401 @@
+# catalog/feeds.py
+import csv
+import gzip
+import io
+import json
+import tempfile
+from bisect import bisect_right
+from urllib.parse import quote, urljoin
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Max
+from django.urls import reverse
+from django.utils import timezone, translation
+from django.utils.dateparse import parse_datetime
+
+from catalog.models import Category, Product, ProductSummary
+
+SITEMAP_DIR = "sitemaps"
+SITEMAP_INDEX = f"{SITEMAP_DIR}/sitemap.xml"
+FEED_DIR = "feeds"
+MANIFEST = f"{SITEMAP_DIR}/manifest.json"
+
+SHARD_SIZE = 50_000  # sitemap protocol limit per file
+CHUNK_SIZE = 2000  # rows per database round trip
+FEED_CURRENCY = "BDT"
+
+# sitemap section -> (rows, url name taking the slug)
+SITEMAP_SECTIONS = {
+    "products": (Product.objects.filter(is_active=True), "product_detail"),
+    "categories": (
+        Category.objects.filter(is_active=True),
+        "category_products",
+    ),
+}
+
+FEED_FIELDS = (
+    "pk",
+    "sku",
+    "name",
+    "short_description",
+    "slug",
+    "base_price",
+    "compare_price",
+    "brand__name",
+    "category__name",
+    "summary__primary_image",
+    "summary__in_stock",
+)
+
+
+# ==================== storage helpers ====================
+def _replace(name, content):
+    """Overwrite name in storage, keeping its url"""
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, content)
+
+
+def load_manifest():
+    if not default_storage.exists(MANIFEST):
+        return {}
+    with default_storage.open(MANIFEST, "rb") as manifest:
+        return json.loads(manifest.read())
+
+
+def save_manifest(manifest):
+    _replace(
+        MANIFEST,
+        ContentFile(json.dumps(manifest, indent=2, default=str).encode()),
+    )
+
+
+class GzipShard:
+    """Text written straight into a gzip temp file, stored on close"""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.lastmod = None
+        self._file = tempfile.TemporaryFile()
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb")
+        self.stream = io.TextIOWrapper(self._gzip, encoding="utf-8")
+
+    def close(self):
+        self.stream.close()  # flushes and closes the gzip stream
+        self._file.seek(0)
+        _replace(self.name, File(self._file))
+        self._file.close()
+
+
+# ==================== sitemaps ====================
+def _url_templates(url_name, base_url):
+    """{language: absolute url with a {slug} placeholder}"""
+    templates = {}
+    for language, _ in settings.LANGUAGES:
+        with translation.override(language):
+            path = reverse(url_name, args=["__slug__"])
+        templates[language] = urljoin(base_url, path).replace(
+            "__slug__", "{slug}"
+        )
+    return templates
+
+
+def _write_url(shard, templates, slug, updated_at):
+    urls = {
+        language: template.format(slug=quote(slug))
+        for language, template in templates.items()
+    }
+    alternates = "".join(
+        f'<xhtml:link rel="alternate" hreflang="{language}" '
+        f"href={quoteattr(url)}/>"
+        for language, url in urls.items()
+    )
+    shard.stream.write(
+        f"<url><loc>{escape(urls[settings.LANGUAGE_CODE])}</loc>"
+        f"<lastmod>{updated_at.date().isoformat()}</lastmod>"
+        f"{alternates}</url>\n"
+    )
+
+
+def _open_shard(section, start):
+    shard = GzipShard(f"{SITEMAP_DIR}/{section}-{start}.xml.gz")
+    shard.start = start
+    shard.stream.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+        'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n'
+    )
+    return shard
+
+
+def _close_shard(shard):
+    shard.stream.write("</urlset>\n")
+    shard.close()
+    return {
+        "name": shard.name,
+        "start": shard.start,
+        "count": shard.count,
+        "lastmod": shard.lastmod.isoformat() if shard.lastmod else None,
+    }
+
+
+def write_shards(section, base_url, start=0, end=None):
+    """
+    Stream the section's rows with pk in [start, end) into shards of at
+    most SHARD_SIZE urls. The first shard keeps `start` so shard ranges
+    stay contiguous. Returns the shard entries of the manifest.
+    """
+    queryset, url_name = SITEMAP_SECTIONS[section]
+    templates = _url_templates(url_name, base_url)
+    rows = queryset.filter(pk__gte=start)
+    if end is not None:
+        rows = rows.filter(pk__lt=end)
+
+    shards = []
+    shard = None
+    for pk, slug, updated_at in (
+        rows.order_by("pk")
+        .values_list("pk", "slug", "updated_at")
+        .iterator(chunk_size=CHUNK_SIZE)
+    ):
+        if shard is None or shard.count == SHARD_SIZE:
+            if shard is not None:
+                shards.append(_close_shard(shard))
+            shard = _open_shard(section, start if shard is None else pk)
+        _write_url(shard, templates, slug, updated_at)
+        shard.count += 1
+        shard.lastmod = max(filter(None, [shard.lastmod, updated_at]))
+    if shard is not None:
+        shards.append(_close_shard(shard))
+    return shards
+
+
+def _stale_shards(section, shards, since):
+    """
+    Indexes of shards to rewrite: rows updated since the last run
+    (deactivations included), changed counts (deletions) and the last
+    shard, which takes new rows.
+    """
+    queryset, _ = SITEMAP_SECTIONS[section]
+    starts = [shard["start"] for shard in shards]
+    stale = {len(shards) - 1}
+    for pk in (
+        queryset.model.objects.filter(updated_at__gt=since)
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=CHUNK_SIZE)
+    ):
+        stale.add(max(bisect_right(starts, pk) - 1, 0))
+
+    for position, shard in enumerate(shards):
+        if position in stale:
+            continue
+        rows = queryset.all()
+        if position:  # the first shard also covers anything before it
+            rows = rows.filter(pk__gte=shard["start"])
+        if position + 1 < len(shards):
+            rows = rows.filter(pk__lt=shards[position + 1]["start"])
+        if rows.count() != shard["count"]:
+            stale.add(position)
+    return sorted(stale)
+
+
+def generate_sitemaps(base_url, full=False):
+    """
+    Write the gzip sitemap shards of every section and the index.
+    Incremental unless full: only shards with changes since the last
+    run are rewritten. Returns {section: shards rewritten}.
+    """
+    manifest = load_manifest()
+    rewritten = {}
+    for section in SITEMAP_SECTIONS:
+        started = timezone.now()
+        previous = manifest.get(section, {})
+        old = previous.get("shards", [])
+        since = parse_datetime(previous.get("last_run") or "")
+
+        if full or not old or since is None:
+            shards = write_shards(section, base_url)
+            rewritten[section] = len(shards)
+        else:
+            shards = []
+            stale = _stale_shards(section, old, since)
+            for position, shard in enumerate(old):
+                if position not in stale:
+                    shards.append(shard)
+                    continue
+                end = None
+                if position + 1 < len(old):
+                    end = old[position + 1]["start"]
+                start = shard["start"] if position else 0
+                shards.extend(write_shards(section, base_url, start, end))
+            rewritten[section] = len(stale)
+
+        # shards emptied or merged away
+        kept = {shard["name"] for shard in shards}
+        for shard in old:
+            if shard["name"] not in kept:
+                default_storage.delete(shard["name"])
+
+        manifest[section] = {"last_run": started, "shards": shards}
+
+    write_sitemap_index(manifest, base_url)
+    save_manifest(manifest)
+    return rewritten
+
+
+def write_sitemap_index(manifest, base_url):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for section in SITEMAP_SECTIONS:
+        for shard in manifest.get(section, {}).get("shards", []):
+            url = urljoin(base_url, default_storage.url(shard["name"]))
+            lastmod = (
+                f"<lastmod>{shard['lastmod']}</lastmod>"
+                if shard["lastmod"]
+                else ""
+            )
+            lines.append(
+                f"<sitemap><loc>{escape(url)}</loc>{lastmod}</sitemap>"
+            )
+    lines.append("</sitemapindex>\n")
+    _replace(SITEMAP_INDEX, ContentFile("\n".join(lines).encode()))
+
+
+def default_base_url():
+    """https://<domain of the current Site>"""
+    scheme = "https" if settings.ENABLE_HTTPS else "http"
+    return f"{scheme}://{Site.objects.get_current().domain}"
+
+
+# ==================== catalog feeds ====================
+def _feed_rows():
+    return (
+        Product.objects.filter(is_active=True)
+        .order_by("pk")
+        .values_list(*FEED_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _feed_item(row, product_url, base_url):
+    (
+        pk,
+        sku,
+        name,
+        short_description,
+        slug,
+        base_price,
+        compare_price,
+        brand,
+        category,
+        image,
+        in_stock,
+    ) = row
+    on_sale = compare_price and compare_price > base_price
+    return {
+        "id": sku or str(pk),
+        "title": name,
+        "description": short_description or name,
+        "link": product_url.format(slug=quote(slug)),
+        "image_link": (
+            urljoin(base_url, default_storage.url(image)) if image else ""
+        ),
+        "availability": "in stock" if in_stock else "out of stock",
+        "condition": "new",
+        "price": f"{compare_price if on_sale else base_price} "
+        f"{FEED_CURRENCY}",
+        "sale_price": f"{base_price} {FEED_CURRENCY}" if on_sale else "",
+        "brand": brand or "",
+        "product_type": category or "",
+    }
+
+
+def write_google_feed(base_url):
+    """Google Merchant Center RSS 2.0 feed, gzip"""
+    product_url = _url_templates("product_detail", base_url)[
+        settings.LANGUAGE_CODE
+    ]
+    shard = GzipShard(f"{FEED_DIR}/google.xml.gz")
+    shard.stream.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n'
+        f"<channel><title>{escape(settings.SITE_NAME or '')}</title>"
+        f"<link>{escape(base_url)}</link>\n"
+    )
+    for row in _feed_rows():
+        item = _feed_item(row, product_url, base_url)
+        fields = "".join(
+            f"<g:{key}>{escape(value)}</g:{key}>"
+            for key, value in item.items()
+            if value
+        )
+        shard.stream.write(f"<item>{fields}</item>\n")
+        shard.count += 1
+    shard.stream.write("</channel></rss>\n")
+    shard.close()
+    return shard.count
+
+
+def write_facebook_feed(base_url):
+    """Facebook/Meta commerce catalog CSV, gzip"""
+    product_url = _url_templates("product_detail", base_url)[
+        settings.LANGUAGE_CODE
+    ]
+    shard = GzipShard(f"{FEED_DIR}/facebook.csv.gz")
+    writer = None
+    for row in _feed_rows():
+        item = _feed_item(row, product_url, base_url)
+        if writer is None:
+            writer = csv.DictWriter(shard.stream, fieldnames=list(item))
+            writer.writeheader()
+        writer.writerow(item)
+        shard.count += 1
+    shard.close()
+    return shard.count
+
+
+def _catalog_version():
+    """(active products, latest product/summary change) of the feeds"""
+    return (
+        Product.objects.filter(is_active=True).count(),
+        max(
+            filter(
+                None,
+                [
+                    Product.objects.aggregate(latest=Max("updated_at"))[
+                        "latest"
+                    ],
+                    ProductSummary.objects.aggregate(latest=Max("updated_at"))[
+                        "latest"
+                    ],
+                ],
+            ),
+            default=None,
+        ),
+    )
+
+
+def generate_feeds(base_url, full=False):
+    """
+    Write both catalog feeds. Skipped when no product or summary changed
+    since the last run. Returns products written, None if skipped.
+    """
+    manifest = load_manifest()
+    count, latest = _catalog_version()
+    version = [count, latest.isoformat() if latest else None]
+    if not full and manifest.get("feeds", {}).get("version") == version:
+        return None
+
+    write_google_feed(base_url)
+    written = write_facebook_feed(base_url)
+    manifest["feeds"] = {"version": version, "last_run": timezone.now()}
+    save_manifest(manifest)
+    return written
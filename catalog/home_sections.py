@@ -0,0 +1,131 @@
+# catalog/home_sections.py
+from django.db.models import (
+    BooleanField,
+    ExpressionWrapper,
+    F,
+    Prefetch,
+    Q,
+    Window,
+    prefetch_related_objects,
+)
+from django.db.models.functions import RowNumber
+
+from catalog.models import Product, ProductFeature
+from catalog.search import search_condition
+
+# home page section -> product flag
+HOME_SECTION_FLAGS = {
+    "slider": "is_slider",
+    "most_popular": "is_most_popular",
+    "featured": "is_featured",
+    "new": "is_new",
+    "bestseller": "is_bestseller",
+    "top_rated": "is_top_rated",
+}
+
+SECTION_LIMITS = {
+    "slider": 6,
+    "most_popular": 1,  # slider right side box
+    "featured": 12,
+    "new": 12,
+    "bestseller": 12,
+    "top_rated": 12,
+}
+
+# the search box narrows these, the slider is always shown
+SEARCHABLE_SECTIONS = {"featured", "new", "bestseller", "top_rated"}
+
+
+def flag_condition(sections):
+    """Q matching products flagged for any of the sections"""
+    condition = Q()
+    for section in sections:
+        condition |= Q(**{HOME_SECTION_FLAGS[section]: True})
+    return condition
+
+
+def section_rank(section, matches_search=None):
+    """
+    Window numbering the products of a section newest first, within the
+    products matching the search when the search narrows the section
+    """
+    partition = [F(HOME_SECTION_FLAGS[section])]
+    if matches_search is not None and section in SEARCHABLE_SECTIONS:
+        partition.append(matches_search)
+    return Window(
+        RowNumber(),
+        partition_by=partition,
+        order_by=[F("created_at").desc(), F("pk").asc()],
+    )
+
+
+def home_section_products(search=None):
+    """
+    The products of the home sections, one query: each section's
+    SECTION_LIMITS newest products, limited in SQL by a row number per
+    section. A product in several sections is one row.
+    """
+    queryset = (
+        Product.objects.filter(
+            flag_condition(HOME_SECTION_FLAGS), is_active=True
+        )
+        .select_related("category", "brand", "summary")
+        .order_by("-created_at", "pk")
+    )
+    condition = search_condition(search)
+    matches_search = None
+    if condition is not None:
+        always_shown = flag_condition(
+            set(HOME_SECTION_FLAGS) - SEARCHABLE_SECTIONS
+        )
+        matches_search = ExpressionWrapper(
+            condition, output_field=BooleanField()
+        )
+        queryset = queryset.filter(always_shown | condition).annotate(
+            matches_search=matches_search
+        )
+
+    in_sections = Q()
+    for section, flag in HOME_SECTION_FLAGS.items():
+        shown = Q(
+            **{flag: True, f"{section}_rank__lte": SECTION_LIMITS[section]}
+        )
+        if condition is not None and section in SEARCHABLE_SECTIONS:
+            shown &= Q(matches_search=True)
+        in_sections |= shown
+    return queryset.annotate(
+        **{
+            f"{section}_rank": section_rank(section, matches_search)
+            for section in HOME_SECTION_FLAGS
+        }
+    ).filter(in_sections)
+
+
+def load_home_sections(search=None):
+    """
+    The products of home_section_products() partitioned into sections
+    in Python (a product may sit in several). Features are only shown
+    for the most popular product and are prefetched for it alone.
+    Returns {section: [products]}.
+    """
+    sections = {section: [] for section in HOME_SECTION_FLAGS}
+    for product in home_section_products(search):
+        for section, flag in HOME_SECTION_FLAGS.items():
+            if (
+                getattr(product, flag)
+                and getattr(product, f"{section}_rank")
+                <= SECTION_LIMITS[section]
+                and (
+                    section not in SEARCHABLE_SECTIONS
+                    or getattr(product, "matches_search", True)
+                )
+            ):
+                sections[section].append(product)
+
+    prefetch_related_objects(
+        sections["most_popular"],
+        Prefetch(
+            "features", queryset=ProductFeature.objects.order_by("order")
+        ),
+    )
+    return sections
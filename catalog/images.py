@@ -0,0 +1,312 @@
+# catalog/images.py
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from catalog.models import (
+    Brand,
+    Category,
+    ImageDerivativeSet,
+    ProductImage,
+    ProductVariant,
+)
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (320, 640, 960, 1280)
+DERIVATIVE_DIR = "derivatives"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+DERIVATIVE_SPEC = (
+    f"{','.join(map(str, DERIVATIVE_WIDTHS))}"
+    f":webp{WEBP_QUALITY}:jpeg{JPEG_QUALITY}"
+)
+
+# Pillow releases the GIL while decoding, resizing and encoding, so
+# threads resize in parallel without forking Django
+UPLOAD_WORKERS = 2
+DERIVATIVE_CACHE_TIMEOUT = 60 * 60 * 24
+MISSING_CACHE_TIMEOUT = 60  # not generated yet, look again soon
+
+# sent with source=<image name> once its derivatives are recorded
+derivatives_ready = Signal()
+
+# every uploaded image served on the storefront
+IMAGE_FIELDS = (
+    (ProductImage, "image"),
+    (ProductVariant, "image"),
+    (Category, "image"),
+    (Brand, "logo"),
+)
+
+
+def _cache_key(name):
+    digest = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+    return f"catalog:derivatives:{digest}"
+
+
+def _fallback_format(image):
+    """JPEG unless the image has transparency (logos), which JPEG drops"""
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        return "png"
+    return "jpeg"
+
+
+def _target_widths(source_width):
+    """Never upscale, small originals get a single same-size copy"""
+    widths = [width for width in DERIVATIVE_WIDTHS if width < source_width]
+    return widths or [source_width]
+
+
+def _save(image, name, fmt):
+    buffer = BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif fmt == "jpeg":
+        image.convert("RGB").save(
+            buffer,
+            "JPEG",
+            quality=JPEG_QUALITY,
+            optimize=True,
+            progressive=True,
+        )
+    else:
+        image.save(buffer, "PNG", optimize=True)
+
+    if default_storage.exists(name):
+        default_storage.delete(name)  # regenerated, keep the same url
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def render_derivatives(name):
+    """
+    Resize the stored image `name` to every DERIVATIVE_WIDTHS width in
+    WebP and a JPEG (PNG if transparent) fallback. Touches storage only,
+    no database, so it can run in any worker. Derivative names carry a
+    hash of the source name and content: sources differing only by
+    extension, or a source rewritten in place, never share a file.
+    Returns (source_width, source_height, derivatives).
+    """
+    with default_storage.open(name, "rb") as source:
+        data = source.read()
+    digest = hashlib.md5(data, usedforsecurity=False)
+    digest.update(name.encode())
+    digest = digest.hexdigest()[:12]
+    image = Image.open(BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert(
+            "RGBA" if _fallback_format(image) == "png" else "RGB"
+        )
+    source_width, source_height = image.size
+    fallback = _fallback_format(image)
+    root = os.path.splitext(name)[0]
+
+    derivatives = []
+    for width in _target_widths(source_width):
+        height = max(1, round(source_height * width / source_width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in ("webp", fallback):
+            ext = "jpg" if fmt == "jpeg" else fmt
+            derivatives.append(
+                {
+                    "width": width,
+                    "height": height,
+                    "format": fmt,
+                    "name": _save(
+                        resized,
+                        f"{DERIVATIVE_DIR}/{root}-{digest}-{width}w.{ext}",
+                        fmt,
+                    ),
+                }
+            )
+    return source_width, source_height, derivatives
+
+
+def _delete_files(derivatives, keep=()):
+    for item in derivatives:
+        if item["name"] not in keep:
+            default_storage.delete(item["name"])
+
+
+def save_derivatives(name, source_width, source_height, derivatives):
+    """Record the derivatives, and delete the files they replace"""
+    previous = (
+        ImageDerivativeSet.objects.filter(source=name)
+        .values_list("derivatives", flat=True)
+        .first()
+    )
+    ImageDerivativeSet.objects.update_or_create(
+        source=name,
+        defaults={
+            "source_width": source_width,
+            "source_height": source_height,
+            "spec": DERIVATIVE_SPEC,
+            "derivatives": derivatives,
+        },
+    )
+    cache.set(_cache_key(name), derivatives, DERIVATIVE_CACHE_TIMEOUT)
+    if previous:
+        _delete_files(previous, keep={item["name"] for item in derivatives})
+    derivatives_ready.send(sender=ImageDerivativeSet, source=name)
+
+
+def source_in_use(name):
+    """True while any IMAGE_FIELDS row still points at the image"""
+    return any(
+        model.objects.filter(**{field: name}).exists()
+        for model, field in IMAGE_FIELDS
+    )
+
+
+def delete_derivatives(name):
+    """
+    Delete the derivative files and record of an image no longer used,
+    after it was replaced or its row deleted. Returns True if deleted.
+    """
+    if not name or source_in_use(name):
+        return False
+    derivative_set = ImageDerivativeSet.objects.filter(source=name).first()
+    if derivative_set is None:
+        return False
+    _delete_files(derivative_set.derivatives)
+    derivative_set.delete()
+    cache.delete(_cache_key(name))
+    return True
+
+
+def is_up_to_date(name):
+    return ImageDerivativeSet.objects.filter(
+        source=name, spec=DERIVATIVE_SPEC
+    ).exists()
+
+
+def generate_derivatives(name, force=False):
+    """Render and record derivatives of one image, returns True if made"""
+    if not name or (not force and is_up_to_date(name)):
+        return False
+    save_derivatives(name, *render_derivatives(name))
+    return True
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=UPLOAD_WORKERS,
+                thread_name_prefix="image-derivatives",
+            )
+    return _executor
+
+
+def _run_in_worker(task, name):
+    try:
+        task(name)
+    except Exception:
+        logger.exception(f"image derivatives failed for {name}")
+    finally:
+        connection.close()  # thread-local connection
+
+
+def schedule_derivatives(name):
+    """Generate off the request path once the upload is committed"""
+    if name:
+        transaction.on_commit(
+            lambda: _get_executor().submit(
+                _run_in_worker, generate_derivatives, name
+            )
+        )
+
+
+def schedule_derivative_cleanup(name):
+    """Delete a replaced or deleted image's derivatives after commit"""
+    if name:
+        transaction.on_commit(
+            lambda: _get_executor().submit(
+                _run_in_worker, delete_derivatives, name
+            )
+        )
+
+
+def pending_sources(force=False):
+    """Distinct stored image names without current derivatives"""
+    names = set()
+    for model, field in IMAGE_FIELDS:
+        names.update(
+            model.objects.exclude(**{f"{field}__isnull": True})
+            .exclude(**{field: ""})
+            .values_list(field, flat=True)
+            .distinct()
+        )
+    if not force:
+        names.difference_update(
+            ImageDerivativeSet.objects.filter(
+                spec=DERIVATIVE_SPEC
+            ).values_list("source", flat=True)
+        )
+    return sorted(names)
+
+
+def get_derivatives(names):
+    """
+    {name: derivatives} for the given image names, from the cache with
+    one query for the misses. Images without derivatives map to [].
+    """
+    names = {name for name in names if name}
+    keys = {_cache_key(name): name for name in names}
+    cached = cache.get_many(list(keys))
+    found = {keys[key]: value for key, value in cached.items()}
+
+    missing = names - found.keys()
+    if missing:
+        rows = dict(
+            ImageDerivativeSet.objects.filter(source__in=missing).values_list(
+                "source", "derivatives"
+            )
+        )
+        for name in missing:
+            found[name] = rows.get(name, [])
+            cache.set(
+                _cache_key(name),
+                found[name],
+                (
+                    DERIVATIVE_CACHE_TIMEOUT
+                    if name in rows
+                    else MISSING_CACHE_TIMEOUT
+                ),
+            )
+    return found
+
+
+def prefetch_derivatives(images):
+    """Warm the cache for a page of images before the template asks"""
+    get_derivatives(getattr(image, "name", image) for image in images)
+
+
+def derivative_url(item):
+    return default_storage.url(item["name"])
+
+
+def srcset(derivatives, fmt):
+    return ", ".join(
+        f"{derivative_url(item)} {item['width']}w"
+        for item in derivatives
+        if item["format"] == fmt
+    )
@@ -0,0 +1,476 @@
+# catalog/importer.py
+import csv
+import io
+import logging
+import os
+from decimal import Decimal, InvalidOperation
+
+import tablib
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from catalog.autocomplete import bump_version
+from catalog.facets import bump_generation
+from catalog.home_sections import HOME_SECTION_FLAGS
+from catalog.models import (
+    Brand,
+    Category,
+    Color,
+    Product,
+    ProductAttribute,
+    ProductSpecification,
+    ProductVariant,
+    VariantAttribute,
+)
+from catalog.search import update_search_vectors
+from catalog.summary import refresh_product_summaries
+from catalog.variants import invalidate_variant_matrices
+from core.utils.fragment_cache import invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500  # rows per upsert statement
+
+# One row per variant (or per product without variants):
+# sku,name,category,base_price,...,variant_sku,variant_price,
+# spec:<attribute slug>,option:<attribute slug>
+REQUIRED_COLUMNS = ("sku", "name", "category", "base_price")
+SPEC_PREFIX = "spec:"
+OPTION_PREFIX = "option:"
+
+
+# ==================== Cell parsers ====================
+def parse_text(value):
+    return value
+
+
+def parse_decimal(value):
+    try:
+        number = Decimal(value.replace(",", ""))
+    except InvalidOperation:
+        raise ValueError(f"{value!r} is not a number")
+    if not number.is_finite():  # nan, inf: comparing them raises
+        raise ValueError(f"{value!r} is not a number")
+    if number < 0:
+        raise ValueError(f"{value!r} is negative")
+    return number
+
+
+def parse_integer(value):
+    number = parse_decimal(value)
+    if number != number.to_integral_value():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+def parse_boolean(value):
+    value = value.casefold()
+    if value in ("1", "true", "yes", "y"):
+        return True
+    if value in ("0", "false", "no", "n"):
+        return False
+    raise ValueError(f"{value!r} is not yes/no")
+
+
+# column -> (model field, parser)
+PRODUCT_COLUMNS = {
+    "name": ("name", parse_text),
+    "short_description": ("short_description", parse_text),
+    "description": ("description", parse_text),
+    "base_price": ("base_price", parse_decimal),
+    "compare_price": ("compare_price", parse_decimal),
+    "cost_price": ("cost_price", parse_decimal),
+    "stock_quantity": ("stock_quantity", parse_integer),
+    "track_inventory": ("track_inventory", parse_boolean),
+    "allow_backorder": ("allow_backorder", parse_boolean),
+    "weight": ("weight", parse_decimal),
+    "meta_title": ("meta_title", parse_text),
+    "meta_description": ("meta_description", parse_text),
+    "meta_keywords": ("meta_keywords", parse_text),
+    "is_active": ("is_active", parse_boolean),
+    "is_featured": ("is_featured", parse_boolean),
+    "is_new": ("is_new", parse_boolean),
+    "is_free_shipping": ("is_free_shipping", parse_boolean),
+}
+VARIANT_COLUMNS = {
+    "variant_price": ("price", parse_decimal),
+    "variant_compare_price": ("compare_price", parse_decimal),
+    "variant_stock": ("stock_quantity", parse_integer),
+    "variant_weight": ("weight", parse_decimal),
+    "variant_is_default": ("is_default", parse_boolean),
+    "variant_is_active": ("is_active", parse_boolean),
+}
+
+
+def clean_cell(model, field_name, parser, raw):
+    """
+    Parsed value of a cell, raises ValueError. Blank cells are the
+    field's empty value, or an error when the field requires one.
+    """
+    field = model._meta.get_field(field_name)
+    value = "" if raw is None else str(raw).strip()
+    if not value:
+        if field.null:
+            return None
+        if field.has_default() or field.blank:
+            return field.get_default()
+        raise ValueError(f"{field_name} is required")
+
+    value = parser(value)
+    if field.max_length and len(value) > field.max_length:
+        raise ValueError(
+            f"{field_name} is longer than {field.max_length} characters"
+        )
+    return value
+
+
+# ==================== Reading ====================
+def read_rows(file, format=None):
+    """
+    (headers, iterator of (row number, cells)) of a csv or xlsx file.
+    CSV is streamed row by row. tablib has no streaming xlsx reader, so
+    a spreadsheet is loaded as a whole, then written in chunks.
+    """
+    format = format or os.path.splitext(file.name)[1].lstrip(".").lower()
+    if format == "csv":
+        reader = csv.reader(
+            io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        )
+        headers = next(reader, [])
+        rows = reader
+    elif format == "xlsx":
+        dataset = tablib.Dataset().load(file, format="xlsx")
+        headers = dataset.headers or []
+        rows = iter(dataset)
+    else:
+        raise ValueError(f"Unsupported format: {format!r}")
+
+    headers = [str(header or "").strip().lower() for header in headers]
+    return headers, enumerate(rows, start=2)  # row 1 is the header
+
+
+# ==================== Lookups ====================
+class Lookups:
+    """
+    In-memory slug -> pk maps of the reference rows, loaded once per
+    import, and the sku <-> slug map used to keep product slugs unique.
+    """
+
+    def __init__(self):
+        self.pks = {
+            "category": dict(Category.objects.values_list("slug", "pk")),
+            "brand": dict(Brand.objects.values_list("slug", "pk")),
+            "attribute": dict(
+                ProductAttribute.objects.values_list("slug", "pk")
+            ),
+        }
+        self.colors = {
+            name.casefold(): pk
+            for name, pk in Color.objects.values_list("name", "pk")
+        }
+        self.slugs = {}  # sku -> slug
+        self.skus = {}  # slug -> sku
+        for sku, slug in Product.objects.values_list("sku", "slug").iterator(
+            chunk_size=5000
+        ):
+            self.slugs[sku] = slug
+            self.skus[slug] = sku
+
+    def get(self, kind, slug):
+        pk = self.pks[kind].get(slug)
+        if pk is None:
+            raise ValueError(f"Unknown {kind} {slug!r}")
+        return pk
+
+    def product_slug(self, sku, name, slug=None):
+        """Existing slug of the sku, or a free one, like SlugMixin"""
+        current = self.slugs.get(sku)
+        if current and (not slug or slug == current):
+            return current
+
+        base = slug or slugify(name) or slugify(sku) or "product"
+        candidate, counter = base, 1
+        while self.skus.get(candidate, sku) != sku:
+            candidate = f"{base}-{counter}"
+            counter += 1
+
+        if current:
+            self.skus.pop(current, None)
+        self.slugs[sku] = candidate
+        self.skus[candidate] = sku
+        return candidate
+
+
+# ==================== Rows ====================
+class Columns:
+    """Which fields a file sets, known once the header is read"""
+
+    def __init__(self, headers, lookups):
+        missing = [name for name in REQUIRED_COLUMNS if name not in headers]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        self.headers = headers
+        self.product = {
+            column: spec
+            for column, spec in PRODUCT_COLUMNS.items()
+            if column in headers
+        }
+        self.has_slug = "slug" in headers
+        self.has_brand = "brand" in headers
+        self.has_variants = "variant_sku" in headers
+        self.variant = {
+            column: spec
+            for column, spec in VARIANT_COLUMNS.items()
+            if column in headers
+        }
+        self.specifications = {}
+        self.options = {}
+        for header in headers:
+            for prefix, target in (
+                (SPEC_PREFIX, self.specifications),
+                (OPTION_PREFIX, self.options),
+            ):
+                if header.startswith(prefix):
+                    slug = header[len(prefix) :]
+                    target[header] = lookups.get("attribute", slug)
+        if self.options and not self.has_variants:
+            raise ValueError("option: columns need a variant_sku column")
+
+    @property
+    def product_fields(self):
+        fields = [field for field, _ in self.product.values()]
+        fields += ["category"] + (["brand"] if self.has_brand else [])
+        if self.has_slug:
+            fields.append("slug")
+        return fields + ["updated_at"]
+
+    @property
+    def variant_fields(self):
+        fields = [field for field, _ in self.variant.values()]
+        if "price" not in fields:
+            fields.append("price")  # the product price, see parse_row
+        return ["product"] + fields + ["updated_at"]
+
+
+class ImportRow:
+    def __init__(self, number, sku):
+        self.number = number
+        self.sku = sku
+        self.product = {}
+        self.variant_sku = None
+        self.variant = {}
+        self.specifications = {}  # attribute id -> value
+        self.options = {}  # attribute id -> (value, color id)
+
+
+def parse_row(number, cells, columns, lookups):
+    """ImportRow of a file row, raises ValueError"""
+    values = dict(zip(columns.headers, cells))
+    sku = clean_cell(Product, "sku", parse_text, values.get("sku"))
+    if not sku:
+        raise ValueError("sku is required")
+
+    row = ImportRow(number, sku)
+    for column, (field, parser) in columns.product.items():
+        row.product[field] = clean_cell(
+            Product, field, parser, values.get(column)
+        )
+    row.product["slug"] = lookups.product_slug(
+        sku, row.product["name"], slugify(str(values.get("slug") or ""))
+    )
+    row.product["category_id"] = lookups.get(
+        "category", str(values.get("category") or "").strip()
+    )
+    if columns.has_brand:
+        brand = str(values.get("brand") or "").strip()
+        row.product["brand_id"] = (
+            lookups.get("brand", brand) if brand else None
+        )
+
+    for column, attribute_id in columns.specifications.items():
+        value = str(values.get(column) or "").strip()
+        if value:  # blank cells leave the specification alone
+            row.specifications[attribute_id] = value
+
+    if columns.has_variants:
+        row.variant_sku = str(values.get("variant_sku") or "").strip()
+    if row.variant_sku:
+        parse_variant(row, values, columns, lookups)
+    return row
+
+
+def parse_variant(row, values, columns, lookups):
+    """The variant columns of a row with a variant_sku"""
+    for column, (field, parser) in columns.variant.items():
+        row.variant[field] = clean_cell(
+            ProductVariant, field, parser, values.get(column)
+        )
+    if row.variant.get("price") is None:
+        row.variant["price"] = row.product["base_price"]
+    for column, attribute_id in columns.options.items():
+        value = str(values.get(column) or "").strip()
+        if value:
+            row.options[attribute_id] = (
+                value,
+                lookups.colors.get(value.casefold()),
+            )
+
+
+# ==================== Writing ====================
+def write_chunk(rows, columns):
+    """
+    Upsert the products, variants, specifications and variant options
+    of the rows, one INSERT ... ON CONFLICT per table. Later rows win
+    for a repeated sku. Returns the ids of the products written.
+    """
+    products = {}
+    for row in rows:
+        products[row.sku] = Product(sku=row.sku, **row.product)
+    Product.objects.bulk_create(
+        list(products.values()),
+        update_conflicts=True,
+        unique_fields=["sku"],
+        update_fields=columns.product_fields,
+    )
+
+    variants = {}
+    for row in rows:
+        if row.variant_sku:
+            variants[row.variant_sku] = ProductVariant(
+                product_id=products[row.sku].pk,
+                sku=row.variant_sku,
+                **row.variant,
+            )
+    if variants:
+        ProductVariant.objects.bulk_create(
+            list(variants.values()),
+            update_conflicts=True,
+            unique_fields=["sku"],
+            update_fields=columns.variant_fields,
+        )
+
+    specifications = {}
+    for row in rows:
+        product_id = products[row.sku].pk
+        for attribute_id, value in row.specifications.items():
+            specifications[product_id, attribute_id] = ProductSpecification(
+                product_id=product_id,
+                attribute_id=attribute_id,
+                value=value,
+                is_active=True,
+            )
+    if specifications:
+        ProductSpecification.objects.bulk_create(
+            list(specifications.values()),
+            update_conflicts=True,
+            unique_fields=["product", "attribute"],
+            update_fields=["value", "is_active", "updated_at"],
+        )
+
+    write_options(rows, variants)
+
+    product_ids = [product.pk for product in products.values()]
+    # bulk writes send no signals, refresh what they would have
+    update_search_vectors(Product.objects.filter(pk__in=product_ids))
+    refresh_product_summaries(product_ids)
+    transaction.on_commit(lambda: invalidate_variant_matrices(product_ids))
+    return product_ids
+
+
+def write_options(rows, variants):
+    """Upsert the variant options of the rows, variants by sku"""
+    options = {}
+    for row in rows:
+        for attribute_id, (value, color_id) in row.options.items():
+            variant_id = variants[row.variant_sku].pk
+            options[variant_id, attribute_id] = VariantAttribute(
+                variant_id=variant_id,
+                attribute_id=attribute_id,
+                value=value,
+                color_id=color_id,
+                is_active=True,
+            )
+    if options:
+        # a variant has one value per attribute, drop the replaced ones
+        replaced = Q()
+        for (variant_id, attribute_id), option in options.items():
+            replaced |= Q(
+                variant_id=variant_id, attribute_id=attribute_id
+            ) & ~Q(value=option.value)
+        VariantAttribute.objects.filter(replaced).delete()
+        VariantAttribute.objects.bulk_create(
+            list(options.values()),
+            update_conflicts=True,
+            unique_fields=["variant", "attribute", "value"],
+            update_fields=["color", "is_active", "updated_at"],
+        )
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.product_ids = set()
+        self.errors = []  # (row number, message)
+
+    @property
+    def imported(self):
+        return self.rows - len(self.errors)
+
+    def fail(self, number, error):
+        self.errors.append((number, str(error)))
+
+
+def _write(rows, columns, report):
+    """A failing chunk is retried row by row to find the bad rows"""
+    try:
+        with transaction.atomic():
+            report.product_ids.update(write_chunk(rows, columns))
+        return
+    except DatabaseError as e:
+        if len(rows) == 1:
+            report.fail(rows[0].number, e)
+            return
+
+    for row in rows:
+        _write([row], columns, report)
+
+
+def import_catalog(file, format=None, chunk_size=CHUNK_SIZE):
+    """
+    Upsert a catalog file in chunks of chunk_size rows. Categories,
+    brands and attributes are referenced by slug and must exist. Bad
+    rows are reported and skipped, the rest of the file is imported.
+    Raises ValueError when the file itself cannot be imported.
+    """
+    headers, rows = read_rows(file, format)
+    lookups = Lookups()
+    columns = Columns(headers, lookups)
+    report = ImportReport()
+
+    chunk = []
+    for number, cells in rows:
+        if not any(str(cell or "").strip() for cell in cells):
+            continue
+        report.rows += 1
+        try:
+            chunk.append(parse_row(number, cells, columns, lookups))
+        except ValueError as e:
+            report.fail(number, e)
+        if len(chunk) >= chunk_size:
+            _write(chunk, columns, report)
+            chunk = []
+    if chunk:
+        _write(chunk, columns, report)
+
+    if report.product_ids:
+        bump_generation()  # facets
+        bump_version()  # autocomplete
+        invalidate_tags(*(f"home:{section}" for section in HOME_SECTION_FLAGS))
+
+    logger.info(
+        f"{'*' * 10} catalog import: {report.imported}/{report.rows} rows, "
+        f"{len(report.errors)} errors\n"
+    )
+    return report
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from catalog.images import (
+    pending_sources,
+    render_derivatives,
+    save_derivatives,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate resized image derivatives for existing media"
+    # python manage.py generate_image_derivatives --workers 8
+    # Resumable: finished images are recorded as they complete and are
+    # skipped on the next run.
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Images resized in parallel",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Images queued per batch",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate images that already have derivatives",
+        )
+
+    def handle(self, *args, **options):
+        names = pending_sources(force=options["force"])
+        total = len(names)
+        self.stdout.write(f"{total} images to process")
+
+        done = failed = 0
+        batch_size = options["batch_size"]
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for start in range(0, total, batch_size):
+                futures = {
+                    pool.submit(render_derivatives, name): name
+                    for name in names[start : start + batch_size]
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        # recorded from this thread, workers only resize
+                        save_derivatives(name, *future.result())
+                        done += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f"✘ {name}: {e}")
+                self.stdout.write(f"{done + failed}/{total} processed")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✔ Generated derivatives for {done} images, {failed} failed"
+            )
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from catalog.feeds import default_base_url, generate_feeds, generate_sitemaps
+
+
+class Command(BaseCommand):
+    help = "Write gzip sitemap shards and the Google/Facebook catalog feeds"
+    # python manage.py generate_sitemaps
+    # Incremental: only shards with rows updated since the last run are
+    # rewritten, feeds are skipped when the catalog has not changed.
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rewrite every shard and feed",
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Absolute site url, defaults to the current Site domain",
+        )
+        parser.add_argument(
+            "--skip-feeds",
+            action="store_true",
+            help="Only write the sitemaps",
+        )
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"] or default_base_url()
+        full = options["full"]
+
+        rewritten = generate_sitemaps(base_url, full=full)
+        for section, shards in rewritten.items():
+            self.stdout.write(f"{section}: {shards} shards written")
+
+        if not options["skip_feeds"]:
+            written = generate_feeds(base_url, full=full)
+            if written is None:
+                self.stdout.write("Feeds unchanged, skipped")
+            else:
+                self.stdout.write(f"Feeds: {written} products written")
+
+        self.stdout.write(self.style.SUCCESS("✔ Sitemaps generated"))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.importer import CHUNK_SIZE, import_catalog
+from core.utils.cache import require_shared_cache
+
+
+class Command(BaseCommand):
+    help = "Import products, variants and specifications from CSV/XLSX"
+    # python manage.py import_catalog supplier.csv
+    # Columns: sku,name,category,base_price[,brand,...][,variant_sku,
+    # variant_price,...][,spec:<attribute slug>][,option:<attribute slug>]
+    # Existing skus are updated, bad rows are reported and skipped.
+    # Needs the shared cache: the import invalidates the web workers'
+    # facets, fragments, variant matrices and autocomplete through it.
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or XLSX file")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "xlsx"],
+            help="File format, defaults to the file extension",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows per batch",
+        )
+
+    def handle(self, *args, **options):
+        require_shared_cache()
+        try:
+            with open(options["path"], "rb") as file:
+                report = import_catalog(
+                    file,
+                    format=options["format"],
+                    chunk_size=options["chunk_size"],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for number, message in report.errors:
+            self.stderr.write(f"✘ row {number}: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✔ Imported {report.imported}/{report.rows} rows "
+                f"({len(report.product_ids)} products), "
+                f"{len(report.errors)} errors"
+            )
+        )
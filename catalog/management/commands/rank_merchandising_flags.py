@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from catalog.models import Product
+from catalog.ranking import (
+    RANKED_FLAGS,
+    apply_flag_changes,
+    compute_flag_changes,
+)
+from core.utils.cache import require_shared_cache
+
+
+class Command(BaseCommand):
+    help = "Recompute bestseller, top rated, most popular and new flags"
+    # python manage.py rank_merchandising_flags --dry-run
+    # python manage.py rank_merchandising_flags --flag is_bestseller
+    # Needs the shared cache: the web workers' home fragments are
+    # invalidated through it.
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show the changes without saving them",
+        )
+        parser.add_argument(
+            "--flag",
+            action="append",
+            choices=RANKED_FLAGS,
+            help="Only rank this flag (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        changes = compute_flag_changes(flags=options["flag"])
+
+        changed_ids = set()
+        for change in changes.values():
+            changed_ids |= change["add"] | change["remove"]
+        names = dict(
+            Product.objects.filter(pk__in=changed_ids).values_list(
+                "pk", "name"
+            )
+        )
+
+        for flag, change in changes.items():
+            self.stdout.write(
+                f"{flag}: +{len(change['add'])} -{len(change['remove'])}"
+            )
+            for sign, ids in (("+", change["add"]), ("-", change["remove"])):
+                for pk in sorted(ids):
+                    self.stdout.write(f"  {sign} {pk} {names.get(pk, '')}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run, nothing saved"))
+            return
+
+        require_shared_cache()
+        updated = apply_flag_changes(changes)
+        self.stdout.write(
+            self.style.SUCCESS(f"✔ Successfully updated {updated} flags")
+        )
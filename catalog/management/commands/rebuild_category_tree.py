@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.models import Category
+
+
+class Command(BaseCommand):
+    help = "Rebuild materialized category paths from parent links"
+    # python manage.py rebuild_category_tree
+
+    def handle(self, *args, **options):
+        total = Category.rebuild_paths()
+        self.stdout.write(
+            self.style.SUCCESS(f"✔ Successfully rebuilt {total} categories")
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from catalog.summary import rebuild_all_product_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild denormalized product card summaries"
+    # python manage.py rebuild_product_summaries
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Products per batch",
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_all_product_summaries(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"✔ Successfully rebuilt {total} summaries")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute product full-text search vectors"
+    # python manage.py rebuild_search_vectors
+
+    def handle(self, *args, **options):
+        total = update_search_vectors()
+        self.stdout.write(
+            self.style.SUCCESS(f"✔ Successfully indexed {total} products")
+        )
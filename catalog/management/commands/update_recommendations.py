@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from catalog.recommendations import update_recommendations
+
+
+class Command(BaseCommand):
+    help = "Update frequently bought together products from new orders"
+    # python manage.py update_recommendations  (daily cron)
+    # Only orders placed since the last run are counted, --full recounts
+    # everything and forgets orders cancelled after they were counted.
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recount every order",
+        )
+
+    def handle(self, *args, **options):
+        run = update_recommendations(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✔ Counted {run.orders} orders, "
+                f"refreshed {run.products} products"
+            )
+        )
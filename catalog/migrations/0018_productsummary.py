@@ -0,0 +1,134 @@
+# Generated by Django 6.0 on 2026-10-16 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Min, Sum
+
+
+def populate_product_summaries(apps, schema_editor):
+    """Same rows as catalog.summary.rebuild_all_product_summaries"""
+    Product = apps.get_model("catalog", "Product")
+    ProductImage = apps.get_model("catalog", "ProductImage")
+    ProductSummary = apps.get_model("catalog", "ProductSummary")
+    ProductVariant = apps.get_model("catalog", "ProductVariant")
+    ProductReview = apps.get_model("reviews", "ProductReview")
+
+    product_ids = list(
+        Product.objects.order_by("pk").values_list("pk", flat=True)
+    )
+    for start in range(0, len(product_ids), 1000):
+        chunk = product_ids[start : start + 1000]
+        ratings = {
+            row["product_id"]: row
+            for row in ProductReview.objects.filter(
+                product_id__in=chunk, is_approved=True
+            )
+            .values("product_id")
+            .annotate(avg=Avg("rating"), count=Count("id"))
+        }
+        images = {}
+        for product_id, image in ProductImage.objects.filter(
+            product_id__in=chunk, is_primary=True
+        ).values_list("product_id", "image"):
+            images.setdefault(product_id, image)
+        variants = {
+            row["product_id"]: row
+            for row in ProductVariant.objects.filter(
+                product_id__in=chunk, is_active=True
+            )
+            .values("product_id")
+            .annotate(
+                min_price=Min("price"),
+                max_price=Max("price"),
+                stock=Sum("stock_quantity"),
+            )
+        }
+
+        summaries = []
+        for product in Product.objects.filter(pk__in=chunk).values(
+            "id",
+            "base_price",
+            "track_inventory",
+            "stock_quantity",
+            "allow_backorder",
+        ):
+            rating = ratings.get(product["id"], {})
+            variant = variants.get(product["id"], {})
+            in_stock = (
+                not product["track_inventory"]
+                or product["allow_backorder"]
+                or product["stock_quantity"] > 0
+                or (variant.get("stock") or 0) > 0
+            )
+            summaries.append(
+                ProductSummary(
+                    product_id=product["id"],
+                    rating_avg=round(rating.get("avg") or 0, 2),
+                    review_count=rating.get("count") or 0,
+                    primary_image=images.get(product["id"], ""),
+                    min_price=variant.get("min_price")
+                    or product["base_price"],
+                    max_price=variant.get("max_price")
+                    or product["base_price"],
+                    in_stock=in_stock,
+                )
+            )
+        ProductSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0017_product_is_free_shipping"),
+        ("reviews", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSummary",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="catalog.product",
+                    ),
+                ),
+                (
+                    "rating_avg",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=3
+                    ),
+                ),
+                (
+                    "review_count",
+                    models.PositiveIntegerField(default=0),
+                ),
+                (
+                    "primary_image",
+                    models.ImageField(
+                        blank=True, max_length=255, upload_to=""
+                    ),
+                ),
+                (
+                    "min_price",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "max_price",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                ("in_stock", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Product summaries",
+            },
+        ),
+        migrations.RunPython(
+            populate_product_summaries, migrations.RunPython.noop
+        ),
+    ]
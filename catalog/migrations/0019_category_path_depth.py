@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-16 11:05
+
+from django.db import migrations, models
+
+
+def populate_category_paths(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    children = {}
+    for pk, parent_id in Category.objects.values_list("pk", "parent_id"):
+        children.setdefault(parent_id, []).append(pk)
+
+    paths = {}
+    stack = [(pk, "") for pk in children.get(None, [])]
+    while stack:
+        pk, parent_path = stack.pop()
+        paths[pk] = f"{parent_path}{pk}/"
+        stack.extend((child, paths[pk]) for child in children.get(pk, []))
+
+    Category.objects.bulk_update(
+        [
+            Category(pk=pk, path=path, depth=path.count("/") - 1)
+            for pk, path in paths.items()
+        ],
+        ["path", "depth"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0018_productsummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["path"],
+                name="catalog_category_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.RunPython(
+            populate_category_paths, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-16 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0019_category_path_depth"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-created_at", "id"],
+                name="catalog_pro_created_1e1fc4_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-16 20:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vectors(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    config = "simple"
+    document = (
+        SearchVector("name", "sku", weight="A", config=config)
+        + SearchVector("brand__name", weight="B", config=config)
+        + SearchVector(
+            "category__name", "category__bn_name", weight="B", config=config
+        )
+        + SearchVector(
+            "short_description", "meta_keywords", weight="C", config=config
+        )
+        + SearchVector("description", weight="D", config=config)
+    )
+    vector = (
+        Product.objects.filter(pk=OuterRef("pk"))
+        .annotate(document=document)
+        .values("document")[:1]
+    )
+    Product.objects.update(search_vector=Subquery(vector))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0020_product_created_at_id_index"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="catalog_product_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="catalog_product_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["sku"],
+                name="catalog_product_sku_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.RunPython(
+            populate_search_vectors, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-16 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0021_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageDerivativeSet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=255, unique=True)),
+                ("source_width", models.PositiveIntegerField(default=0)),
+                ("source_height", models.PositiveIntegerField(default=0)),
+                ("spec", models.CharField(max_length=100)),
+                ("derivatives", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
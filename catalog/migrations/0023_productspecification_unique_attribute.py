@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_specifications(apps, schema_editor):
+    """Keep the newest value of each product attribute"""
+    ProductSpecification = apps.get_model("catalog", "ProductSpecification")
+    duplicates = (
+        ProductSpecification.objects.filter(attribute__isnull=False)
+        .values("product", "attribute")
+        .annotate(keep=Max("pk"), rows=Count("pk"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates.iterator():
+        ProductSpecification.objects.filter(
+            product=row["product"], attribute=row["attribute"]
+        ).exclude(pk=row["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0022_imagederivativeset"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_specifications, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="productspecification",
+            constraint=models.UniqueConstraint(
+                fields=("product", "attribute"),
+                name="catalog_spec_product_attribute_uniq",
+            ),
+        ),
+    ]
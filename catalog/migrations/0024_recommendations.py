@@ -0,0 +1,121 @@
+# Generated by Django 6.0 on 2026-10-17 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0023_productspecification_unique_attribute"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductPairCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("orders", models.PositiveIntegerField(default=0)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="catalog.product",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="catalog.product",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "related"),
+                        name="catalog_pair_product_related_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="FrequentlyBoughtTogether",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveSmallIntegerField()),
+                ("orders", models.PositiveIntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bought_together",
+                        to="catalog.product",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bought_with",
+                        to="catalog.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Frequently bought together",
+                "ordering": ["product", "position"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "position"),
+                        name="catalog_fbt_product_position_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RecommendationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_order_id",
+                    models.PositiveBigIntegerField(default=0),
+                ),
+                ("orders", models.PositiveIntegerField(default=0)),
+                ("products", models.PositiveIntegerField(default=0)),
+                ("full", models.BooleanField(default=False)),
+                ("finished_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["-finished_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 09:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0024_recommendations"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="catalog_product_sku_trgm",
+        ),
+    ]
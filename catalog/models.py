@@ -1,7 +1,12 @@
 # product, category, attributes
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.utils.text import slugify
 
 from core.models import BaseModel
@@ -30,33 +35,133 @@ class Category(BaseModel):
     is_featured = models.BooleanField(default=True)
     is_main_menu = models.BooleanField(default=False)
 
+    # Materialized path of ancestor ids, e.g. "1/5/12/" (self is last)
+    path = models.CharField(
+        max_length=255, blank=True, default="", editable=False
+    )
+    depth = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["name"]
         verbose_name_plural = "Categories"
+        indexes = [
+            models.Index(
+                fields=["path"],
+                name="catalog_category_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     # property
     def name_with_parents(self):
-        full_path = [self.name]
-        parent = self.parent
-        while parent:
-            full_path.append(parent.name)
-            parent = parent.parent
-        return " > ".join(full_path[::-1])
+        if not self.path:
+            return self.name
+        return " > ".join(
+            category.name for category in self.get_ancestors(include_self=True)
+        )
 
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if (
+            self.pk
+            and self.parent
+            and self.path
+            and self.parent.path.startswith(self.path)
+        ):
+            raise ValidationError(
+                {"parent": "A category cannot be moved under itself."}
+            )
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._update_path()
+
+    def _update_path(self):
+        """Recompute own path and rewrite the subtree if it moved"""
+        parent_path = ""
+        if self.parent_id:
+            parent_path = (
+                Category.objects.filter(pk=self.parent_id)
+                .values_list("path", flat=True)
+                .first()
+                or ""
+            )
+
+        old_path = self.path
+        new_path = f"{parent_path}{self.pk}/"
+        if new_path == old_path:
+            return
+
+        depth = new_path.count("/") - 1
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=depth)
+        if old_path:
+            # moved: rewrite every descendant prefix in one statement
+            Category.objects.filter(path__startswith=old_path).exclude(
+                pk=self.pk
+            ).update(
+                path=Concat(
+                    Value(new_path), Substr("path", len(old_path) + 1)
+                ),
+                depth=F("depth") + (depth - (old_path.count("/") - 1)),
+            )
+        self.path = new_path
+        self.depth = depth
+
+    @property
+    def ancestor_ids(self):
+        return [int(pk) for pk in self.path.split("/") if pk]
+
+    def get_ancestors(self, include_self=False):
+        """Ancestors root first (breadcrumb), one query"""
+        ids = self.ancestor_ids
+        if not include_self:
+            ids = ids[:-1]
+        return Category.objects.filter(pk__in=ids).order_by("depth")
+
+    def get_descendants(self, include_self=False):
+        """All descendant categories, one query"""
+        if not self.path:
+            return Category.objects.none()
+        queryset = Category.objects.filter(path__startswith=self.path)
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
+
+    def get_subtree_products(self):
+        """Products of this category and all descendants, one query"""
+        if not self.path:
+            return Product.objects.filter(category=self)
+        return Product.objects.filter(category__path__startswith=self.path)
 
     def get_all_children(self):
         """Get all descendant categories"""
-        children = list(self.children.all())
-        for child in list(children):
-            children.extend(child.get_all_children())
-        return children
+        return list(self.get_descendants())
+
+    @classmethod
+    def rebuild_paths(cls):
+        """Recompute path/depth for the whole tree from parent links"""
+        children = {}
+        for pk, parent_id in cls.objects.values_list("pk", "parent_id"):
+            children.setdefault(parent_id, []).append(pk)
+
+        paths = {}
+        stack = [(pk, "") for pk in children.get(None, [])]
+        while stack:
+            pk, parent_path = stack.pop()
+            paths[pk] = f"{parent_path}{pk}/"
+            stack.extend((child, paths[pk]) for child in children.get(pk, []))
+
+        categories = [
+            cls(pk=pk, path=path, depth=path.count("/") - 1)
+            for pk, path in paths.items()
+        ]
+        cls.objects.bulk_update(categories, ["path", "depth"], batch_size=500)
+        return len(categories)
 
 
 # ==================== Product Models ====================
@@ -213,6 +318,9 @@ class Product(BaseModel):
     view_count = models.PositiveIntegerField(default=0)
     sale_count = models.PositiveIntegerField(default=0)
 
+    # Search, maintained by catalog.signals.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
@@ -220,6 +328,15 @@ class Product(BaseModel):
             models.Index(fields=["sku"]),
             models.Index(fields=["-created_at"]),
             models.Index(fields=["is_active", "-created_at"]),
+            models.Index(fields=["-created_at", "id"]),  # keyset pages
+            GinIndex(
+                fields=["search_vector"], name="catalog_product_search_gin"
+            ),
+            GinIndex(
+                fields=["name"],
+                name="catalog_product_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
         ]
 
     def __str__(self):
@@ -335,6 +452,13 @@ class ProductSpecification(BaseModel):
 
     class Meta:
         ordering = []
+        constraints = [
+            # one value per attribute, the key of catalog imports
+            models.UniqueConstraint(
+                fields=["product", "attribute"],
+                name="catalog_spec_product_attribute_uniq",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - \
@@ -445,3 +569,132 @@ class VariantAttribute(BaseModel):
     def __str__(self):
         return f"{self.variant} - \
             {self.attribute.name if self.attribute else ''} - {self.value}"
+
+
+# ==================== Product Summary ====================
+class ProductSummary(models.Model):
+    """
+    Denormalized product card data (rating, image, price range, stock).
+    Kept in sync by catalog.signals.summary, rebuild with:
+    python manage.py rebuild_product_summaries
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary",
+    )
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    primary_image = models.ImageField(max_length=255, blank=True)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2)
+    in_stock = models.BooleanField(default=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Product summaries"
+
+    def __str__(self):
+        return f"{self.product_id} - summary"
+
+
+# ==================== Image Derivatives ====================
+class ImageDerivativeSet(models.Model):
+    """
+    Resized WebP/JPEG copies of one uploaded image, keyed by its storage
+    name. Generated by catalog.images, backfill with:
+    python manage.py generate_image_derivatives
+    """
+
+    source = models.CharField(max_length=255, unique=True)
+    source_width = models.PositiveIntegerField(default=0)
+    source_height = models.PositiveIntegerField(default=0)
+    # widths/formats/quality the derivatives were made with
+    spec = models.CharField(max_length=100)
+    # [{"width", "height", "format", "name"}], narrowest first
+    derivatives = models.JSONField(default=list)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} - derivatives"
+
+
+# ==================== Recommendations ====================
+class ProductPairCount(models.Model):
+    """
+    Sparse item-item co-occurrence matrix: number of orders containing
+    both products, stored in both directions. Maintained by
+    catalog.recommendations only.
+    """
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="+"
+    )
+    related = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="+"
+    )
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "related"],
+                name="catalog_pair_product_related_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} + {self.related_id}: {self.orders}"
+
+
+class FrequentlyBoughtTogether(models.Model):
+    """
+    Top products ordered together with a product, read by the detail
+    page. Rebuilt from ProductPairCount, run daily:
+    python manage.py update_recommendations
+    """
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="bought_together"
+    )
+    related = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="bought_with"
+    )
+    position = models.PositiveSmallIntegerField()
+    orders = models.PositiveIntegerField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["product", "position"]
+        verbose_name_plural = "Frequently bought together"
+        constraints = [
+            # also the index of the detail page query
+            models.UniqueConstraint(
+                fields=["product", "position"],
+                name="catalog_fbt_product_position_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} #{self.position}"
+
+
+class RecommendationRun(models.Model):
+    """One update_recommendations run, the last one is the high-water"""
+
+    last_order_id = models.PositiveBigIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+    products = models.PositiveIntegerField(default=0)
+    full = models.BooleanField(default=False)
+    finished_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-finished_at"]
+
+    def __str__(self):
+        return f"{self.finished_at:%Y-%m-%d %H:%M} - {self.orders} orders"
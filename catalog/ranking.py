@@ -0,0 +1,193 @@
+# catalog/ranking.py
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from catalog.home_sections import HOME_SECTION_FLAGS
+from catalog.models import Product
+from core.utils.fragment_cache import invalidate_tags
+from orders.models import OrderItem
+from reviews.models import ProductReview
+
+logger = logging.getLogger(__name__)
+
+SALES_WINDOW_DAYS = 30
+NEW_WINDOW_DAYS = 30
+EXCLUDED_ORDER_STATUSES = ["cancelled", "refunded"]
+
+BESTSELLER_LIMIT = 24
+TOP_RATED_LIMIT = 24
+MOST_POPULAR_LIMIT = 1  # the home page shows a single most popular box
+NEW_LIMIT = 24
+
+# bayesian prior: a rating counts as this many average reviews
+RATING_PRIOR_REVIEWS = 5
+MIN_REVIEWS = 3
+
+# a sale in the window weighs as much as this many product views
+SALE_VIEW_WEIGHT = 50
+
+RANKED_FLAGS = ["is_bestseller", "is_top_rated", "is_most_popular", "is_new"]
+
+
+def window_sales(since):
+    """Units sold per product since, as a queryset of product_id/units"""
+    return (
+        OrderItem.objects.filter(order__created_at__gte=since)
+        .exclude(order__order_status__in=EXCLUDED_ORDER_STATUSES)
+        .values("product_id")
+        .annotate(units=Sum("quantity"))
+    )
+
+
+def rank_bestsellers(now):
+    since = now - timedelta(days=SALES_WINDOW_DAYS)
+    return list(
+        window_sales(since)
+        .filter(product__is_active=True)
+        .order_by("-units", "product_id")
+        .values_list("product_id", flat=True)[:BESTSELLER_LIMIT]
+    )
+
+
+def rank_top_rated(now):
+    """Bayesian average, so 5 stars from one review does not win"""
+    approved = ProductReview.objects.filter(
+        is_approved=True, product__is_active=True
+    )
+    mean = approved.aggregate(mean=Avg("rating"))["mean"]
+    if mean is None:
+        return []
+
+    prior = RATING_PRIOR_REVIEWS
+    return list(
+        approved.values("product_id")
+        .annotate(reviews=Count("id"), total=Sum("rating"))
+        .filter(reviews__gte=MIN_REVIEWS)
+        .annotate(
+            score=ExpressionWrapper(
+                (Value(prior * float(mean)) + F("total"))
+                / (Value(prior) + F("reviews")),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-score", "product_id")
+        .values_list("product_id", flat=True)[:TOP_RATED_LIMIT]
+    )
+
+
+def rank_most_popular(now):
+    since = now - timedelta(days=SALES_WINDOW_DAYS)
+    units = Subquery(
+        window_sales(since)
+        .filter(product_id=OuterRef("pk"))
+        .values("units")[:1],
+        output_field=IntegerField(),
+    )
+    return list(
+        Product.objects.filter(is_active=True)
+        .annotate(
+            score=ExpressionWrapper(
+                F("view_count") + Coalesce(units, 0) * SALE_VIEW_WEIGHT,
+                output_field=IntegerField(),
+            )
+        )
+        .filter(score__gt=0)
+        .order_by("-score", "pk")
+        .values_list("pk", flat=True)[:MOST_POPULAR_LIMIT]
+    )
+
+
+def rank_new(now):
+    since = now - timedelta(days=NEW_WINDOW_DAYS)
+    return list(
+        Product.objects.filter(is_active=True)
+        .annotate(released=Coalesce("published_at", "created_at"))
+        .filter(released__gte=since)
+        .order_by("-released", "pk")
+        .values_list("pk", flat=True)[:NEW_LIMIT]
+    )
+
+
+RANKERS = {
+    "is_bestseller": rank_bestsellers,
+    "is_top_rated": rank_top_rated,
+    "is_most_popular": rank_most_popular,
+    "is_new": rank_new,
+}
+
+
+def compute_flag_changes(flags=None, now=None):
+    """
+    Target sets per flag compared with the current ones:
+    {flag: {"add": {ids}, "remove": {ids}}}
+    """
+    flags = flags or RANKED_FLAGS
+    now = now or timezone.now()
+
+    current = {flag: set() for flag in flags}
+    flagged = Q()
+    for flag in flags:
+        flagged |= Q(**{flag: True})
+    for row in Product.objects.filter(flagged).values("pk", *flags):
+        for flag in flags:
+            if row[flag]:
+                current[flag].add(row["pk"])
+
+    changes = {}
+    for flag in flags:
+        target = set(RANKERS[flag](now))
+        changes[flag] = {
+            "add": target - current[flag],
+            "remove": current[flag] - target,
+        }
+    return changes
+
+
+def apply_flag_changes(changes):
+    """
+    Bulk UPDATEs in one transaction, returns rows changed. updated_at
+    moves with the flags, the API's validators are built from it.
+    """
+    updated = 0
+    with transaction.atomic():
+        for flag, change in changes.items():
+            if change["add"]:
+                updated += Product.objects.filter(pk__in=change["add"]).update(
+                    **{flag: True}, updated_at=Now()
+                )
+            if change["remove"]:
+                updated += Product.objects.filter(
+                    pk__in=change["remove"]
+                ).update(**{flag: False}, updated_at=Now())
+
+        # queryset.update() sends no signals, clear the home sections here
+        sections = {
+            flag: section for section, flag in HOME_SECTION_FLAGS.items()
+        }
+        tags = [
+            f"home:{sections[flag]}"
+            for flag, change in changes.items()
+            if change["add"] or change["remove"]
+        ]
+        if tags:
+            transaction.on_commit(lambda: invalidate_tags(*tags))
+
+    logger.info(f"{'*' * 10} merchandising flags updated: {updated}\n")
+    return updated
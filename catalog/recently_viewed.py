@@ -0,0 +1,108 @@
+# catalog/recently_viewed.py
+"""
+Recently viewed products of a visitor: a bounded, most recent first list
+of product ids, in the cache for a user and in a signed cookie for an
+anonymous visitor, who needs no session for it. A view costs one cache
+read and write or a cookie, never a database row.
+"""
+import binascii
+from array import array
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from catalog.images import prefetch_derivatives
+from catalog.models import Product
+
+RECENT_LIMIT = 20  # product ids kept per visitor
+RAIL_SIZE = 8  # cards a rail shows
+CACHE_PREFIX = "recently_viewed"
+COOKIE_NAME = "recently_viewed"
+MAX_PRODUCT_ID = 2**32 - 1  # what the encoding holds
+
+
+def encode(product_ids):
+    """4 bytes per id, 80 bytes for a full list"""
+    return array("I", product_ids).tobytes()
+
+
+def decode(value):
+    product_ids = array("I")
+    if value:
+        product_ids.frombytes(value)
+    return product_ids.tolist()
+
+
+def cache_key(request):
+    """Key of a user's list, None for an anonymous visitor"""
+    if request.user.is_authenticated:
+        return f"{CACHE_PREFIX}:user:{request.user.pk}"
+    return None
+
+
+def _cookie_ids(request):
+    value = request.get_signed_cookie(COOKIE_NAME, default=None)
+    try:
+        return decode(urlsafe_b64decode(value)) if value else []
+    except (binascii.Error, ValueError):
+        return []
+
+
+def viewed_product_ids(request):
+    key = cache_key(request)
+    if key is None:
+        return _cookie_ids(request)
+    return decode(cache.get(key))
+
+
+def remember_product(request, response, product_id):
+    """
+    Move the product to the front of the visitor's list, an anonymous
+    visitor's list goes back in the response's cookie
+    """
+    if not 0 < product_id <= MAX_PRODUCT_ID:
+        return
+    product_ids = viewed_product_ids(request)
+    if product_ids[:1] == [product_id]:
+        return  # a reload changes nothing
+    product_ids = [
+        product_id,
+        *(pk for pk in product_ids if pk != product_id),
+    ]
+    value = encode(product_ids[:RECENT_LIMIT])
+    key = cache_key(request)
+    if key is not None:
+        cache.set(key, value, settings.SESSION_COOKIE_AGE)
+        return
+    response.set_signed_cookie(
+        COOKIE_NAME,
+        urlsafe_b64encode(value).decode(),
+        max_age=settings.SESSION_COOKIE_AGE,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def product_cards(product_ids, limit=RAIL_SIZE):
+    """
+    Active products with their summaries in the given order, one query.
+    Inactive or unknown ids are skipped.
+    """
+    products = (
+        Product.objects.filter(is_active=True, summary__isnull=False)
+        .select_related("summary")
+        .in_bulk(product_ids)
+    )
+    cards = [products[pk] for pk in product_ids if pk in products][:limit]
+    prefetch_derivatives(product.summary.primary_image for product in cards)
+    return cards
+
+
+def recently_viewed_cards(request, exclude=()):
+    """Cards of the visitor's rail, without the excluded product ids"""
+    exclude = set(exclude)
+    return product_cards(
+        [pk for pk in viewed_product_ids(request) if pk not in exclude]
+    )
@@ -0,0 +1,188 @@
+# catalog/recommendations.py
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import groupby, islice, permutations
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from catalog.models import (
+    FrequentlyBoughtTogether,
+    ProductPairCount,
+    RecommendationRun,
+)
+from catalog.ranking import EXCLUDED_ORDER_STATUSES
+from orders.models import OrderItem
+
+logger = logging.getLogger(__name__)
+
+TOP_RELATED = 8  # related products kept per product
+MAX_BASKET = 30  # bigger (wholesale) orders say little about affinity
+# orders younger than this may still be in an uncommitted transaction
+# with a lower id than committed ones, leave them to the next run
+SETTLE_TIME = timedelta(minutes=10)
+WINDOW_ORDERS = 20_000  # orders counted in memory before a merge
+CHUNK_SIZE = 500  # products per upsert / top-N refresh
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def order_baskets(after_id, before):
+    """(order id, product ids) of counted orders, streamed by order id"""
+    rows = (
+        OrderItem.objects.filter(
+            order_id__gt=after_id, order__created_at__lt=before
+        )
+        .exclude(order__order_status__in=EXCLUDED_ORDER_STATUSES)
+        .order_by("order_id")
+        .values_list("order_id", "product_id")
+        .iterator(chunk_size=5000)
+    )
+    for order_id, items in groupby(rows, key=lambda row: row[0]):
+        yield order_id, {product_id for _, product_id in items}
+
+
+def count_pairs(baskets):
+    """
+    Sparse co-occurrence counts of the baskets:
+    {product id: Counter({related id: orders})}, both directions
+    """
+    matrix = defaultdict(Counter)
+    for _, products in baskets:
+        if 1 < len(products) <= MAX_BASKET:
+            for product_id, related_id in permutations(products, 2):
+                matrix[product_id][related_id] += 1
+    return matrix
+
+
+def merge_pair_counts(matrix):
+    """Add the counts to the stored matrix"""
+    for product_ids in _chunks(matrix, CHUNK_SIZE):
+        stored = {
+            (product_id, related_id): orders
+            for product_id, related_id, orders in (
+                ProductPairCount.objects.filter(
+                    product_id__in=product_ids
+                ).values_list("product_id", "related_id", "orders")
+            )
+        }
+        ProductPairCount.objects.bulk_create(
+            [
+                ProductPairCount(
+                    product_id=product_id,
+                    related_id=related_id,
+                    orders=stored.get((product_id, related_id), 0) + orders,
+                )
+                for product_id in product_ids
+                for related_id, orders in matrix[product_id].items()
+            ],
+            update_conflicts=True,
+            unique_fields=["product", "related"],
+            update_fields=["orders"],
+        )
+
+
+def refresh_top_related(product_ids):
+    """Rewrite the top TOP_RELATED related products of these products"""
+    for chunk in _chunks(sorted(product_ids), CHUNK_SIZE):
+        ranked = (
+            ProductPairCount.objects.filter(
+                product_id__in=chunk, related__is_active=True
+            )
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=[F("product_id")],
+                    order_by=[F("orders").desc(), F("related_id").asc()],
+                )
+            )
+            .filter(position__lte=TOP_RELATED)
+            .values_list("product_id", "related_id", "position", "orders")
+        )
+        rows = [
+            FrequentlyBoughtTogether(
+                product_id=product_id,
+                related_id=related_id,
+                position=position,
+                orders=orders,
+            )
+            for product_id, related_id, position, orders in ranked
+        ]
+        with transaction.atomic():
+            FrequentlyBoughtTogether.objects.filter(
+                product_id__in=chunk
+            ).delete()
+            FrequentlyBoughtTogether.objects.bulk_create(rows)
+
+
+def update_recommendations(full=False):
+    """
+    Count the product pairs of orders placed since the last run and
+    refresh the top related products of every product they touch.
+    full: recount every order, also forgets cancelled ones.
+    Each window of orders is merged, refreshed and recorded as the run's
+    high-water in one transaction: a run stopped halfway is resumed by
+    the next one, no order is counted twice.
+    Returns the RecommendationRun.
+    """
+    last_run = RecommendationRun.objects.order_by("-pk").first()
+    after_id = 0 if full or last_run is None else last_run.last_order_id
+    before = timezone.now() - SETTLE_TIME
+
+    stale = set()
+    with transaction.atomic():
+        run = RecommendationRun.objects.create(
+            last_order_id=after_id, full=full
+        )
+        if full:
+            stale.update(
+                FrequentlyBoughtTogether.objects.values_list(
+                    "product_id", flat=True
+                ).distinct()
+            )
+            ProductPairCount.objects.all().delete()
+
+    touched = set()
+    baskets = order_baskets(after_id, before)
+    while window := list(islice(baskets, WINDOW_ORDERS)):
+        matrix = count_pairs(window)
+        with transaction.atomic():
+            merge_pair_counts(matrix)
+            refresh_top_related(matrix)
+            run.last_order_id = window[-1][0]
+            run.orders += len(window)
+            run.save(update_fields=["last_order_id", "orders"])
+        touched.update(matrix)
+
+    # products no order pairs anymore, their lists empty out
+    refresh_top_related(stale - touched)
+    touched |= stale
+    run.products = len(touched)
+    run.finished_at = timezone.now()
+    run.save(update_fields=["products", "finished_at"])
+    logger.info(
+        f"{'*' * 10} recommendations: {run.orders} orders, "
+        f"{len(touched)} products refreshed\n"
+    )
+    return run
+
+
+def bought_together(product_id):
+    """Related products of the detail page, one indexed query"""
+    return [
+        row.related
+        for row in FrequentlyBoughtTogether.objects.filter(
+            product_id=product_id,
+            related__is_active=True,
+            related__summary__isnull=False,
+        )
+        .select_related("related__summary")
+        .order_by("position")
+    ]
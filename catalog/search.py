@@ -0,0 +1,110 @@
+# catalog/search.py
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, OuterRef, Q, Subquery
+
+from catalog.models import Product
+
+# "simple" keeps Bengali and English tokens as-is (no stemmer for bn)
+SEARCH_CONFIG = "simple"
+
+TSQUERY_SPECIAL_CHARS = re.compile(r"[&|!():*<>'\"\\]")
+
+
+def product_search_vector():
+    """Weighted document: name/sku > brand/category > descriptions"""
+    return (
+        SearchVector("name", "sku", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("brand__name", weight="B", config=SEARCH_CONFIG)
+        + SearchVector(
+            "category__name",
+            "category__bn_name",
+            weight="B",
+            config=SEARCH_CONFIG,
+        )
+        + SearchVector(
+            "short_description",
+            "meta_keywords",
+            weight="C",
+            config=SEARCH_CONFIG,
+        )
+        + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset=None):
+    """
+    Recompute search_vector for the given products in one UPDATE.
+    Joins are not allowed in UPDATE ... SET, so the vector is built
+    in a correlated subquery.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    vector = (
+        Product.objects.filter(pk=OuterRef("pk"))
+        .annotate(document=product_search_vector())
+        .values("document")[:1]
+    )
+    return queryset.update(search_vector=Subquery(vector))
+
+
+def build_search_query(term):
+    """Prefix tsquery: every word must match, last one may be partial"""
+    words = TSQUERY_SPECIAL_CHARS.sub(" ", term).split()
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+def search_condition(term):
+    """
+    Q matching term by full text, SKU or trigram similarity (typo
+    tolerance), None for an empty term. Every arm has an index: the
+    exact SKU the sku btree, any other casing of it is in the vector.
+    """
+    term = (term or "").strip()
+    query = build_search_query(term)
+    if query is None:
+        return None
+
+    return (
+        Q(search_vector=query)
+        | Q(sku=term)
+        | Q(name__trigram_word_similar=term)
+    )
+
+
+def filter_products(queryset, term):
+    """Keep products matching term, ordering is left untouched"""
+    condition = search_condition(term)
+    if condition is None:
+        return queryset
+    return queryset.filter(condition)
+
+
+def search_products(queryset, term):
+    """filter_products ordered by relevance"""
+    term = (term or "").strip()
+    query = build_search_query(term)
+    if query is None:
+        return queryset.none()
+
+    return (
+        filter_products(queryset, term)
+        .annotate(
+            rank=SearchRank(F("search_vector"), query),
+            similarity=TrigramWordSimilarity(term, "name"),
+        )
+        .order_by("-rank", "-similarity", "-created_at")
+    )
@@ -0,0 +1,53 @@
+# catalog/signals/autocomplete.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.autocomplete import (
+    brand_item,
+    category_item,
+    product_item,
+    update_entry,
+)
+from catalog.models import Brand, Category, Product
+
+
+def apply(item, is_active):
+    entry_id, payload, keys = item
+    if is_active:
+        transaction.on_commit(lambda: update_entry(entry_id, payload, keys))
+    else:
+        transaction.on_commit(lambda: update_entry(entry_id))
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        item = product_item(
+            instance.pk, instance.name, instance.sku, instance.slug
+        )
+        apply(item, instance.is_active)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        item = category_item(
+            instance.pk, instance.name, instance.bn_name, instance.slug
+        )
+        apply(item, instance.is_active)
+
+
+@receiver(post_save, sender=Brand)
+def brand_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        item = brand_item(instance.pk, instance.name, instance.slug)
+        apply(item, instance.is_active)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Brand)
+def catalog_entry_deleted(sender, instance, **kwargs):
+    entry_id = (sender._meta.model_name, instance.pk)
+    transaction.on_commit(lambda: update_entry(entry_id))
@@ -0,0 +1,104 @@
+# catalog/signals/facets.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from catalog.facets import bump_generation, refresh_product_facets
+from catalog.images import derivatives_ready
+from catalog.models import (
+    Brand,
+    Category,
+    Color,
+    Product,
+    ProductAttribute,
+    ProductImage,
+    ProductSpecification,
+    ProductVariant,
+    VariantAttribute,
+)
+from reviews.models import ProductReview
+
+
+def schedule_facet_refresh(product_id, stale_category_ids=()):
+    if product_id:
+        transaction.on_commit(
+            lambda: refresh_product_facets([product_id], stale_category_ids)
+        )
+
+
+@receiver(pre_save, sender=Product)
+def remember_category(sender, instance, raw=False, **kwargs):
+    """A moved product has to leave its old category's indexes"""
+    if not raw and instance.pk:
+        instance._facet_category_id = (
+            Product.objects.filter(pk=instance.pk)
+            .values_list("category_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        previous = getattr(instance, "_facet_category_id", None)
+        stale = [previous] if previous != instance.category_id else []
+        schedule_facet_refresh(instance.pk, stale)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    schedule_facet_refresh(instance.pk, [instance.category_id])
+
+
+@receiver(post_save, sender=ProductSpecification)
+@receiver(post_delete, sender=ProductSpecification)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def product_child_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_facet_refresh(instance.product_id)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductReview)
+def product_card_changed(sender, instance, raw=False, **kwargs):
+    """
+    No facet value changes, but the card does: the refresh moves the
+    index's changed_at, the category page validator
+    """
+    if not raw:
+        schedule_facet_refresh(instance.product_id)
+
+
+@receiver(derivatives_ready)
+def product_image_resized(sender, source, **kwargs):
+    """Cards of the image get their resized copies"""
+    for product_id in Product.objects.filter(
+        summary__primary_image=source
+    ).values_list("pk", flat=True):
+        schedule_facet_refresh(product_id)
+
+
+@receiver(post_save, sender=VariantAttribute)
+@receiver(post_delete, sender=VariantAttribute)
+def variant_attribute_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        product_id = (
+            ProductVariant.objects.filter(pk=instance.variant_id)
+            .values_list("product_id", flat=True)
+            .first()
+        )
+        schedule_facet_refresh(product_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Color)
+@receiver(post_save, sender=ProductAttribute)
+def facet_source_changed(sender, raw=False, **kwargs):
+    """Tree moves and renames are rare, rebuild everything lazily"""
+    if not raw:
+        transaction.on_commit(bump_generation)
@@ -0,0 +1,98 @@
+# catalog/signals/fragments.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from catalog.home_sections import HOME_SECTION_FLAGS
+from catalog.images import derivatives_ready
+from catalog.models import Category, Product, ProductFeature, ProductImage
+from core.utils.fragment_cache import invalidate_tags
+
+
+def section_tags(flags):
+    """Tag "home:<section>" of every section the flags put a product in"""
+    return {
+        f"home:{section}"
+        for section, flag in HOME_SECTION_FLAGS.items()
+        if flags.get(flag)
+    }
+
+
+def product_flags(product):
+    return {
+        flag: getattr(product, flag) for flag in HOME_SECTION_FLAGS.values()
+    }
+
+
+def schedule_invalidation(tags):
+    """After commit, so a rebuild never caches uncommitted data"""
+    if tags:
+        transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+@receiver(pre_save, sender=Product)
+def remember_sections(sender, instance, raw=False, **kwargs):
+    """Unflagging a product has to clear the sections it was in"""
+    if not raw and instance.pk:
+        instance._home_flags = (
+            Product.objects.filter(pk=instance.pk)
+            .values(*HOME_SECTION_FLAGS.values())
+            .first()
+        ) or {}
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        previous = getattr(instance, "_home_flags", {})
+        schedule_invalidation(
+            section_tags(product_flags(instance)) | section_tags(previous)
+        )
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    schedule_invalidation(section_tags(product_flags(instance)))
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        flags = (
+            Product.objects.filter(pk=instance.product_id)
+            .values(*HOME_SECTION_FLAGS.values())
+            .first()
+        )
+        schedule_invalidation(section_tags(flags or {}))
+
+
+@receiver(derivatives_ready)
+def product_image_resized(sender, source, **kwargs):
+    """Cards rendered before the derivatives existed use the original"""
+    tags = set()
+    for flags in Product.objects.filter(summary__primary_image=source).values(
+        *HOME_SECTION_FLAGS.values()
+    ):
+        tags |= section_tags(flags)
+    schedule_invalidation(tags)
+
+
+@receiver(post_save, sender=ProductFeature)
+@receiver(post_delete, sender=ProductFeature)
+def product_feature_changed(sender, instance, raw=False, **kwargs):
+    """Features are only shown in the most popular box"""
+    if not raw and (
+        Product.objects.filter(
+            pk=instance.product_id, is_most_popular=True
+        ).exists()
+    ):
+        schedule_invalidation({"home:most_popular"})
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, raw=False, **kwargs):
+    """Featured categories, and category names in the slider"""
+    if not raw:
+        schedule_invalidation({"home:categories", "home:slider"})
@@ -0,0 +1,63 @@
+# catalog/signals/images.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from catalog.images import (
+    IMAGE_FIELDS,
+    schedule_derivative_cleanup,
+    schedule_derivatives,
+)
+from catalog.models import Brand, Category, ProductImage, ProductVariant
+
+IMAGE_FIELD_NAMES = dict(IMAGE_FIELDS)
+
+
+def _tracked(sender, raw, update_fields):
+    field = IMAGE_FIELD_NAMES[sender]
+    if raw or (update_fields is not None and field not in update_fields):
+        return None
+    return field
+
+
+@receiver(pre_save, sender=ProductImage)
+@receiver(pre_save, sender=ProductVariant)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Brand)
+def image_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored image name, to notice a replaced image"""
+    field = _tracked(sender, raw, update_fields)
+    if field is None or instance.pk is None:
+        return
+    instance._previous_image = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(field, flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Brand)
+def image_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    """The worker skips images whose derivatives are already current"""
+    field = _tracked(sender, raw, update_fields)
+    if field is None:
+        return
+    image = getattr(instance, field)
+    previous = instance.__dict__.pop("_previous_image", None)
+    if previous and previous != image.name:
+        schedule_derivative_cleanup(previous)
+    if image:
+        schedule_derivatives(image.name)
+
+
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Brand)
+def image_deleted(sender, instance, **kwargs):
+    """Derivatives go with the last row using the image"""
+    image = getattr(instance, IMAGE_FIELD_NAMES[sender])
+    if image:
+        schedule_derivative_cleanup(image.name)
@@ -0,0 +1,38 @@
+# catalog/signals/search.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from catalog.models import Brand, Category, Product
+from catalog.search import update_search_vectors
+
+PRODUCT_SEARCH_FIELDS = {
+    "name",
+    "sku",
+    "brand",
+    "category",
+    "short_description",
+    "meta_keywords",
+    "description",
+}
+
+
+def touches_search_fields(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and touches_search_fields(update_fields, PRODUCT_SEARCH_FIELDS):
+        update_search_vectors(Product.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Brand)
+def brand_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and touches_search_fields(update_fields, {"name"}):
+        update_search_vectors(Product.objects.filter(brand=instance))
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and touches_search_fields(update_fields, {"name", "bn_name"}):
+        update_search_vectors(Product.objects.filter(category=instance))
@@ -0,0 +1,32 @@
+# catalog/signals/summary.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Product, ProductImage, ProductVariant
+from catalog.summary import refresh_product_summaries
+from reviews.models import ProductReview
+
+
+def schedule_summary_refresh(product_id):
+    """Refresh after commit so admin inlines are saved and deleted
+    products are not resurrected"""
+    if product_id:
+        transaction.on_commit(lambda: refresh_product_summaries([product_id]))
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_summary_refresh(instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductReview)
+def product_child_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_summary_refresh(instance.product_id)
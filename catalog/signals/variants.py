@@ -0,0 +1,49 @@
+# catalog/signals/variants.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import (
+    Color,
+    ProductAttribute,
+    ProductVariant,
+    VariantAttribute,
+)
+from catalog.variants import invalidate_variant_matrices
+
+
+def schedule_invalidation(product_ids):
+    product_ids = list(product_ids)
+    if product_ids:
+        transaction.on_commit(lambda: invalidate_variant_matrices(product_ids))
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def variant_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_invalidation([instance.product_id])
+
+
+@receiver(post_save, sender=VariantAttribute)
+@receiver(post_delete, sender=VariantAttribute)
+def variant_attribute_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_invalidation(
+            ProductVariant.objects.filter(pk=instance.variant_id).values_list(
+                "product_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=Color)
+@receiver(post_save, sender=ProductAttribute)
+def option_renamed(sender, instance, raw=False, **kwargs):
+    """Names and swatch codes are part of the matrices using them"""
+    if not raw:
+        lookup = "color" if sender is Color else "attribute"
+        schedule_invalidation(
+            VariantAttribute.objects.filter(**{lookup: instance})
+            .values_list("variant__product_id", flat=True)
+            .distinct()
+        )
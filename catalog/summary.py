@@ -0,0 +1,121 @@
+# catalog/summary.py
+import logging
+
+from django.db.models import Avg, Count, Max, Min, Sum
+
+from catalog.models import (
+    Product,
+    ProductImage,
+    ProductSummary,
+    ProductVariant,
+)
+from reviews.models import ProductReview
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_UPDATE_FIELDS = [
+    "rating_avg",
+    "review_count",
+    "primary_image",
+    "min_price",
+    "max_price",
+    "in_stock",
+    "updated_at",
+]
+
+
+def _product_in_stock(product, variant_stock):
+    """Same rule as Product.is_in_stock, extended with variant stock"""
+    if not product["track_inventory"] or product["allow_backorder"]:
+        return True
+    return product["stock_quantity"] > 0 or (variant_stock or 0) > 0
+
+
+def refresh_product_summaries(product_ids):
+    """
+    Rebuild ProductSummary rows for the given product ids.
+    Runs a fixed number of queries regardless of how many ids are passed.
+    Returns number of summaries written.
+    """
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return 0
+
+    products = Product.objects.filter(pk__in=product_ids).values(
+        "id",
+        "base_price",
+        "track_inventory",
+        "stock_quantity",
+        "allow_backorder",
+    )
+
+    ratings = {
+        row["product_id"]: row
+        for row in ProductReview.objects.filter(
+            product_id__in=product_ids, is_approved=True
+        )
+        .values("product_id")
+        .annotate(avg=Avg("rating"), count=Count("id"))
+    }
+
+    images = {}
+    for product_id, image in ProductImage.objects.filter(
+        product_id__in=product_ids, is_primary=True
+    ).values_list("product_id", "image"):
+        images.setdefault(product_id, image)
+
+    variants = {
+        row["product_id"]: row
+        for row in ProductVariant.objects.filter(
+            product_id__in=product_ids, is_active=True
+        )
+        .values("product_id")
+        .annotate(
+            min_price=Min("price"),
+            max_price=Max("price"),
+            stock=Sum("stock_quantity"),
+        )
+    }
+
+    summaries = []
+    for product in products:
+        rating = ratings.get(product["id"], {})
+        variant = variants.get(product["id"], {})
+        summaries.append(
+            ProductSummary(
+                product_id=product["id"],
+                rating_avg=round(rating.get("avg") or 0, 2),
+                review_count=rating.get("count") or 0,
+                primary_image=images.get(product["id"], ""),
+                min_price=variant.get("min_price") or product["base_price"],
+                max_price=variant.get("max_price") or product["base_price"],
+                in_stock=_product_in_stock(product, variant.get("stock")),
+            )
+        )
+
+    ProductSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+    return len(summaries)
+
+
+def rebuild_all_product_summaries(chunk_size=1000):
+    """Rebuild summaries for the whole catalog in chunks"""
+    total = 0
+    ids = []
+    for product_id in (
+        Product.objects.order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=chunk_size)
+    ):
+        ids.append(product_id)
+        if len(ids) >= chunk_size:
+            total += refresh_product_summaries(ids)
+            ids = []
+
+    total += refresh_product_summaries(ids)
+    logger.info(f"{'*' * 10} product summaries rebuilt: {total}\n")
+    return total
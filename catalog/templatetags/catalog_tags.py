@@ -0,0 +1,45 @@
+# catalog/templatetags/catalog_tags.py
+from django import template
+from django.utils.html import format_html
+
+from catalog.images import derivative_url, get_derivatives, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt="", sizes="100vw", css_class=""):
+    """
+    {% load catalog_tags %}
+    {% responsive_image product.summary.primary_image alt=product.name sizes="(min-width: 992px) 25vw, 50vw" %}
+    A <picture> with WebP and JPEG/PNG srcsets of the image derivatives,
+    see catalog.images. Falls back to the original until they exist.
+    """  # noqa: E501
+    if not image:
+        return format_html('<img alt="{}" class="{}">', alt, css_class)
+
+    derivatives = get_derivatives([image.name])[image.name]
+    if not derivatives:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="lazy">',
+            image.url,
+            alt,
+            css_class,
+        )
+
+    fallback = [item for item in derivatives if item["format"] != "webp"]
+    fmt = fallback[-1]["format"]
+    return format_html(
+        "<picture>"
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" '
+        'loading="lazy">'
+        "</picture>",
+        srcset(derivatives, "webp"),
+        sizes,
+        derivative_url(fallback[-1]),
+        srcset(derivatives, fmt),
+        sizes,
+        alt,
+        css_class,
+    )
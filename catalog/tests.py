@@ -1,3 +1,1576 @@
-# from django.test import TestCase  # noqa
+import gzip
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.http import HttpResponse, QueryDict
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from cart.models import Cart, CartItem
+from catalog import autocomplete, facets, feeds, recommendations
+from catalog.counters import CounterBuffer, product_counters
+from catalog.facets import (
+    bump_generation,
+    facet_state,
+    get_facet_index,
+    selection_condition,
+)
+from catalog.home_sections import (
+    SECTION_LIMITS,
+    home_section_products,
+    load_home_sections,
+)
+from catalog.images import (
+    delete_derivatives,
+    generate_derivatives,
+    get_derivatives,
+)
+from catalog.importer import import_catalog
+from catalog.models import (
+    Brand,
+    Category,
+    Color,
+    FrequentlyBoughtTogether,
+    ImageDerivativeSet,
+    Product,
+    ProductAttribute,
+    ProductImage,
+    ProductSpecification,
+    ProductSummary,
+    ProductVariant,
+    VariantAttribute,
+)
+from catalog.ranking import apply_flag_changes, compute_flag_changes
+from catalog.recently_viewed import (
+    COOKIE_NAME,
+    RECENT_LIMIT,
+    decode,
+    encode,
+    product_cards,
+    viewed_product_ids,
+)
+from catalog.recommendations import update_recommendations
+from catalog.search import search_products, update_search_vectors
+from catalog.summary import refresh_product_summaries
+from catalog.variants import combination_key, get_variant_matrix
+from core.utils.fragment_cache import get_or_render
+from core.utils.pagination import keyset_paginate
+from frontend.utils import render_conditionally
+from orders.models import Order, OrderItem
+from reviews.models import ProductReview
+
+
+class ProductSummaryTest(TestCase):
+    """Test cases for the denormalized product summary"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Phone X",
+            sku="PX-1",
+            category=self.category,
+            base_price=Decimal("100.00"),
+            stock_quantity=0,
+        )
+
+    def test_summary_without_children(self):
+        """Falls back to base price and product stock"""
+        refresh_product_summaries([self.product.pk])
+        summary = ProductSummary.objects.get(product=self.product)
+        self.assertEqual(summary.min_price, Decimal("100.00"))
+        self.assertEqual(summary.max_price, Decimal("100.00"))
+        self.assertEqual(summary.review_count, 0)
+        self.assertFalse(summary.in_stock)
+        self.assertFalse(summary.primary_image)
+
+    def test_summary_aggregates_children(self):
+        """Ratings, primary image, variant prices and stock are rolled up"""
+        customer = get_user_model().objects.create_user(
+            email="buyer@example.com", password="testpass123"
+        )
+        ProductReview.objects.create(
+            product=self.product,
+            customer=customer,
+            rating=4,
+            title="Good",
+            review="Good phone",
+            is_approved=True,
+        )
+        ProductImage.objects.create(
+            product=self.product, image="products/x.jpg", is_primary=True
+        )
+        ProductVariant.objects.create(
+            product=self.product, price=Decimal("90.00"), stock_quantity=2
+        )
+        ProductVariant.objects.create(
+            product=self.product, price=Decimal("120.00")
+        )
+
+        refresh_product_summaries([self.product.pk])
+        summary = ProductSummary.objects.get(product=self.product)
+        self.assertEqual(summary.rating_avg, Decimal("4.00"))
+        self.assertEqual(summary.review_count, 1)
+        self.assertEqual(summary.primary_image.name, "products/x.jpg")
+        self.assertEqual(summary.min_price, Decimal("90.00"))
+        self.assertEqual(summary.max_price, Decimal("120.00"))
+        self.assertTrue(summary.in_stock)
+
+    def test_signal_refreshes_on_commit(self):
+        """Saving a child row refreshes the summary after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductVariant.objects.create(
+                product=self.product, price=Decimal("80.00")
+            )
+        summary = ProductSummary.objects.get(product=self.product)
+        self.assertEqual(summary.min_price, Decimal("80.00"))
+
+
+class CategoryTreeTest(TestCase):
+    """Test cases for the materialized category path"""
+
+    def setUp(self):
+        self.root = Category.objects.create(name="Electronics")
+        self.child = Category.objects.create(name="Phones", parent=self.root)
+        self.leaf = Category.objects.create(name="Android", parent=self.child)
+
+    def test_paths_and_queries(self):
+        self.assertEqual(
+            self.leaf.path,
+            f"{self.root.pk}/{self.child.pk}/{self.leaf.pk}/",
+        )
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(
+            set(self.root.get_descendants()), {self.child, self.leaf}
+        )
+        self.assertEqual(
+            list(self.leaf.get_ancestors()), [self.root, self.child]
+        )
+        self.assertEqual(
+            self.leaf.name_with_parents(), "Electronics > Phones > Android"
+        )
+
+    def test_move_rewrites_subtree(self):
+        other = Category.objects.create(name="Gadgets")
+        self.child.parent = other
+        self.child.save()
+
+        self.leaf.refresh_from_db()
+        self.assertEqual(
+            self.leaf.path, f"{other.pk}/{self.child.pk}/{self.leaf.pk}/"
+        )
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(list(self.root.get_descendants()), [])
+
+    def test_subtree_products(self):
+        product = Product.objects.create(
+            name="Pixel", sku="PX-2", category=self.leaf, base_price=1
+        )
+        self.assertEqual(list(self.root.get_subtree_products()), [product])
+
+    def test_rebuild_paths(self):
+        Category.objects.update(path="", depth=0)
+        Category.rebuild_paths()
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.depth, 2)
+
+
+class KeysetPaginationTest(TestCase):
+    """Test cases for seek pagination over a category subtree"""
+
+    def setUp(self):
+        root = Category.objects.create(name="Fashion")
+        child = Category.objects.create(name="Shoes", parent=root)
+        self.root = root
+        for index in range(5):
+            Product.objects.create(
+                name=f"Item {index}",
+                sku=f"IT-{index}",
+                category=child if index % 2 else root,
+                base_price=1,
+            )
+
+    def test_walk_forward_and_back(self):
+        queryset = self.root.get_subtree_products()
+        first = keyset_paginate(queryset, per_page=2)
+        self.assertEqual(len(first), 2)
+        self.assertTrue(first.has_next)
+        self.assertFalse(first.has_previous)
+
+        second = keyset_paginate(queryset, after=first.next_cursor, per_page=2)
+        third = keyset_paginate(queryset, after=second.next_cursor, per_page=2)
+        self.assertEqual(len(third), 1)
+        self.assertFalse(third.has_next)
+
+        seen = [p.pk for page in (first, second, third) for p in page]
+        self.assertEqual(len(set(seen)), 5)
+
+        back = keyset_paginate(
+            queryset, before=second.previous_cursor, per_page=2
+        )
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous)
+
+    def test_invalid_cursor_starts_over(self):
+        page = keyset_paginate(
+            self.root.get_subtree_products(), after="not-a-cursor"
+        )
+        self.assertEqual(len(page), 5)
+
+
+class ProductSearchTest(TestCase):
+    """Test cases for full-text and trigram product search"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Mobiles")
+        brand = Brand.objects.create(name="Samsung")
+        self.galaxy = Product.objects.create(
+            name="Galaxy S24 Ultra",
+            sku="SM-S928",
+            category=category,
+            brand=brand,
+            base_price=1,
+            description="Flagship phone with stylus",
+        )
+        self.case = Product.objects.create(
+            name="Silicone Case",
+            sku="CASE-01",
+            category=category,
+            base_price=1,
+            short_description="Fits Galaxy phones",
+        )
+
+    def search(self, term):
+        return list(search_products(Product.objects.all(), term))
+
+    def test_name_ranks_above_description(self):
+        self.assertEqual(self.search("galaxy"), [self.galaxy, self.case])
+
+    def test_brand_sku_and_prefix(self):
+        self.assertEqual(self.search("samsung"), [self.galaxy])
+        self.assertEqual(self.search("SM-S928"), [self.galaxy])
+        self.assertEqual(self.search("sm-s928"), [self.galaxy])
+        self.assertEqual(self.search("silic"), [self.case])
+
+    def test_typo_tolerance(self):
+        self.assertIn(self.galaxy, self.search("Galaxi"))
+
+    def test_vector_follows_brand_rename(self):
+        brand = self.galaxy.brand
+        brand.name = "Sammy"
+        brand.save()
+        self.assertEqual(self.search("sammy"), [self.galaxy])
+
+    def test_empty_term(self):
+        self.assertEqual(self.search("  "), [])
+
+
+class AutocompleteIndexTest(TestCase):
+    """Test cases for the in-process prefix index"""
+
+    def setUp(self):
+        autocomplete._state["index"] = None
+        category = Category.objects.create(name="Mobiles", bn_name="মোবাইল")
+        self.product = Product.objects.create(
+            name="Galaxy S24 Ultra",
+            sku="SM-S928",
+            category=category,
+            base_price=1,
+        )
+
+    def tearDown(self):
+        autocomplete._state["index"] = None
+
+    def test_prefix_index(self):
+        index = autocomplete.PrefixIndex.build(
+            [
+                (1, "galaxy", autocomplete.index_keys("Galaxy S24")),
+                (2, "pixel", autocomplete.index_keys("Pixel 9")),
+            ]
+        )
+        self.assertEqual(index.search("gal"), ["galaxy"])
+        self.assertEqual(index.search("s2"), ["galaxy"])
+        self.assertEqual(index.search("x"), [])
+
+        index.add(3, "galaxy tab", autocomplete.index_keys("Galaxy Tab"))
+        self.assertEqual(index.search("galaxy"), ["galaxy", "galaxy tab"])
+        index.remove(1)
+        self.assertEqual(index.search("galaxy"), ["galaxy tab"])
+
+    def test_suggest_from_catalog(self):
+        with self.assertNumQueries(3):
+            autocomplete.get_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                autocomplete.suggest("sm-s9"),
+                [("product", "Galaxy S24 Ultra", self.product.slug)],
+            )
+            self.assertEqual(
+                autocomplete.suggest("মোবা"),
+                [("category", "মোবাইল", "mobiles")],
+            )
+
+    def test_signal_updates_loaded_index(self):
+        autocomplete.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Pixel 9"
+            self.product.save()
+        self.assertEqual(autocomplete.suggest("galaxy"), [])
+        self.assertEqual(len(autocomplete.suggest("pixel")), 1)
+
+
+class FacetIndexTest(TestCase):
+    """Test cases for the per-category facet bitsets"""
+
+    def setUp(self):
+        cache.clear()
+        self.phones = Category.objects.create(name="Phones")
+        self.android = Category.objects.create(
+            name="Android", parent=self.phones
+        )
+        samsung = Brand.objects.create(name="Samsung")
+        apple = Brand.objects.create(name="Apple")
+        battery = ProductAttribute.objects.create(name="Battery")
+        color = ProductAttribute.objects.create(name="Color")
+        black = Color.objects.create(name="Black", code="#000000")
+
+        self.galaxy = Product.objects.create(
+            name="Galaxy",
+            sku="G1",
+            category=self.android,
+            brand=samsung,
+            base_price=800,
+        )
+        self.iphone = Product.objects.create(
+            name="iPhone",
+            sku="I1",
+            category=self.phones,
+            brand=apple,
+            base_price=1200,
+        )
+        self.a15 = Product.objects.create(
+            name="A15",
+            sku="A1",
+            category=self.android,
+            brand=samsung,
+            base_price=200,
+        )
+        for product, mah in [(self.galaxy, "5000"), (self.iphone, "3300")]:
+            ProductSpecification.objects.create(
+                product=product, attribute=battery, value=mah
+            )
+        variant = ProductVariant.objects.create(product=self.galaxy, price=1)
+        VariantAttribute.objects.create(
+            variant=variant, attribute=color, value="Black", color=black
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def matching(self, selected):
+        return sorted(
+            Product.objects.filter(selection_condition(selected)).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def facet(self, facets, key):
+        return {
+            option["value"]: option["count"]
+            for facet in facets
+            if facet["key"] == key
+            for option in facet["values"]
+        }
+
+    def test_counts_and_matches(self):
+        with self.assertNumQueries(3):
+            index = get_facet_index(self.phones)
+        with self.assertNumQueries(0):
+            index = get_facet_index(self.phones)
+
+        selected = index.parse_selection(QueryDict("brand=samsung"))
+        self.assertEqual(index.match(selected).bit_count(), 2)
+        self.assertEqual(
+            self.matching(selected), sorted([self.galaxy.pk, self.a15.pk])
+        )
+        facets = index.counts(selected)
+        # a facet's own selection does not narrow its counts
+        self.assertEqual(
+            self.facet(facets, "brand"), {"apple": 1, "samsung": 2}
+        )
+        self.assertEqual(self.facet(facets, "price"), {"0-1000": 2})
+        self.assertEqual(self.facet(facets, "color"), {"Black": 1})
+        self.assertEqual(self.facet(facets, "spec_battery"), {"5000": 1})
+
+        selected = index.parse_selection(
+            QueryDict("brand=samsung&brand=apple&price=1000-5000&x=1")
+        )
+        self.assertEqual(index.match(selected).bit_count(), 1)
+        self.assertEqual(self.matching(selected), [self.iphone.pk])
+
+        selected = index.parse_selection(
+            QueryDict("color=Black&spec_battery=5000&price=0-1000")
+        )
+        self.assertEqual(self.matching(selected), [self.galaxy.pk])
+
+    def test_incremental_updates(self):
+        get_facet_index(self.phones)
+        get_facet_index(self.android)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.a15.category = self.phones
+            self.a15.base_price = 1500
+            self.a15.save()
+
+        index = get_facet_index(self.android)
+        self.assertEqual(list(index.positions), [self.galaxy.pk])
+        facets = get_facet_index(self.phones).counts({})
+        self.assertEqual(
+            self.facet(facets, "price"), {"0-1000": 1, "1000-5000": 2}
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.galaxy.delete()
+        facets = get_facet_index(self.phones).counts({})
+        self.assertEqual(
+            self.facet(facets, "brand"), {"apple": 1, "samsung": 1}
+        )
+        self.assertEqual(self.facet(facets, "color"), {})
+
+    def test_counts_follow_search(self):
+        index = get_facet_index(self.phones)
+        within = index.mask([self.galaxy.pk])
+        self.assertEqual(
+            self.facet(index.counts({}, within), "brand"), {"samsung": 1}
+        )
+
+        # the category page counts what the search found
+        update_search_vectors()
+        response = self.client.get(
+            reverse("category_products", args=[self.phones.slug]),
+            {"q": "iphone"},
+        )
+        self.assertEqual(
+            self.facet(response.context["facets"], "brand"), {"apple": 1}
+        )
+
+    def test_rebuild_serves_previous_index(self):
+        previous = get_facet_index(self.phones)
+        bump_generation()
+        # another worker is rebuilding the index
+        cache.add(f"catalog:facets:lock:{self.phones.pk}", 1)
+        with self.assertNumQueries(0):
+            index = get_facet_index(self.phones)
+        self.assertEqual(index.positions, previous.positions)
+
+        cache.delete(f"catalog:facets:lock:{self.phones.pk}")
+        with self.assertNumQueries(3):
+            get_facet_index(self.phones)
+
+    def test_bitsets_kept_in_process(self):
+        index = get_facet_index(self.phones)
+        # only the stamp is read from the shared cache
+        generation = facets.current_generation()
+        cache.delete(f"catalog:facets:{generation}:{self.phones.pk}")
+        with self.assertNumQueries(0):
+            self.assertEqual(facet_state(self.phones), index.state)
+            self.assertIs(get_facet_index(self.phones), index)
+
+    def test_patch_waits_for_lock(self):
+        wait = facets.WAIT_TIMEOUT
+        facets.WAIT_TIMEOUT = 0.1
+        self.addCleanup(setattr, facets, "WAIT_TIMEOUT", wait)
+        get_facet_index(self.phones)
+        # a build holds the lock past the wait: the index is dropped
+        cache.add(f"catalog:facets:lock:{self.phones.pk}", 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.iphone.base_price = 6000
+            self.iphone.save()
+        cache.delete(f"catalog:facets:lock:{self.phones.pk}")
+        with self.assertNumQueries(3):
+            index = get_facet_index(self.phones)
+        self.assertEqual(
+            self.facet(index.counts({}), "price"),
+            {"0-1000": 2, "5000-10000": 1},
+        )
+
+    def test_category_page_filters(self):
+        response = self.client.get(
+            reverse("category_products", args=[self.phones.slug]),
+            {"brand": "samsung", "price": "0-1000"},
+        )
+        self.assertEqual(
+            sorted(product.pk for product in response.context["object_list"]),
+            sorted([self.galaxy.pk, self.a15.pk]),
+        )
+
+    def test_category_page_validator(self):
+        url = reverse("category_products", args=[self.phones.slug])
+        etag = self.client.get(url).headers["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # a review changes a card, not the facets
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductReview.objects.create(
+                product=self.a15,
+                customer=get_user_model().objects.create_user(
+                    email="buyer@example.com", password="testpass123"
+                ),
+                rating=5,
+                title="Good",
+                review="Good phone",
+                is_approved=True,
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class HomeFragmentCacheTest(TestCase):
+    """Test cases for tag-invalidated home page fragments"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Galaxy",
+            sku="G1",
+            category=self.category,
+            base_price=1,
+            is_featured=True,
+        )
+        self.renders = 0
+
+    def tearDown(self):
+        cache.clear()
+
+    def render(self, name="featured", tags=("home:featured",)):
+        def render():
+            self.renders += 1
+            return f"render {self.renders}"
+
+        return get_or_render(name, tags, render)
+
+    def test_cached_until_tag_invalidated(self):
+        self.assertEqual(self.render(), "render 1")
+        self.assertEqual(self.render(), "render 1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = "Galaxy S24"
+            self.product.save()
+        self.assertEqual(self.render(), "render 2")
+
+    def test_invalidation_is_per_section(self):
+        self.render()
+        self.render("new", ["home:new"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.is_featured = False
+            self.product.is_new = True
+            self.product.save()
+        # both the old and the new section are rebuilt
+        self.assertEqual(self.render(), "render 3")
+        self.assertEqual(self.render("new", ["home:new"]), "render 4")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(
+                name="Case", sku="C1", category=self.category, base_price=1
+            )
+        self.assertEqual(self.render("new", ["home:new"]), "render 4")
+
+    def test_stampede_serves_stale_copy(self):
+        self.render()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+
+        # another worker is already rebuilding
+        cache.add("fragment:featured:lock", 1, 30)
+        self.assertEqual(self.render(), "render 1")
+        self.assertEqual(self.renders, 1)
+
+
+class HomeSectionsTest(TestCase):
+    """Test cases for the single-pass home page loader"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Phones")
+        self.galaxy = Product.objects.create(
+            name="Galaxy",
+            sku="G1",
+            category=category,
+            base_price=1,
+            is_slider=True,
+            is_featured=True,
+            is_most_popular=True,
+        )
+        self.pixel = Product.objects.create(
+            name="Pixel",
+            sku="P1",
+            category=category,
+            base_price=1,
+            is_featured=True,
+            is_new=True,
+        )
+        Product.objects.create(
+            name="Hidden",
+            sku="H1",
+            category=category,
+            base_price=1,
+            is_featured=True,
+            is_active=False,
+        )
+
+    def test_partition(self):
+        with self.assertNumQueries(2):
+            sections = load_home_sections()
+            self.assertEqual(sections["slider"], [self.galaxy])
+            self.assertEqual(sections["featured"], [self.pixel, self.galaxy])
+            self.assertEqual(sections["new"], [self.pixel])
+            self.assertEqual(sections["bestseller"], [])
+            self.assertEqual(
+                len(sections["most_popular"][0].features.all()), 0
+            )
+
+    def test_search_keeps_slider(self):
+        sections = load_home_sections("pixel")
+        self.assertEqual(sections["slider"], [self.galaxy])
+        self.assertEqual(sections["featured"], [self.pixel])
+
+    def test_section_limits(self):
+        category = self.galaxy.category
+        for i in range(SECTION_LIMITS["new"] + 2):
+            Product.objects.create(
+                name=f"New {i}",
+                sku=f"N{i}",
+                category=category,
+                base_price=1,
+                is_new=True,
+            )
+        sections = load_home_sections()
+        self.assertEqual(len(sections["new"]), SECTION_LIMITS["new"])
+        # the older products of the section are not read at all
+        self.assertEqual(
+            len(home_section_products()), SECTION_LIMITS["new"] + 2
+        )
+        self.assertNotIn(self.pixel, sections["new"])
+        self.assertIn(self.pixel, sections["featured"])
+
+
+class VariantMatrixTest(TestCase):
+    """Test cases for the cached variant selection matrix"""
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Galaxy", sku="G1", category=category, base_price=1
+        )
+        color = ProductAttribute.objects.create(name="Color")
+        storage = ProductAttribute.objects.create(name="Storage")
+        self.black = Color.objects.create(name="Black", code="#000000")
+        self.variants = {}
+        for size, price in [("128GB", 100), ("256GB", 120)]:
+            variant = ProductVariant.objects.create(
+                product=self.product,
+                price=price,
+                stock_quantity=2,
+                is_default=size == "256GB",
+            )
+            VariantAttribute.objects.create(
+                variant=variant, attribute=color, color=self.black
+            )
+            VariantAttribute.objects.create(
+                variant=variant, attribute=storage, value=size
+            )
+            self.variants[size] = variant
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_matrix(self):
+        with self.assertNumQueries(1):
+            matrix = get_variant_matrix(self.product.pk)
+        with self.assertNumQueries(0):
+            get_variant_matrix(self.product.pk)
+
+        small = self.variants["128GB"]
+        self.assertEqual(matrix["default"], self.variants["256GB"].pk)
+        self.assertEqual(
+            matrix["combinations"][
+                combination_key({"color": "Black", "storage": "128GB"})
+            ],
+            small.pk,
+        )
+        self.assertEqual(matrix["variants"][str(small.pk)]["price"], "100.00")
+        color = matrix["attributes"][0]
+        self.assertEqual(color["values"][0]["color"], "#000000")
+        self.assertEqual(len(color["values"][0]["variants"]), 2)
+
+    def test_invalidated_on_change(self):
+        get_variant_matrix(self.product.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.black.code = "#111111"
+            self.black.save()
+        matrix = get_variant_matrix(self.product.pk)
+        self.assertEqual(
+            matrix["attributes"][0]["values"][0]["color"], "#111111"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variants["128GB"].delete()
+        matrix = get_variant_matrix(self.product.pk)
+        self.assertEqual(
+            list(matrix["variants"]), [str(self.variants["256GB"].pk)]
+        )
+
+
+class CounterBufferTest(TestCase):
+    """Test cases for write-behind product counters"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Phones")
+        self.galaxy = Product.objects.create(
+            name="Galaxy", sku="G1", category=category, base_price=1
+        )
+        self.pixel = Product.objects.create(
+            name="Pixel", sku="P1", category=category, base_price=1
+        )
+        self.counters = CounterBuffer(
+            Product, ("view_count", "sale_count"), interval=3600
+        )
+
+    def tearDown(self):
+        if self.counters._timer:
+            self.counters._timer.cancel()
+
+    def test_batched_flush(self):
+        for _ in range(3):
+            self.counters.increment("view_count", self.galaxy.pk)
+        self.counters.increment("view_count", self.pixel.pk)
+        self.counters.increment("sale_count", self.pixel.pk, 2)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.counters.flush(), 3)
+        with self.assertNumQueries(0):
+            self.counters.flush()
+
+        self.galaxy.refresh_from_db()
+        self.pixel.refresh_from_db()
+        self.assertEqual(self.galaxy.view_count, 3)
+        self.assertEqual(self.pixel.view_count, 1)
+        self.assertEqual(self.pixel.sale_count, 2)
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.counters.increment("stock_quantity", self.galaxy.pk)
+
+
+class MerchandisingRankingTest(TestCase):
+    """Test cases for the merchandising flag ranking job"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Phones")
+        self.galaxy = Product.objects.create(
+            name="Galaxy", sku="G1", category=category, base_price=1
+        )
+        self.pixel = Product.objects.create(
+            name="Pixel",
+            sku="P1",
+            category=category,
+            base_price=1,
+            view_count=10,
+            is_bestseller=True,
+        )
+        Product.objects.filter(pk=self.pixel.pk).update(
+            created_at=timezone.now() - timedelta(days=90)
+        )
+
+        order = Order.objects.create(
+            payment_method="cod", subtotal=1, total_amount=1
+        )
+        OrderItem.objects.create(
+            order=order,
+            product=self.galaxy,
+            product_name="Galaxy",
+            quantity=2,
+            unit_price=1,
+        )
+        cancelled = Order.objects.create(
+            payment_method="cod",
+            subtotal=1,
+            total_amount=1,
+            order_status="cancelled",
+        )
+        OrderItem.objects.create(
+            order=cancelled,
+            product=self.pixel,
+            product_name="Pixel",
+            quantity=5,
+            unit_price=1,
+        )
+
+        User = get_user_model()
+        for i, rating in enumerate([5, 5, 4, 1]):
+            customer = User.objects.create_user(
+                email=f"buyer{i}@example.com", password="testpass123"
+            )
+            ProductReview.objects.create(
+                product=self.galaxy if rating > 1 else self.pixel,
+                customer=customer,
+                rating=rating,
+                title="Review",
+                review="Review",
+                is_approved=True,
+            )
+
+    def test_changes(self):
+        changes = compute_flag_changes()
+        self.assertEqual(
+            changes["is_bestseller"],
+            {"add": {self.galaxy.pk}, "remove": {self.pixel.pk}},
+        )
+        # pixel has one review only, below MIN_REVIEWS
+        self.assertEqual(changes["is_top_rated"]["add"], {self.galaxy.pk})
+        # two sales outweigh ten views
+        self.assertEqual(changes["is_most_popular"]["add"], {self.galaxy.pk})
+        self.assertEqual(changes["is_new"]["add"], {self.galaxy.pk})
+
+    def test_command_dry_run_and_apply(self):
+        out = StringIO()
+        call_command("rank_merchandising_flags", "--dry-run", stdout=out)
+        self.assertIn(f"- {self.pixel.pk} Pixel", out.getvalue())
+        self.pixel.refresh_from_db()
+        self.assertTrue(self.pixel.is_bestseller)
+
+        call_command("rank_merchandising_flags", stdout=StringIO())
+        self.pixel.refresh_from_db()
+        self.galaxy.refresh_from_db()
+        self.assertFalse(self.pixel.is_bestseller)
+        self.assertTrue(self.galaxy.is_bestseller)
+        self.assertEqual(
+            compute_flag_changes()["is_bestseller"],
+            {"add": set(), "remove": set()},
+        )
+
+    def test_api_etag_follows_flags(self):
+        url = f"/api/catalog/products/{self.galaxy.slug}/"
+        etag = self.client.get(url).headers["ETag"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        apply_flag_changes(compute_flag_changes())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+
+class ImageDerivativeTest(TestCase):
+    """Test cases for resized image derivatives"""
+
+    CLEANUP = "catalog.signals.images.schedule_derivative_cleanup"
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+        category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Galaxy", sku="G1", category=category, base_price=1
+        )
+        self.photo = self._store("products/galaxy.jpg", "RGB", (1000, 500))
+        ProductImage.objects.create(product=self.product, image=self.photo)
+        self.logo = self._store("brands/acme.png", "RGBA", (200, 100))
+        Brand.objects.create(name="Acme", logo=self.logo)
+
+    def _store(self, name, mode, size):
+        buffer = BytesIO()
+        Image.new(mode, size).save(buffer, "JPEG" if mode == "RGB" else "PNG")
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_generate(self):
+        self.assertTrue(generate_derivatives(self.photo))
+        self.assertFalse(generate_derivatives(self.photo))  # up to date
+
+        derivatives = get_derivatives([self.photo])[self.photo]
+        self.assertEqual(
+            [(item["width"], item["format"]) for item in derivatives],
+            [
+                (320, "webp"),
+                (320, "jpeg"),
+                (640, "webp"),
+                (640, "jpeg"),
+                (960, "webp"),
+                (960, "jpeg"),
+            ],
+        )
+        self.assertEqual(derivatives[0]["height"], 160)
+        for item in derivatives:
+            self.assertTrue(default_storage.exists(item["name"]))
+
+    def test_small_transparent_logo(self):
+        """Not upscaled, and the fallback keeps the alpha channel"""
+        generate_derivatives(self.logo)
+        derivatives = ImageDerivativeSet.objects.get(
+            source=self.logo
+        ).derivatives
+        self.assertEqual(
+            [(item["width"], item["format"]) for item in derivatives],
+            [(200, "webp"), (200, "png")],
+        )
+
+    def test_template_tag(self):
+        template = Template(
+            "{% load catalog_tags %}"
+            '{% responsive_image image alt="Galaxy" sizes="50vw" %}'
+        )
+        image = ProductImage.objects.get(product=self.product).image
+
+        html = template.render(Context({"image": image}))
+        self.assertIn(f'src="{image.url}"', html)
+        self.assertNotIn("srcset", html)
+
+        generate_derivatives(self.photo)
+        html = template.render(Context({"image": image}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn("-320w.webp 320w", html)
+        self.assertIn("-960w.jpg 960w", html)
+        self.assertIn('sizes="50vw"', html)
+
+    def test_names_per_source(self):
+        """Sources differing by extension keep their own files"""
+        other = self._store("products/galaxy.png", "RGB", (1000, 500))
+        generate_derivatives(self.photo)
+        generate_derivatives(other)
+        photo_names = {
+            item["name"] for item in get_derivatives([self.photo])[self.photo]
+        }
+        other_names = {
+            item["name"] for item in get_derivatives([other])[other]
+        }
+        self.assertFalse(photo_names & other_names)
+        for name in photo_names | other_names:
+            self.assertTrue(default_storage.exists(name))
+
+    def test_regenerate_deletes_stale_files(self):
+        generate_derivatives(self.photo)
+        old = ImageDerivativeSet.objects.get(source=self.photo).derivatives
+        default_storage.delete(self.photo)
+        self.assertEqual(
+            self._store(self.photo, "RGB", (800, 400)), self.photo
+        )
+        generate_derivatives(self.photo, force=True)
+        new = ImageDerivativeSet.objects.get(source=self.photo).derivatives
+        self.assertEqual(new[-1]["width"], 640)
+        for item in old:
+            self.assertFalse(default_storage.exists(item["name"]))
+        for item in new:
+            self.assertTrue(default_storage.exists(item["name"]))
+
+    def test_replaced_image_cleanup(self):
+        generate_derivatives(self.photo)
+        generate_derivatives(self.logo)
+        derivatives = get_derivatives([self.photo])[self.photo]
+        image = ProductImage.objects.get(product=self.product)
+        self.assertFalse(delete_derivatives(self.photo))  # still shown
+
+        image.image = self._store("products/new.jpg", "RGB", (400, 200))
+        with mock.patch(self.CLEANUP) as cleanup:
+            image.save()
+        cleanup.assert_called_once_with(self.photo)
+        self.assertTrue(delete_derivatives(self.photo))
+        self.assertEqual(get_derivatives([self.photo])[self.photo], [])
+        for item in derivatives:
+            self.assertFalse(default_storage.exists(item["name"]))
+
+        with mock.patch(self.CLEANUP) as cleanup:
+            Brand.objects.filter(logo=self.logo).delete()
+        cleanup.assert_called_once_with(self.logo)
+        self.assertTrue(delete_derivatives(self.logo))
+
+    def test_backfill_resumes(self):
+        generate_derivatives(self.logo)
+        out = StringIO()
+        call_command("generate_image_derivatives", stdout=out)
+        self.assertIn("1 images to process", out.getvalue())
+        self.assertEqual(ImageDerivativeSet.objects.count(), 2)
+
+        out = StringIO()
+        call_command("generate_image_derivatives", stdout=out)
+        self.assertIn("0 images to process", out.getvalue())
+
+
+class CatalogApiTest(TestCase):
+    """Test cases for the read-only catalog API"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Phones")
+        self.brand = Brand.objects.create(name="Acme")
+        self.products = [
+            Product.objects.create(
+                name=f"Phone {i}",
+                sku=f"P{i}",
+                category=self.category,
+                brand=self.brand,
+                base_price=100 + i,
+            )
+            for i in range(3)
+        ]
+        refresh_product_summaries([product.pk for product in self.products])
+
+    def test_cursor_pages(self):
+        url = "/api/catalog/products/?page_size=2"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([row["sku"] for row in data["results"]], ["P2", "P1"])
+        self.assertIsNone(data["previous"])
+
+        data = self.client.get(data["next"]).json()
+        self.assertEqual([row["sku"] for row in data["results"]], ["P0"])
+        self.assertIsNone(data["next"])
+        self.assertIn("before=", data["previous"])
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(
+            "/api/catalog/products/phone-0/?fields=id,name,category"
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "id": self.products[0].pk,
+                "name": "Phone 0",
+                "category": {
+                    "id": self.category.pk,
+                    "slug": "phones",
+                    "name": "Phones",
+                    "bn_name": None,
+                },
+            },
+        )
+        response = self.client.get("/api/catalog/products/?fields=cost_price")
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self):
+        url = "/api/catalog/products/?fields=id,name,brand"
+        response = self.client.get(url)
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+
+        # page query and the brand state only, nothing serialized
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.brand.name = "Acme Inc"
+        self.brand.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(
+            response.json()["results"][0]["brand"]["name"], "Acme Inc"
+        )
+
+
+class ConditionalPageTest(TestCase):
+    """Test cases for ETag/Last-Modified on storefront pages"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Phones")
+        self.product = Product.objects.create(
+            name="Galaxy", sku="G1", category=self.category, base_price=1
+        )
+        self.session = SessionStore()
+        self.session.create()
+        self.renders = 0
+
+    def _get(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        request = RequestFactory().get("/category/phones/", **headers)
+        request.user = AnonymousUser()
+        request.session = self.session
+        states = [(self.product.pk, self.product.updated_at)]
+        return render_conditionally(request, states, self._render)
+
+    def _render(self):
+        self.renders += 1
+        return HttpResponse("page")
+
+    def test_not_modified(self):
+        response = self._get()
+        etag = response.headers["ETag"]
+        self.assertIn("private", response.headers["Cache-Control"])
+        self.assertIn("Last-Modified", response.headers)
+
+        response = self._get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(self.renders, 1)
+
+        # header menu changed
+        Category.objects.create(name="Tablets")
+        self.assertEqual(self._get(etag).status_code, 200)
+        self.assertEqual(self.renders, 2)
+
+    @override_settings(CART_WIDGET_HYDRATION=False)
+    def test_cart_changes_etag(self):
+        """Without hydration the header cart is part of the page"""
+        etag = self._get().headers["ETag"]
+        cart = Cart.objects.create(session_key=self.session.session_key)
+        CartItem.objects.create(cart=cart, product=self.product)
+        response = self._get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertIn("private", response.headers["Cache-Control"])
+
+    def test_hydrated_page_is_shared(self):
+        response = self._get()
+        self.assertIn("public", response.headers["Cache-Control"])
+        self.assertIn("s-maxage", response.headers["Cache-Control"])
+
+        # the cart is loaded by the widget, the page is unchanged
+        cart = Cart.objects.create(session_key=self.session.session_key)
+        CartItem.objects.create(cart=cart, product=self.product)
+        response = self._get(response.headers["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_cart_widget(self):
+        response = self.client.get(reverse("cart_widget"))
+        data = response.json()
+        self.assertEqual(data["total_items"], 0)
+        self.assertTrue(data["csrf_token"])
+        self.assertIn("no-store", response.headers["Cache-Control"])
+        self.assertFalse(Cart.objects.exists())
+
+
+class SitemapFeedTest(TestCase):
+    """Test cases for the sitemap shards and catalog feeds"""
+
+    base_url = "https://shop.example"
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        shard_size = feeds.SHARD_SIZE
+        feeds.SHARD_SIZE = 2
+        self.addCleanup(setattr, feeds, "SHARD_SIZE", shard_size)
+
+        self.category = Category.objects.create(name="Phones")
+        self.products = [
+            Product.objects.create(
+                name=f"Phone {number}",
+                sku=f"P{number}",
+                category=self.category,
+                base_price=Decimal("100.00"),
+                compare_price=Decimal("120.00") if number == 1 else None,
+            )
+            for number in range(5)
+        ]
+        refresh_product_summaries([product.pk for product in self.products])
+
+    def _read(self, name):
+        with default_storage.open(name, "rb") as stored:
+            return gzip.decompress(stored.read()).decode()
+
+    def _shards(self, section):
+        return feeds.load_manifest()[section]["shards"]
+
+    def test_shards_and_index(self):
+        feeds.generate_sitemaps(self.base_url)
+        shards = self._shards("products")
+        self.assertEqual([shard["count"] for shard in shards], [2, 2, 1])
+
+        xml = self._read(shards[0]["name"])
+        slug = self.products[0].slug
+        self.assertIn(f"{self.base_url}/bn/", xml)
+        self.assertIn('hreflang="en"', xml)
+        self.assertIn(slug, xml)
+
+        response = self.client.get(reverse("sitemap_index"))
+        index = b"".join(response.streaming_content).decode()
+        self.assertEqual(index.count("<sitemap>"), 4)  # 3 + 1 category
+        self.assertIn(shards[0]["name"], index)
+
+    def test_incremental(self):
+        feeds.generate_sitemaps(self.base_url)
+        first = self._shards("products")[0]
+
+        # untouched catalog: only the tail shard is rewritten
+        rewritten = feeds.generate_sitemaps(self.base_url)
+        self.assertEqual(rewritten["products"], 1)
+
+        # deactivated product leaves its shard
+        product = self.products[1]
+        product.is_active = False
+        product.save()
+        rewritten = feeds.generate_sitemaps(self.base_url)
+        self.assertEqual(rewritten["products"], 2)
+        shard = self._shards("products")[0]
+        self.assertEqual(shard["name"], first["name"])
+        self.assertEqual(shard["count"], 1)
+        self.assertNotIn(product.slug, self._read(shard["name"]))
+
+        # deleted product, no newer updated_at left behind
+        Product.objects.filter(pk=self.products[2].pk).delete()
+        feeds.generate_sitemaps(self.base_url)
+        self.assertEqual(self._shards("products")[1]["count"], 1)
+
+    def test_feeds(self):
+        self.assertEqual(feeds.generate_feeds(self.base_url), 5)
+        self.assertIsNone(feeds.generate_feeds(self.base_url))  # unchanged
+
+        google = self._read(f"{feeds.FEED_DIR}/google.xml.gz")
+        self.assertEqual(google.count("<item>"), 5)
+        self.assertIn("<g:price>120.00 BDT</g:price>", google)
+        self.assertIn("<g:sale_price>100.00 BDT</g:sale_price>", google)
+
+        facebook = self._read(f"{feeds.FEED_DIR}/facebook.csv.gz")
+        self.assertEqual(len(facebook.splitlines()), 6)
+
+        self.products[0].delete()
+        self.assertEqual(feeds.generate_feeds(self.base_url), 4)
+
+
+class CatalogImportTest(TestCase):
+    """Test cases for the bulk catalog importer"""
+
+    header = (
+        "sku,name,category,brand,base_price,variant_sku,variant_price,"
+        "spec:battery,option:color"
+    )
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Phones")
+        self.brand = Brand.objects.create(name="Acme")
+        self.battery = ProductAttribute.objects.create(name="Battery")
+        self.color = ProductAttribute.objects.create(name="Color")
+        self.red = Color.objects.create(name="Red", code="#FF0000")
+        Product.objects.create(
+            name="Galaxy", sku="OLD", category=self.category, base_price=1
+        )
+
+    def _import(self, *lines):
+        content = "\n".join((self.header,) + lines).encode()
+        return import_catalog(BytesIO(content), format="csv", chunk_size=2)
+
+    def test_import(self):
+        report = self._import(
+            "G1,Galaxy,phones,acme,100,G1-R,110,5000 mAh,Red",
+            "G1,Galaxy,phones,acme,100,G1-B,120,5000 mAh,Blue",
+            "N1,Nokia,phones,,50,,,,",
+            "X1,Broken,tablets,,50,,,,",
+            "X2,Broken,phones,,cheap,,,,",
+            "X3,Broken,phones,,nan,,,,",
+        )
+        self.assertEqual(report.rows, 6)
+        self.assertEqual(report.imported, 3)
+        self.assertEqual([number for number, _ in report.errors], [5, 6, 7])
+        self.assertIn("tablets", report.errors[0][1])
+
+        product = Product.objects.get(sku="G1")
+        self.assertEqual(product.slug, "galaxy-1")  # "galaxy" is taken
+        self.assertEqual(product.brand, self.brand)
+        self.assertEqual(product.variants.count(), 2)
+        self.assertEqual(product.specifications.get().value, "5000 mAh")
+        option = VariantAttribute.objects.get(variant__sku="G1-R")
+        self.assertEqual(option.color, self.red)
+        self.assertEqual(product.summary.min_price, Decimal("110.00"))
+        self.assertIsNone(Product.objects.get(sku="N1").brand)
+
+    def test_reimport_updates(self):
+        self._import("G1,Galaxy,phones,acme,100,G1-R,110,5000 mAh,Red")
+        product = Product.objects.get(sku="G1")
+
+        report = self._import(
+            "G1,Galaxy S,phones,acme,90,G1-R,95,6000 mAh,Blue"
+        )
+        self.assertEqual(report.errors, [])
+        product.refresh_from_db()
+        self.assertEqual(product.name, "Galaxy S")
+        self.assertEqual(product.slug, "galaxy-1")  # links stay valid
+        self.assertEqual(product.base_price, Decimal("90.00"))
+        self.assertEqual(product.specifications.get().value, "6000 mAh")
+        variant = product.variants.get()
+        self.assertEqual(variant.price, Decimal("95.00"))
+        # the replaced option value is gone
+        self.assertEqual(
+            list(variant.variant_attributes.values_list("value", flat=True)),
+            ["Blue"],
+        )
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValueError):
+            import_catalog(BytesIO(b"sku,name\nG1,Galaxy"), format="csv")
+
+
+class RecommendationTest(TestCase):
+    """Test cases for frequently bought together products"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Phones")
+        self.phone, self.case, self.charger, self.cable = [
+            Product.objects.create(
+                name=name, sku=name, category=category, base_price=1
+            )
+            for name in ("Phone", "Case", "Charger", "Cable")
+        ]
+        # the cards need summaries, refreshed on commit otherwise
+        refresh_product_summaries(
+            [self.phone.pk, self.case.pk, self.charger.pk, self.cable.pk]
+        )
+
+    def _order(self, *products, status="pending"):
+        order = Order.objects.create(
+            payment_method="cod",
+            subtotal=1,
+            total_amount=1,
+            order_status=status,
+        )
+        for product in products:
+            OrderItem.objects.create(
+                order=order,
+                product=product,
+                product_name=product.name,
+                quantity=1,
+                unit_price=1,
+            )
+        # settled, older than SETTLE_TIME
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        return order
+
+    def _related(self, product):
+        return list(
+            FrequentlyBoughtTogether.objects.filter(product=product)
+            .order_by("position")
+            .values_list("related__name", "orders")
+        )
+
+    def test_update(self):
+        self._order(self.phone, self.case)
+        self._order(self.phone, self.case, self.charger)
+        self._order(self.phone, self.cable, status="cancelled")
+
+        run = update_recommendations()
+        self.assertEqual(run.orders, 2)
+        self.assertEqual(
+            self._related(self.phone), [("Case", 2), ("Charger", 1)]
+        )
+        # ties in creation order
+        self.assertEqual(
+            self._related(self.charger), [("Phone", 1), ("Case", 1)]
+        )
+
+        # incremental: only the new order is counted
+        self._order(self.phone, self.charger)
+        self._order(self.phone, self.charger)
+        run = update_recommendations()
+        self.assertEqual(run.orders, 2)
+        self.assertEqual(
+            self._related(self.phone), [("Charger", 3), ("Case", 2)]
+        )
+
+        # a full run gives the same counts
+        update_recommendations(full=True)
+        self.assertEqual(
+            self._related(self.phone), [("Charger", 3), ("Case", 2)]
+        )
+
+    def test_resumes_after_crash(self):
+        window = recommendations.WINDOW_ORDERS
+        recommendations.WINDOW_ORDERS = 1
+        self.addCleanup(setattr, recommendations, "WINDOW_ORDERS", window)
+        self._order(self.phone, self.case)
+        self._order(self.phone, self.case)
+
+        # the run is killed while merging its second window
+        merge = recommendations.merge_pair_counts
+        self.addCleanup(setattr, recommendations, "merge_pair_counts", merge)
+        merged = []
+
+        def merge_once(matrix):
+            if merged:
+                raise RuntimeError("killed")
+            merged.append(matrix)
+            merge(matrix)
+
+        recommendations.merge_pair_counts = merge_once
+        with self.assertRaises(RuntimeError):
+            update_recommendations()
+        self.assertEqual(self._related(self.phone), [("Case", 1)])
+
+        # the next run counts the second order only
+        recommendations.merge_pair_counts = merge
+        run = update_recommendations()
+        self.assertEqual(run.orders, 1)
+        self.assertEqual(self._related(self.phone), [("Case", 2)])
+
+    def test_detail_page(self):
+        self._order(self.phone, self.case)
+        update_recommendations()
+        response = self.client.get(
+            reverse("product_detail", args=[self.phone.slug])
+        )
+        self.assertEqual(
+            [product.pk for product in response.context["bought_together"]],
+            [self.case.pk],
+        )
+        etag = response.headers["ETag"]
+
+        # the related product's card changed
+        self.case.base_price = 2
+        self.case.save()
+        response = self.client.get(
+            reverse("product_detail", args=[self.phone.slug]),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # the derivatives of its image were made
+        ProductSummary.objects.filter(product=self.case).update(
+            primary_image="products/case.jpg"
+        )
+        etag = response.headers["ETag"]
+        ImageDerivativeSet.objects.create(
+            source="products/case.jpg", spec="320", derivatives=[]
+        )
+        response = self.client.get(
+            reverse("product_detail", args=[self.phone.slug]),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class RecentlyViewedTest(TestCase):
+    """Test cases for the per visitor recently viewed products"""
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Phones")
+        self.products = [
+            Product.objects.create(
+                name=f"Phone {number}",
+                sku=f"P{number}",
+                category=category,
+                base_price=1,
+            )
+            for number in range(4)
+        ]
+        refresh_product_summaries([product.pk for product in self.products])
+
+    def _view(self, product):
+        return self.client.get(
+            reverse("recently_viewed_widget"), {"product": product.pk}
+        )
+
+    def _viewed(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        request.COOKIES = {
+            name: morsel.value for name, morsel in self.client.cookies.items()
+        }
+        return viewed_product_ids(request)
+
+    def test_encoding(self):
+        self.assertEqual(decode(encode([5, 70000, 1])), [5, 70000, 1])
+        self.assertEqual(len(encode(range(RECENT_LIMIT))), 4 * RECENT_LIMIT)
+        self.assertEqual(decode(None), [])
+
+    def test_most_recent_first(self):
+        first, second, third, _ = self.products
+        for product in (first, second, third, first):
+            response = self._view(product)
+        self.assertEqual(self._viewed(), [first.pk, third.pk, second.pk])
+        self.assertIn("no-store", response.headers["Cache-Control"])
+        # the product being viewed is not in its own rail
+        self.assertNotIn(first.name, response.json()["html"])
+        self.assertIn(third.name, response.json()["html"])
+
+    def test_bounded(self):
+        for _ in range(RECENT_LIMIT):
+            for product in self.products:
+                self._view(product)
+        self.assertEqual(len(self._viewed()), len(self.products))
+
+        for product_id in range(1000, 1000 + RECENT_LIMIT):
+            self.client.get(
+                reverse("recently_viewed_widget"), {"product": product_id}
+            )
+        self._view(self.products[0])
+        self.assertEqual(len(self._viewed()), RECENT_LIMIT)
+        self.assertEqual(self._viewed()[0], self.products[0].pk)
+
+    def test_no_session_created(self):
+        response = self._view(self.products[0])
+        self.assertEqual(response.json()["html"].strip(), "")
+        response = self._view(self.products[1])
+        self.assertIn(self.products[0].name, response.json()["html"])
+        self.assertNotIn("sessionid", response.cookies)
+        self.assertFalse(self.client.session.session_key)
+
+    def test_user_list(self):
+        user = get_user_model().objects.create_user(
+            email="viewer@example.com", password="testpass123"
+        )
+        self.client.force_login(user)
+        self._view(self.products[0])
+        self._view(self.products[1])
+        self.assertNotIn(COOKIE_NAME, self.client.cookies)
+        self.assertEqual(
+            decode(cache.get(f"recently_viewed:user:{user.pk}")),
+            [self.products[1].pk, self.products[0].pk],
+        )
+
+    def test_tampered_cookie(self):
+        self.client.cookies[COOKIE_NAME] = "AQAAAA:forged"
+        self.assertEqual(self._viewed(), [])
+
+    def test_view_counted(self):
+        product_counters.flush()
+        url = reverse("product_detail", args=[self.products[0].slug])
+        etag = self.client.get(url).headers["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # the widget request alone counts nothing
+        self._view(self.products[0])
+        product_counters.flush()
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].view_count, 2)
+
+    def test_cards_in_order(self):
+        first, second, third, fourth = self.products
+        fourth.is_active = False
+        fourth.save()
+        with self.assertNumQueries(1):
+            cards = product_cards([third.pk, fourth.pk, first.pk, 999])
+        self.assertEqual(cards, [third, first])
+
+    def test_continue_shopping(self):
+        first, second, third, _ = self.products
+        for product in (first, second, third):
+            self._view(product)
+        self.client.get(reverse("add_to_cart", args=[second.slug]))
+        response = self.client.get(reverse("cart_detail"))
+        self.assertEqual(response.context["continue_shopping"], [third, first])
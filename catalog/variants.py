@@ -0,0 +1,126 @@
+# catalog/variants.py
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import FilteredRelation, Q
+
+from catalog.models import ProductVariant
+
+MATRIX_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _cache_key(product_id):
+    return f"catalog:variants:{product_id}"
+
+
+def combination_key(options):
+    """Lookup key of an {attribute slug: value} selection"""
+    return "|".join(f"{slug}={options[slug]}" for slug in sorted(options))
+
+
+def build_variant_matrix(product_id):
+    """
+    Everything the detail page needs to switch variants client side,
+    from one query:
+    {
+        "attributes": [{"slug", "name", "values": [{"value", "color",
+                        "variants": [ids]}]}],
+        "variants": {id: {"price", "compare_price", "stock", "in_stock",
+                          "image", "is_default", "options"}},
+        "combinations": {combination_key: id},
+        "default": id or None,
+    }
+    """
+    rows = (
+        ProductVariant.objects.filter(product_id=product_id, is_active=True)
+        .annotate(
+            option=FilteredRelation(
+                "variant_attributes",
+                condition=Q(variant_attributes__is_active=True),
+            )
+        )
+        .order_by("-is_default", "price", "pk")
+        .values_list(
+            "pk",
+            "price",
+            "compare_price",
+            "stock_quantity",
+            "image",
+            "is_default",
+            "option__attribute__slug",
+            "option__attribute__name",
+            "option__value",
+            "option__color__name",
+            "option__color__code",
+        )
+    )
+
+    attributes = {}  # slug -> {"slug", "name", "values": {value: {...}}}
+    variants = {}
+    for (
+        pk,
+        price,
+        compare_price,
+        stock,
+        image,
+        is_default,
+        slug,
+        name,
+        value,
+        color_name,
+        color_code,
+    ) in rows:
+        variant = variants.setdefault(
+            str(pk),
+            {
+                "id": pk,
+                "price": str(price),
+                "compare_price": str(compare_price) if compare_price else None,
+                "stock": stock,
+                "in_stock": stock > 0,
+                "image": default_storage.url(image) if image else None,
+                "is_default": is_default,
+                "options": {},
+            },
+        )
+        if color_name and not slug:  # color picked without an attribute
+            slug, name = "color", "Color"
+        value = value or color_name
+        if not slug or not value:
+            continue
+
+        variant["options"][slug] = value
+        attribute = attributes.setdefault(
+            slug, {"slug": slug, "name": name, "values": {}}
+        )
+        option = attribute["values"].setdefault(
+            value, {"value": value, "color": color_code, "variants": []}
+        )
+        option["variants"].append(pk)
+
+    default = next(iter(variants.values()), None)  # ordered by is_default
+    return {
+        "attributes": [
+            {**attribute, "values": list(attribute["values"].values())}
+            for attribute in attributes.values()
+        ],
+        "variants": variants,
+        "combinations": {
+            combination_key(variant["options"]): variant["id"]
+            for variant in variants.values()
+            if variant["options"]
+        },
+        "default": default["id"] if default else None,
+    }
+
+
+def get_variant_matrix(product_id):
+    key = _cache_key(product_id)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = build_variant_matrix(product_id)
+        cache.set(key, matrix, MATRIX_CACHE_TIMEOUT)
+    return matrix
+
+
+def invalidate_variant_matrices(product_ids):
+    cache.delete_many([_cache_key(pk) for pk in set(product_ids) if pk])
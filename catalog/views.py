@@ -1,3 +1,18 @@
-from django.shortcuts import render  # noqa
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from catalog.feeds import SITEMAP_INDEX
+
+
+@require_GET
+def sitemap_index(request):
+    """Index written by generate_sitemaps, the shards are served as media"""
+    if not default_storage.exists(SITEMAP_INDEX):
+        raise Http404
+    response = FileResponse(
+        default_storage.open(SITEMAP_INDEX, "rb"),
+        content_type="application/xml",
+    )
+    response["Cache-Control"] = "public, max-age=3600"
+    return response
@@ -1,6 +1,7 @@
 """Settings.py."""
 
 import os
+import sys
 
 # from django.core.management.utils import get_random_secret_key
 from datetime import timedelta
@@ -66,6 +67,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "django.contrib.sites",
     "django.contrib.humanize",
+    "django.contrib.postgres",
     # Third-party apps
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
@@ -259,10 +261,33 @@ SMS_SENDER_ID = os.getenv("SMS_SENDER_ID")
 
 MAINTENANCE_MODE = os.getenv("MAINTENANCE_MODE")
 
-CACHES = {
-    "default": {
+# The default cache must be shared by every process: web workers and
+# management commands bump versions in it (reference data, autocomplete,
+# facet generation, fragment tags, variant matrices) that the others
+# read. A process-local cache (LocMemCache) keeps every process on its
+# own copy until the timeouts run out, the "caches" system check warns.
+# REDIS_URL selects Redis (pip install redis), otherwise the database
+# cache is used: python manage.py createcachetable
+REDIS_URL = os.getenv("REDIS_URL")
+# manage.py test and pytest run in one process, a local cache is shared
+TESTING = sys.argv[1:2] == ["test"] or "pytest" in sys.modules
+if TESTING:
+    DEFAULT_CACHE = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    },
+    }
+elif REDIS_URL:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+else:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+
+CACHES = {
+    "default": DEFAULT_CACHE,
     "file_resubmit": {
         "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
         "LOCATION": "/tmp/file_resubmit/",
@@ -309,6 +334,12 @@ REST_FRAMEWORK = {
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Header cart widget loaded by JS from cart/widget.json, so storefront
+# pages carry nothing per visitor and anonymous ones can be shared
+CART_WIDGET_HYDRATION = os.getenv("CART_WIDGET_HYDRATION", "True") == "True"
+# seconds a shared cache (nginx) may serve an anonymous page unchecked
+SHARED_PAGE_MAX_AGE = int(os.getenv("SHARED_PAGE_MAX_AGE", "60"))
+
 AXES_FAILURE_LIMIT = 5
 AXES_LOCK_OUT_AT_FAILURE = True
 AXES_COOLOFF_TIME = 1  # in hours
@@ -372,13 +403,5 @@ else:
     SESSION_COOKIE_SECURE = False
     CSRF_COOKIE_SECURE = False
 
-    # Development cache
-    CACHES = {
-        "default": {
-            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        },
-        "file_resubmit": {
-            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
-            "LOCATION": "/tmp/file_resubmit/",
-        },
-    }
+    # Development uses the same shared cache, runserver and management
+    # commands are separate processes too
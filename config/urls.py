@@ -10,6 +10,8 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from catalog.views import sitemap_index
+
 SITE_HEADER = settings.SITE_HEADER
 SITE_TITLE = settings.SITE_TITLE
 INDEX_TITLE = settings.SITE_TITLE
@@ -32,7 +34,11 @@ urlpatterns = [
         "api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"
     ),
     path("api/token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+    # read-only catalog for the mobile app
+    path("api/catalog/", include("catalog.api.urls")),
     path("accounts/", include("allauth.urls")),
+    # written by the generate_sitemaps command
+    path("sitemap.xml", sitemap_index, name="sitemap_index"),
 ]
 
 
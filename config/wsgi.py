@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Warm process-local indexes once per worker, off the request path
+from catalog.autocomplete import warm_index  # noqa: E402
+
+warm_index()
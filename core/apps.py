@@ -5,4 +5,6 @@ class CoreConfig(AppConfig):
     name = "core"
 
     def ready(self):
+        import core.checks  # noqa
         import core.signals.audit  # noqa
+        import core.signals.reference_data  # noqa
@@ -0,0 +1,23 @@
+# core/checks.py
+from django.core.checks import Tags, Warning, register
+
+from core.utils.cache import is_shared_cache
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Cross-process invalidation needs a cache every process sees"""
+    if is_shared_cache():
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Reference data, autocomplete, facets, home fragments and "
+                "variant matrices are invalidated through version keys in "
+                "the default cache. Set REDIS_URL or use the database "
+                "cache, see CACHES in config/settings.py."
+            ),
+            id="core.W001",
+        )
+    ]
@@ -1,9 +1,13 @@
 # core/context_processors.py
 from django.conf import settings
+from django.contrib.messages import get_messages
 from django.contrib.sites.models import Site
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import get_language
 
-from cart.utils import get_or_create_cart
+from cart.utils import cart_state, get_lazy_cart
 from catalog.models import Category
+from core.utils.conditional import queryset_state
 
 
 def common_data(request):
@@ -14,13 +18,46 @@ def common_data(request):
     main_menu_categories = Category.objects.filter(
         parent__isnull=True, is_main_menu=True
     ).prefetch_related("children")
-    cart = get_or_create_cart(request)
+    # hydrated: the widget loads its cart, pages are the same for all
+    hydrate_cart = settings.CART_WIDGET_HYDRATION
+    cart = cart_summary = None
+    if not hydrate_cart:
+        # reads only, a page view never creates a session or a cart
+        lazy_cart = get_lazy_cart(request)
+        cart = SimpleLazyObject(lambda: lazy_cart.cart)
+        # totals of the header, shared with the page's
+        cart_summary = SimpleLazyObject(lambda: lazy_cart.summary)
     current_site = Site.objects.get_current()
     return {
         "categories": categories,
         "main_menu_categories": main_menu_categories,
         "cart": cart,
+        "cart_summary": cart_summary,
+        "hydrate_cart": hydrate_cart,
         "SITE_NAME": settings.SITE_NAME,
         "SITE_DOMAIN": current_site.domain,  # ✅ added
         "SITE_OBJECT": current_site,  # optional but useful
     }
+
+
+def common_data_state(request):
+    """
+    What common_data and the base template add to a page, for
+    conditional GETs: (states, extra, shared) for build_validators, or
+    None when the page has to be rendered anyway. shared: the page is
+    the same for every anonymous visitor, a shared cache may keep it.
+    """
+    if get_messages(request):
+        return None  # flash messages are shown once, no 304
+    states = [queryset_state(Category.objects.all())]
+    extra = [request.user.pk, get_language()]
+    if not settings.CART_WIDGET_HYDRATION:
+        states.append(cart_state(request))
+        extra += [
+            request.session.session_key,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME),  # forms' token
+        ]
+    shared = (
+        settings.CART_WIDGET_HYDRATION and not request.user.is_authenticated
+    )
+    return states, extra, shared
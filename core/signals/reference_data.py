@@ -0,0 +1,33 @@
+# core/signals/reference_data.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.utils.reference_data import (
+    REFERENCE_MODELS,
+    bump_version,
+    clear_reference_data,
+)
+
+
+def reference_data_committed():
+    clear_reference_data()
+    bump_version()
+
+
+def reference_data_changed(sender, **kwargs):
+    """This worker reloads at once, the others once it is committed"""
+    clear_reference_data()
+    transaction.on_commit(reference_data_committed)
+
+
+for model in REFERENCE_MODELS:
+    post_save.connect(
+        reference_data_changed,
+        sender=model,
+        dispatch_uid=f"reference_data_saved_{model._meta.label}",
+    )
+    post_delete.connect(
+        reference_data_changed,
+        sender=model,
+        dispatch_uid=f"reference_data_deleted_{model._meta.label}",
+    )
@@ -1,5 +1,8 @@
 # core/templatetags/core_tags.py
 from django import template
+from django.utils.translation import get_language
+
+from core.utils.fragment_cache import get_or_render
 
 register = template.Library()
 
@@ -11,3 +14,48 @@ def active_class(request, url_name):
     <li class="{% active_class request 'home' %}">Home</li>
     """
     return "active" if request.resolver_match.url_name == url_name else ""
+
+
+class TaggedCacheNode(template.Node):
+    def __init__(self, nodelist, name, tags, skip):
+        self.nodelist = nodelist
+        self.name = name
+        self.tags = tags
+        self.skip = skip
+
+    def render(self, context):
+        if self.skip is not None and self.skip.resolve(context):
+            return self.nodelist.render(context)
+
+        name = f"{self.name.resolve(context)}:{get_language()}"
+        tags = [tag.resolve(context) for tag in self.tags]
+        return get_or_render(name, tags, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def tagged_cache(parser, token):
+    """
+    {% tagged_cache "home:new" "home:new" "catalog" skip=search %}
+        ...
+    {% endtagged_cache %}
+    Caches the block until one of the tags is invalidated, see
+    core.utils.fragment_cache. skip bypasses the cache when truthy.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a fragment name"
+        )
+
+    skip = None
+    if bits[-1].startswith("skip="):
+        skip = parser.compile_filter(bits.pop()[len("skip=") :])
+
+    nodelist = parser.parse(("endtagged_cache",))
+    parser.delete_first_token()
+    return TaggedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(tag) for tag in bits[2:]],
+        skip,
+    )
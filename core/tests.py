@@ -0,0 +1,226 @@
+import csv
+import zipfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.importer import import_catalog
+from catalog.models import Brand, Category, Product
+from core.utils import reference_data
+from core.utils.exports import stream_csv, stream_xlsx
+from core.utils.reference_data import (
+    clear_reference_data,
+    get_reference_data,
+    reference_table,
+)
+from inventory.models import StockMovement, Warehouse
+from locations.models import District, Division
+from orders.models import Order, OrderItem
+from shipping.models import ShippingZone
+from users.models import Address
+
+
+class ReferenceDataTest(TestCase):
+    """Test cases for the in-process locations and shipping tables"""
+
+    def setUp(self):
+        self.addCleanup(clear_reference_data)
+        self.zone = ShippingZone.objects.create(name="Outside Dhaka")
+        self.division = Division.objects.create(name="Khulna")
+        self.district = District.objects.create(
+            division=self.division, shipping_zone=self.zone, name="Jessore"
+        )
+
+    def test_lookups(self):
+        get_reference_data()
+        with self.assertNumQueries(0):
+            districts = reference_table(District)
+            district = districts.get(self.district.pk)
+            self.assertEqual(district.name, "Jessore")
+            self.assertIs(districts.get(str(self.district.pk)), district)
+            self.assertIs(districts.get_by("slug", "jessore"), district)
+            self.assertIs(districts.get_by("name", "Jessore"), district)
+            self.assertIsNone(districts.get("nope"))
+            # foreign keys point at the loaded rows
+            self.assertIs(
+                district.shipping_zone,
+                reference_table(ShippingZone).get(self.zone.pk),
+            )
+            self.assertEqual(district.division.name, "Khulna")
+            self.assertEqual(
+                reference_table(District).group_by("shipping_zone_id"),
+                {self.zone.pk: [district]},
+            )
+
+    def test_save_reloads(self):
+        get_reference_data()
+        self.district.name = "Jashore"
+        self.district.save()
+        self.assertEqual(
+            reference_table(District).get(self.district.pk).name, "Jashore"
+        )
+
+    def test_other_worker_changes(self):
+        interval = reference_data.CHECK_INTERVAL
+        reference_data.CHECK_INTERVAL = 0
+        self.addCleanup(setattr, reference_data, "CHECK_INTERVAL", interval)
+
+        get_reference_data()
+        # saved by another worker: no signal here, only the version
+        District.objects.filter(pk=self.district.pk).update(name="Jashore")
+        self.assertEqual(
+            reference_table(District).get(self.district.pk).name, "Jessore"
+        )
+        reference_data.bump_version()
+        self.assertEqual(
+            reference_table(District).get(self.district.pk).name, "Jashore"
+        )
+
+
+class ExportTest(TestCase):
+    """Test cases for the streaming admin exports"""
+
+    def setUp(self):
+        category = Category.objects.create(name="Phones")
+        brand = Brand.objects.create(name="Acme")
+        self.products = [
+            Product.objects.create(
+                name=f"Phone {number}",
+                sku=f"P{number}",
+                category=category,
+                brand=brand,
+                base_price=Decimal("100.00"),
+            )
+            for number in range(3)
+        ]
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="secret"
+        )
+        self.client.force_login(admin)
+
+    def _export(self, action, changelist="catalog_product", rows=None):
+        rows = self.products if rows is None else rows
+        response = self.client.post(
+            reverse(f"admin:{changelist}_changelist"),
+            {"action": action, "_selected_action": [row.pk for row in rows]},
+        )
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def _csv(self, action, changelist, rows):
+        content = self._export(action, changelist, rows)
+        return list(csv.DictReader(StringIO(content.decode("utf-8-sig"))))
+
+    def test_product_csv_round_trip(self):
+        content = self._export("export_csv")
+        lines = content.decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith("sku,name,slug,category,brand"))
+        self.assertIn("P0,Phone 0,phone-0,phones,acme", lines[1])
+
+        # the export is a valid import file
+        Product.objects.update(base_price=1)
+        report = import_catalog(BytesIO(content), format="csv")
+        self.assertEqual(report.errors, [])
+        self.assertEqual(
+            set(Product.objects.values_list("base_price", flat=True)),
+            {Decimal("100.00")},
+        )
+
+    def test_product_xlsx(self):
+        archive = zipfile.ZipFile(BytesIO(self._export("export_xlsx")))
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn("Phone 2", sheet)
+
+    def test_streams(self):
+        rows = iter([(1, "নাম", None, timezone.now())])
+        csv_lines = "".join(stream_csv(["id", "name", "x", "at"], rows))
+        self.assertIn("1,নাম,,", csv_lines)
+
+        rows = (("a<b", Decimal("1.50"), True) for _ in range(3))
+        archive = zipfile.ZipFile(
+            BytesIO(b"".join(stream_xlsx(["a", "b", "c"], rows)))
+        )
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertIn("a&lt;b", sheet)
+        self.assertIn("<v>1.50</v>", sheet)
+
+    def test_formulas_quoted(self):
+        rows = [("=1+1", "+1", "-x", "@A1", "a=b", -5, Decimal("-1.5"))]
+        lines = "".join(stream_csv(list("abcdefg"), rows)).splitlines()
+        self.assertEqual(lines[1], "'=1+1,'+1,'-x,'@A1,a=b,-5,-1.5")
+
+    def test_order_lines(self):
+        address = Address.objects.create(
+            full_name='=HYPERLINK("http://x.example","y")',
+            phone="01700000000",
+            address_line1="Road 1",
+        )
+        order = Order.objects.create(
+            payment_method="cod",
+            subtotal=Decimal("300.00"),
+            total_amount=Decimal("300.00"),
+            shipping_address=address,
+        )
+        for product, quantity in (
+            (self.products[0], 2),
+            (self.products[1], 1),
+        ):
+            OrderItem.objects.create(
+                order=order,
+                product=product,
+                product_name=product.name,
+                sku=product.sku,
+                quantity=quantity,
+                unit_price=Decimal("100.00"),
+            )
+        rows = self._csv("export_csv", "orders_order", [order])
+        # one row per line item, the order's columns repeated
+        self.assertEqual([row["sku"] for row in rows], ["P0", "P1"])
+        self.assertEqual(
+            {row["order_number"] for row in rows}, {order.order_number}
+        )
+        self.assertEqual([row["quantity"] for row in rows], ["2", "1"])
+        self.assertTrue(rows[0]["full_name"].startswith("'=HYPERLINK"))
+
+    def test_users_without_secrets(self):
+        user = get_user_model().objects.create_user(
+            email="buyer@example.com", password="secret-password"
+        )
+        user.otp = "123456"
+        user.save()
+        content = self._export("export_selected_users", "users_user", [user])
+        rows = list(csv.DictReader(StringIO(content.decode("utf-8-sig"))))
+        self.assertEqual([row["email"] for row in rows], ["buyer@example.com"])
+        for column in rows[0]:
+            self.assertNotIn("password", column)
+            self.assertNotIn("otp", column)
+        self.assertNotIn(b"123456", content)
+        self.assertNotIn(user.password.encode(), content)
+
+    def test_stock_movements(self):
+        warehouse = Warehouse.objects.create(
+            name="Main", code="MAIN", address="Dhaka"
+        )
+        movement = StockMovement.objects.create(
+            warehouse=warehouse,
+            product=self.products[0],
+            movement_type="sale",
+            quantity=-2,
+            quantity_before=5,
+            quantity_after=3,
+            unit_cost=Decimal("10.00"),
+            notes="@SUM(A1:A9)",
+        )
+        rows = self._csv("export_csv", "inventory_stockmovement", [movement])
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["warehouse"], "MAIN")
+        self.assertEqual(rows[0]["product_sku"], "P0")
+        self.assertEqual(rows[0]["quantity"], "-2")
+        self.assertEqual(rows[0]["total_cost"], "20.00")
+        self.assertEqual(rows[0]["notes"], "'@SUM(A1:A9)")
@@ -0,0 +1,33 @@
+# core/utils/cache.py
+from django.conf import settings
+from django.core.management.base import CommandError
+
+# backends every process has its own copy of
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache(alias="default"):
+    """
+    True when every process sees the same cache, so versions bumped in
+    a management command or one worker reach the others. The test run
+    is a single process, its local cache counts as shared.
+    """
+    if getattr(settings, "TESTING", False):
+        return True
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
+
+
+def require_shared_cache():
+    """
+    For commands that invalidate caches of the web workers: with a
+    process-local cache their bumps would never reach them
+    """
+    if not is_shared_cache():
+        raise CommandError(
+            "The default cache is local to this process, the web workers "
+            "would keep serving stale data. Set REDIS_URL or use the "
+            "database cache, see CACHES in config/settings.py."
+        )
@@ -0,0 +1,107 @@
+# core/utils/conditional.py
+import hashlib
+
+from django.db.models import Count, F, Func, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_state(queryset):
+    """
+    (row count, latest updated_at) of a queryset, one aggregate query.
+    The count catches deletions, which leave no newer updated_at behind.
+    """
+    state = queryset.order_by().aggregate(
+        count=Count("pk", distinct=True), latest=Max("updated_at")
+    )
+    return state["count"], state["latest"]
+
+
+def state_annotations(**relations):
+    """
+    Subquery annotations with the state of related rows, so several
+    states are read in the parent row's own query:
+    Product.objects.annotate(
+        **state_annotations(images=(ProductImage.objects, "product"))
+    ) -> images_count, images_latest
+    """
+    annotations = {}
+    for name, (manager, lookup) in relations.items():
+        rows = (
+            manager.filter(**{lookup: OuterRef("pk")})
+            .order_by()
+            .values(lookup)
+        )
+        annotations[f"{name}_count"] = Subquery(
+            rows.annotate(count=Count("pk")).values("count")
+        )
+        annotations[f"{name}_latest"] = Subquery(
+            rows.annotate(latest=Max("updated_at")).values("latest")
+        )
+    return annotations
+
+
+def rows_state_annotations(name, rows):
+    """
+    state_annotations() of rows already correlated with OuterRef, for
+    rows no single lookup leads back from (e.g. matched by file name)
+    """
+    rows = rows.order_by()
+    return {
+        f"{name}_count": Subquery(
+            rows.annotate(count=Func(F("pk"), function="COUNT")).values(
+                "count"
+            )
+        ),
+        f"{name}_latest": Subquery(
+            rows.annotate(latest=Func(F("updated_at"), function="MAX")).values(
+                "latest"
+            )
+        ),
+    }
+
+
+def annotated_states(row, *names):
+    """(count, latest) states of state_annotations() in a values() row"""
+    return [(row[f"{name}_count"], row[f"{name}_latest"]) for name in names]
+
+
+def build_validators(states, *extra):
+    """
+    (etag, last_modified) of a response built from rows in these
+    (count or ids, latest updated_at) states. extra is anything else
+    the body depends on, e.g. the requested fields or the language.
+    """
+    last_modified = max(
+        (latest for _, latest in states if latest is not None), default=None
+    )
+    digest = hashlib.md5(
+        repr((list(states), extra)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest), last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(
+            last_modified.timestamp()
+        )
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """
+    A 304 (or 412) response when the request's If-None-Match /
+    If-Modified-Since validators still match, otherwise None
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
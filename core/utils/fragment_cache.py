@@ -0,0 +1,77 @@
+# core/utils/fragment_cache.py
+import hashlib
+import time
+
+from django.core.cache import cache
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+STALE_TIMEOUT = 60 * 60 * 24 * 7
+LOCK_TIMEOUT = 30  # seconds, longer than any fragment render
+WAIT_TIMEOUT = 5  # seconds a request waits for another worker's render
+
+
+def _tag_key(tag):
+    return f"fragment:tag:{tag}"
+
+
+def tag_versions(tags):
+    """
+    Current version of every tag. A missing version starts at the current
+    time, so an evicted tag can never bring back an old fragment.
+    """
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Every fragment cached under one of these tags becomes unreachable"""
+    for tag in set(tags):
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            pass  # not versioned yet, nothing cached under it
+
+
+def get_or_render(name, tags, render, timeout=FRAGMENT_TIMEOUT):
+    """
+    Cached render() output for name, keyed by the versions of its tags.
+    After an invalidation only the worker holding the lock re-renders;
+    the others serve the previous copy meanwhile.
+    """
+    digest = hashlib.md5(
+        repr(tag_versions(tags)).encode(), usedforsecurity=False
+    ).hexdigest()
+    key = f"fragment:{name}:{digest}"
+    stale_key = f"fragment:{name}:stale"
+    lock_key = f"fragment:{name}:lock"
+
+    html = cache.get(key)
+    if html is not None:
+        return html
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            html = render()
+            cache.set(key, html, timeout)
+            cache.set(stale_key, html, STALE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return html
+
+    stale = cache.get(stale_key)
+    if stale is not None:
+        return stale
+
+    # cold cache: wait for the lock holder instead of piling on the DB
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        html = cache.get(key)
+        if html is not None:
+            return html
+    return render()
@@ -0,0 +1,97 @@
+# core/utils/pagination.py
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    """Opaque URL-safe cursor for a row: created_at + pk"""
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created_at, pk) or None for a missing/tampered cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = (
+            base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        )
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        return None
+
+
+class KeysetPage:
+    """One page of a keyset (seek) paginated queryset"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def keyset_paginate(queryset, *, after=None, before=None, per_page=20):
+    """
+    Seek pagination ordered by (-created_at, id).
+    Every page is a single indexed range query, so page 500 costs the
+    same as page 1.
+    after: cursor of the last row seen, go forward
+    before: cursor of the first row seen, go back
+    """
+    after = decode_cursor(after)
+    before = None if after else decode_cursor(before)
+
+    if before:
+        created_at, pk = before
+        rows = list(
+            queryset.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, pk__lt=pk)
+            ).order_by("created_at", "-pk")[: per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        queryset = queryset.order_by("-created_at", "pk")
+        if after:
+            created_at, pk = after
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, pk__gt=pk)
+            )
+        rows = list(queryset[: per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = after is not None
+
+    if not rows:
+        return KeysetPage(rows)
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if has_next else None,
+        previous_cursor=encode_cursor(rows[0]) if has_previous else None,
+    )
@@ -0,0 +1,174 @@
+# core/utils/reference_data.py
+"""
+Process-local copies of the small tables that almost never change:
+locations and shipping. A worker loads them all at once and answers
+lookups from memory. A save anywhere bumps a version in the shared
+cache, and the other workers reload on their next use after that.
+
+The rows are shared by every request of the worker, read them only:
+copy one before changing it.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from locations.models import District, Division, Upazila
+from shipping.models import (
+    ShippingMethod,
+    ShippingRate,
+    ShippingSetting,
+    ShippingZone,
+)
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "reference_data:version"
+CHECK_INTERVAL = 5  # seconds between looks at the shared version
+
+# loaded in this order, so foreign keys point at loaded tables
+REFERENCE_MODELS = (
+    Division,
+    ShippingZone,
+    District,
+    Upazila,
+    ShippingMethod,
+    ShippingRate,
+    ShippingSetting,
+)
+LOOKUP_FIELDS = ("slug", "name")
+
+
+class ReferenceTable:
+    """Every row of one model, in its default ordering"""
+
+    def __init__(self, model, rows):
+        self.model = model
+        self.rows = rows
+        self.by_id = {row.pk: row for row in rows}
+        self.indexes = {}
+        field_names = {field.name for field in model._meta.fields}
+        for field in LOOKUP_FIELDS:
+            if field in field_names:
+                index = {}
+                for row in rows:
+                    index.setdefault(getattr(row, field), row)
+                self.indexes[field] = index
+        self._groups = {}
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, pk):
+        """Row by id, None when missing"""
+        try:
+            return self.by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by(self, field, value):
+        """Row by slug or name, the first in ordering when not unique"""
+        return self.indexes[field].get(value)
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def active(self):
+        return [row for row in self.rows if row.is_active]
+
+    def group_by(self, field):
+        """{value: rows} of a field, a foreign key's attname"""
+        if field not in self._groups:
+            groups = defaultdict(list)
+            for row in self.rows:
+                groups[getattr(row, field)].append(row)
+            self._groups[field] = dict(groups)
+        return self._groups[field]
+
+
+class ReferenceData:
+    """One snapshot of every reference table, one query per table"""
+
+    def __init__(self, version):
+        self.version = version
+        self.tables = {}
+        for model in REFERENCE_MODELS:
+            table = ReferenceTable(model, list(model.objects.all()))
+            self._link(table)
+            self.tables[model] = table
+
+    def _link(self, table):
+        """Point foreign keys at the loaded rows, no query to follow them"""
+        for field in table.model._meta.fields:
+            target = self.tables.get(field.related_model)
+            if not field.many_to_one or target is None:
+                continue
+            for row in table.rows:
+                value = getattr(row, field.attname)
+                if value is not None and value in target.by_id:
+                    field.set_cached_value(row, target.by_id[value])
+
+    def __getitem__(self, model):
+        return self.tables[model]
+
+
+# ==================== Process-local singleton ====================
+_state = {"data": None, "checked_at": 0.0}
+_load_lock = threading.Lock()
+
+
+def current_version():
+    return cache.get(VERSION_CACHE_KEY, 0)
+
+
+def bump_version():
+    """Tell other workers their reference data is stale"""
+    cache.add(VERSION_CACHE_KEY, 0, timeout=None)
+    try:
+        return cache.incr(VERSION_CACHE_KEY)
+    except ValueError:  # evicted between add and incr
+        cache.set(VERSION_CACHE_KEY, 1, timeout=None)
+        return 1
+
+
+def clear_reference_data():
+    """Drop this worker's copy, the next lookup reloads"""
+    _state.update(data=None, checked_at=0.0)
+
+
+def load_reference_data():
+    version = current_version()
+    started = time.monotonic()
+    data = ReferenceData(version)
+    _state.update(data=data, checked_at=time.monotonic())
+    logger.info(
+        f"{'*' * 10} reference data v{version} loaded "
+        f"in {time.monotonic() - started:.3f}s\n"
+    )
+    return data
+
+
+def get_reference_data():
+    data = _state["data"]
+    if data is not None and (
+        time.monotonic() - _state["checked_at"] > CHECK_INTERVAL
+    ):
+        _state["checked_at"] = time.monotonic()
+        if current_version() != data.version:
+            data = None  # changed in another worker
+    if data is None:
+        with _load_lock:
+            data = _state["data"]
+            if data is None or data.version != current_version():
+                data = load_reference_data()
+    return data
+
+
+def reference_table(model):
+    """ReferenceTable of one of REFERENCE_MODELS"""
+    return get_reference_data()[model]
@@ -15,6 +15,7 @@ echo "PostgreSQL is up - continuing"
 # Apply migrations and collect static files
 echo "Applying migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
@@ -2,21 +2,23 @@ import logging
 
 from django.contrib import messages
 
+from cart.services import change_quantity, set_district
+from core.utils.reference_data import reference_table
 from locations.models import District
 
 logger = logging.getLogger(__name__)
 
 
 def increment_item(request, cart_item):
-    cart_item.quantity += 1
-    cart_item.save()
+    change_quantity(cart_item.cart_id, cart_item.pk, 1)
+    cart_item.refresh_from_db(fields=["quantity"])
     messages.success(request, f"Quantity updated to {cart_item.quantity}")
 
 
 def decrement_item(request, cart_item):
     if cart_item.quantity > 1:
-        cart_item.quantity -= 1
-        cart_item.save()
+        change_quantity(cart_item.cart_id, cart_item.pk, -1)
+        cart_item.refresh_from_db(fields=["quantity"])
         messages.success(request, f"Quantity updated to {cart_item.quantity}")
     else:
         messages.warning(request, "Minimum quantity is 1")
@@ -33,13 +35,8 @@ def update_location(request, cart):
     if not district_id:
         return
 
-    district = (
-        District.objects.filter(pk=int(district_id))
-        .select_related("shipping_zone")
-        .first()
-    )
+    district = reference_table(District).get(district_id)
 
     if district:
-        cart.district = district
-        cart.save()
+        set_district(cart, district)
         messages.success(request, "Deliver location changed")
@@ -5,6 +5,7 @@ from frontend.views import (
     buy_now,
     cart_detail,
     cart_shipping_ajax,
+    cart_widget,
     checkout_start,
     customer_dashboard,
     login_view,
@@ -13,8 +14,21 @@ from frontend.views import (
     order_success,
     signup_view,
 )
+from frontend.views.cart_api import (
+    cart_api_add,
+    cart_api_district,
+    cart_api_remove,
+    cart_api_summary,
+    cart_api_update,
+)
 from frontend.views.category import CategoryProductView
-from frontend.views.home_page import HomePageView, ProductDetailPageView
+from frontend.views.home_page import (
+    HomePageView,
+    ProductDetailPageView,
+    product_variants,
+    recently_viewed_widget,
+)
+from frontend.views.search import SearchView, search_autocomplete
 
 urlpatterns = [
     # home page
@@ -25,11 +39,36 @@ urlpatterns = [
         ProductDetailPageView.as_view(),
         name="product_detail",
     ),
+    path(
+        "product/<str:slug>/variants.json",
+        product_variants,
+        name="product_variants",
+    ),
+    path(
+        "recently-viewed.json",
+        recently_viewed_widget,
+        name="recently_viewed_widget",
+    ),
     # cart
     path("add-to-cart/<slug:slug>/", add_to_cart, name="add_to_cart"),
     path("buy-now/<slug:slug>/", buy_now, name="buy_now"),
     path("cart/", cart_detail, name="cart_detail"),
     path("cart_shipping_ajax/", cart_shipping_ajax, name="cart_shipping_ajax"),
+    path("cart/widget.json", cart_widget, name="cart_widget"),
+    # cart JSON api
+    path("cart/api/add/<slug:slug>/", cart_api_add, name="cart_api_add"),
+    path(
+        "cart/api/items/<int:item_id>/",
+        cart_api_update,
+        name="cart_api_update",
+    ),
+    path(
+        "cart/api/items/<int:item_id>/remove/",
+        cart_api_remove,
+        name="cart_api_remove",
+    ),
+    path("cart/api/district/", cart_api_district, name="cart_api_district"),
+    path("cart/api/summary.json", cart_api_summary, name="cart_api_summary"),
     # checkout
     path("checkout/", checkout_start, name="checkout"),
     path(
@@ -66,4 +105,11 @@ urlpatterns = [
         CategoryProductView.as_view(),
         name="category_products",
     ),
+    # search
+    path("search/", SearchView.as_view(), name="search"),
+    path(
+        "search/autocomplete/",
+        search_autocomplete,
+        name="search_autocomplete",
+    ),
 ]
@@ -0,0 +1,46 @@
+# frontend/utils.py
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+from core.context_processors import common_data_state
+from core.utils.conditional import (
+    build_validators,
+    not_modified,
+    set_validators,
+)
+
+
+def render_conditionally(request, states, render_page, *extra):
+    """
+    render_page() with ETag/Last-Modified, or a 304 without rendering
+    when the client's copy is still current.
+    states: (count, latest updated_at) of what the page shows, extra:
+    anything else it depends on. The header state is added from
+    common_data_state: pages of anonymous visitors with a hydrated
+    cart widget are public, others private to the visitor.
+    """
+    shell = common_data_state(request)
+    shared = False
+    if shell is None:
+        response = render_page()
+    else:
+        shell_states, shell_extra, shared = shell
+        etag, last_modified = build_validators(
+            [*states, *shell_states],
+            *shell_extra,
+            *extra,
+            request.get_full_path(),
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = set_validators(render_page(), etag, last_modified)
+    if shared:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=0,
+            s_maxage=settings.SHARED_PAGE_MAX_AGE,
+        )
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
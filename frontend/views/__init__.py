@@ -1,10 +1,17 @@
 from frontend.views.home_page import HomePageView, ProductDetailPageView
 
 from .auth import login_view, logout_view, signup_view
-from .cart import add_to_cart, buy_now, cart_detail, cart_shipping_ajax
+from .cart import (
+    add_to_cart,
+    buy_now,
+    cart_detail,
+    cart_shipping_ajax,
+    cart_widget,
+)
 from .category import CategoryProductView
 from .checkout import checkout_start, order_detail, order_success
 from .dashboard import customer_dashboard
+from .search import SearchView, search_autocomplete
 
 __all__ = [
     "HomePageView",
@@ -13,6 +20,7 @@ __all__ = [
     "buy_now",
     "cart_detail",
     "cart_shipping_ajax",
+    "cart_widget",
     "checkout_start",
     "order_success",
     "order_detail",
@@ -21,4 +29,6 @@ __all__ = [
     "logout_view",
     "customer_dashboard",
     "CategoryProductView",
+    "SearchView",
+    "search_autocomplete",
 ]
@@ -2,11 +2,17 @@ import logging
 
 from django.contrib import messages
 from django.http import JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
 
 from cart.models import Cart, CartItem
-from cart.utils import get_or_create_cart
+from cart.services import add_item
+from cart.utils import get_cart_summary, get_lazy_cart
 from catalog.models import Product
+from catalog.recently_viewed import recently_viewed_cards
+from core.utils.reference_data import reference_table
 from frontend.functions import (
     decrement_item,
     increment_item,
@@ -14,6 +20,7 @@ from frontend.functions import (
     update_location,
 )
 from locations.models import District
+from shipping.engine import FREE, get_shipping_engine
 
 logger = logging.getLogger(__name__)
 
@@ -28,18 +35,10 @@ ACTION_HANDLERS = {
 def add_to_cart(request, slug):
     """add to cart"""
     product = get_object_or_404(Product, slug=slug)
-    cart = get_or_create_cart(request)
+    cart = get_lazy_cart(request).get_or_create()
 
-    item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        product=product,
-        variant=None,  # Todo: later you can handle variants
-        defaults={"quantity": 1},
-    )
-
-    if not created:
-        item.quantity += 1
-        item.save()
+    # Todo: later you can handle variants
+    add_item(cart, product)
 
     return redirect("cart_detail")
 
@@ -47,30 +46,19 @@ def add_to_cart(request, slug):
 def buy_now(request, slug):
     """add to cart and redirect to checkout"""
     product = get_object_or_404(Product, slug=slug)
-    cart = get_or_create_cart(request)
-
-    item, created = CartItem.objects.get_or_create(
-        cart=cart,
-        product=product,
-        variant=None,
-        defaults={"quantity": 1},
-    )
+    cart = get_lazy_cart(request).get_or_create()
 
-    if not created:
-        item.quantity += 1
-        item.save()
+    add_item(cart, product)
 
     return redirect("checkout")  # 🔥 DIRECT CHECKOUT
 
 
 def cart_detail(request):
     """Cart details with update functionality"""
-    districts = District.objects.filter(is_active=True).select_related(
-        "shipping_zone"
-    )
-    cart = get_or_create_cart(request)
+    lazy_cart = get_lazy_cart(request)
 
     if request.method == "POST":
+        cart = lazy_cart.cart  # items to change are in an existing cart
         action = request.POST.get("submit")
         cart_item_id = request.POST.get("cart_item_id")
 
@@ -91,19 +79,26 @@ def cart_detail(request):
 
         return redirect("cart_detail")
 
-    cart_items = cart.items.all()
-    cart_total = sum(item.total_price for item in cart_items)
-    item_count = sum(item.quantity for item in cart_items)
-
+    # an empty cart page for a visitor without a cart, nothing created
+    summary = lazy_cart.summary
+    in_cart = [item.product_id for item in summary.items] if summary else []
+    # the charge of every district, for the picker
+    districts = (
+        summary.district_quotes()
+        if summary
+        else [(district, FREE) for district in get_shipping_engine().districts]
+    )
     return render(
         request,
         "frontend/pages/cart_detail.html",
         {
-            "cart": cart,
+            "cart": lazy_cart.cart,
+            "cart_summary": summary,
             "districts": districts,
-            "cart_items": cart_items,
-            "cart_total": cart_total,
-            "item_count": item_count,
+            # recently viewed products not in the cart yet
+            "continue_shopping": recently_viewed_cards(
+                request, exclude=in_cart
+            ),
         },
     )
 
@@ -121,15 +116,16 @@ def cart_shipping_ajax(request):
 
     if district_id and cart_id:
         cart = Cart.objects.filter(pk=int(cart_id)).first()
-        district = District.objects.filter(pk=district_id).first()
+        district = reference_table(District).get(district_id)
         if cart and district:
             cart.district = district
             cart.save()
+            summary = get_cart_summary(request, cart)
             return JsonResponse(
                 {
                     "success": True,
-                    "shipping_charge": cart.get_shipping_charge,
-                    "grand_total": cart.grand_total,
+                    "shipping_charge": summary.shipping_charge,
+                    "grand_total": summary.grand_total,
                     "message": "আপনার ঠিকানা অনুযায়ী শিপিং চার্জ আপডেট হয়েছে।",
                 },
                 status=200,
@@ -137,3 +133,25 @@ def cart_shipping_ajax(request):
     return JsonResponse(
         {"success": False, "message": "Cart not found"}, status=404
     )
+
+
+def cart_widget(request):
+    """
+    Header cart widget of shared pages, loaded after page load.
+    Reads only: no cart or session is created for a visitor who never
+    adds to cart. Also hands out the CSRF token those pages leave out.
+    """
+    lazy_cart = get_lazy_cart(request)
+    cart, summary = lazy_cart.cart, lazy_cart.summary
+    response = JsonResponse(
+        {
+            "total_items": summary.total_items if summary else 0,
+            "html": render_to_string(
+                "frontend/includes/cart_widget.html",
+                {"cart": cart, "cart_summary": summary},
+            ),
+            "csrf_token": get_token(request),
+        }
+    )
+    patch_cache_control(response, private=True, no_store=True)
+    return response
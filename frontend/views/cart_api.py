@@ -0,0 +1,164 @@
+# frontend/views/cart_api.py
+"""
+JSON cart API of the storefront, one round trip per cart change. Every
+change answers with the changed line and the new totals only, the page
+patches itself instead of reloading the cart and the district list.
+
+    POST cart/api/add/<slug>/           variant, quantity (default 1)
+    POST cart/api/items/<id>/           quantity, or delta (+1 / -1)
+    POST cart/api/items/<id>/remove/
+    POST cart/api/district/             district
+    GET  cart/api/summary.json
+
+Session based and CSRF protected like the cart page forms.
+"""
+import logging
+
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
+
+from cart import services
+from cart.utils import get_cart_summary, get_lazy_cart
+from catalog.models import Product, ProductVariant
+from core.utils.reference_data import reference_table
+from locations.models import District
+
+logger = logging.getLogger(__name__)
+
+MAX_QUANTITY = 100  # of one line
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def line_data(item):
+    return {
+        "id": item.pk,
+        "product": item.product_id,
+        "variant": item.variant_id,
+        "name": item.product.name,
+        "quantity": item.quantity,
+        "unit_price": item.unit_price,
+        "total_price": item.total_price,
+    }
+
+
+def totals_data(summary):
+    if summary is None:
+        return {
+            "total_items": 0,
+            "subtotal": 0,
+            "shipping_charge": 0,
+            "grand_total": 0,
+            "district": None,
+            "zone_charges": {},
+        }
+    return {
+        "total_items": summary.total_items,
+        "subtotal": summary.subtotal,
+        "shipping_charge": summary.shipping_charge,
+        "grand_total": summary.grand_total,
+        "district": summary.cart.district_id,
+        # for the charges of the district picker
+        "zone_charges": summary.zone_charges(),
+    }
+
+
+def cart_response(request, cart, match=None, status=200, **data):
+    """
+    The new totals, and the changed line: the summary's item match()
+    returns True for, so the line costs no query of its own
+    """
+    summary = get_cart_summary(request, cart) if cart else None
+    if match is not None and summary is not None:
+        line = next((item for item in summary.items if match(item)), None)
+        data["line"] = line_data(line) if line else None
+    response = JsonResponse(
+        {"success": True, **data, "totals": totals_data(summary)},
+        status=status,
+    )
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+def error_response(message, status=400):
+    return JsonResponse({"success": False, "message": message}, status=status)
+
+
+@require_POST
+def cart_api_add(request, slug):
+    product = Product.objects.filter(slug=slug, is_active=True).first()
+    if product is None:
+        return error_response("Product not found", status=404)
+    variant = None
+    variant_id = request.POST.get("variant")
+    if variant_id:
+        variant = ProductVariant.objects.filter(
+            pk=_int(variant_id), product=product, is_active=True
+        ).first()
+        if variant is None:
+            return error_response("Variant not found", status=404)
+    quantity = _int(request.POST.get("quantity", 1))
+    if quantity is None or not 0 < quantity <= MAX_QUANTITY:
+        return error_response("Invalid quantity")
+
+    cart = get_lazy_cart(request).get_or_create()
+    created = services.add_item(cart, product, variant, quantity)
+    variant_pk = variant.pk if variant else None
+    return cart_response(
+        request,
+        cart,
+        match=lambda item: (
+            item.product_id == product.pk and item.variant_id == variant_pk
+        ),
+        status=201 if created else 200,
+    )
+
+
+@require_POST
+def cart_api_update(request, item_id):
+    cart = get_lazy_cart(request).cart
+    quantity = _int(request.POST.get("quantity"))
+    delta = _int(request.POST.get("delta"))
+    if quantity is not None:
+        if not 0 < quantity <= MAX_QUANTITY:
+            return error_response("Invalid quantity")
+        changed = cart and services.set_quantity(cart, item_id, quantity)
+    elif delta in (1, -1):
+        changed = cart and services.change_quantity(cart, item_id, delta)
+    else:
+        return error_response("Invalid quantity")
+    if not changed:
+        return error_response("Cart item not found", status=404)
+    return cart_response(request, cart, match=lambda item: item.pk == item_id)
+
+
+@require_POST
+def cart_api_remove(request, item_id):
+    cart = get_lazy_cart(request).cart
+    if not cart or not services.remove_item(cart, item_id):
+        return error_response("Cart item not found", status=404)
+    return cart_response(request, cart, removed=item_id)
+
+
+@require_POST
+def cart_api_district(request):
+    cart = get_lazy_cart(request).cart
+    if cart is None:
+        return error_response("Cart not found", status=404)
+    district = reference_table(District).get(request.POST.get("district"))
+    if district is None or not district.is_active:
+        return error_response("District not found", status=404)
+    services.set_district(cart, district)
+    return cart_response(request, cart)
+
+
+@require_GET
+def cart_api_summary(request):
+    """Totals of the visitor's cart, nothing created without one"""
+    return cart_response(request, get_lazy_cart(request).cart)
@@ -4,40 +4,80 @@ from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404, render
 from django.views.generic import View
 
-from catalog.models import (
-    Category,
-    Product,
-    ProductFeature,
-    ProductImage,
-)
+from catalog.facets import facet_state, get_facet_index, selection_condition
+from catalog.images import prefetch_derivatives
+from catalog.models import Category, ProductFeature
+from catalog.search import filter_products
+from core.utils.pagination import keyset_paginate
+from frontend.utils import render_conditionally
 
 logger = logging.getLogger(__name__)
 
 
 class CategoryProductView(View):
     template_name = "frontend/pages/category_product.html"
+    paginate_by = 24
 
     def get(self, request, slug):
-        """Home page get"""
-        search = request.GET.get("q", None)
+        """Category page, products of the whole subtree"""
         category = get_object_or_404(Category, slug=slug)
-        object_list = (
-            Product.objects.filter(is_active=True, category__slug=slug)
-            .select_related("category", "brand")
-            .prefetch_related(
-                Prefetch(
-                    "images",
-                    queryset=ProductImage.objects.filter(is_primary=True),
-                    to_attr="primary_images",
-                ),
-                Prefetch(
-                    "features",
-                    queryset=ProductFeature.objects.all().order_by("order"),
-                ),
+        products = category.get_subtree_products().filter(is_active=True)
+
+        # every card is a subtree product and its summary, so a page of
+        # any filter or cursor is unchanged while the index is: the
+        # signals patch it on every change of a product or its card
+        states = [
+            (category.pk, category.updated_at),
+            facet_state(category),
+        ]
+        return render_conditionally(
+            request,
+            states,
+            lambda: self.render_page(request, category, products),
+        )
+
+    def render_page(self, request, category, products):
+        # facet counts come from the bitsets, matches from SQL
+        facet_index = get_facet_index(category)
+        selected = facet_index.parse_selection(request.GET)
+        search = request.GET.get("q", None)
+        within = None
+        if search:
+            # count the search results only, the listing shows those
+            within = facet_index.mask(
+                filter_products(products, search).values_list("pk", flat=True)
             )
+        facets = facet_index.counts(selected, within)
+        object_list = products.select_related(
+            "category", "brand", "summary"
+        ).prefetch_related(
+            Prefetch(
+                "features",
+                queryset=ProductFeature.objects.all().order_by("order"),
+            ),
         )
         if search:
-            object_list = object_list.filter(name__icontains=search)
+            object_list = filter_products(object_list, search)
+        if selected:
+            object_list = object_list.filter(selection_condition(selected))
+
+        page = keyset_paginate(
+            object_list,
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+            per_page=self.paginate_by,
+        )
+        prefetch_derivatives(
+            product.summary.primary_image
+            for product in page.object_list
+            if hasattr(product, "summary")
+        )
 
-        context = {"object_list": object_list, "category": category}
+        context = {
+            "object_list": page.object_list,
+            "page": page,
+            "category": category,
+            "facets": facets,
+            "has_facet_filters": bool(selected),
+        }
         return render(request, self.template_name, context)
@@ -3,7 +3,8 @@ import logging
 from django.contrib import messages
 from django.shortcuts import redirect, render
 
-from cart.utils import get_or_create_cart
+from cart.utils import get_cart_summary, get_lazy_cart
+from core.utils.reference_data import reference_table
 from locations.models import District
 from orders.models import Order
 from orders.services import create_order_from_cart
@@ -14,11 +15,12 @@ logger = logging.getLogger(__name__)
 
 def checkout_start(request):
     """checkout processing"""
-    districts = District.objects.filter(is_active=True)
-    cart = get_or_create_cart(request)
-    district = cart.district
+    cart = get_lazy_cart(request).cart
     if not cart or not cart.items.exists():
         return redirect("cart_detail")
+    # the charge of every district, for the picker
+    districts = get_cart_summary(request, cart).district_quotes()
+    district = reference_table(District).get(cart.district_id)
 
     if request.method == "POST":  # checkout post make order
         payment_method = request.POST.get("payment_method") or "cod"
@@ -68,6 +70,7 @@ def checkout_start(request):
         "districts": districts,
         "district": district,
         "cart": cart,
+        "cart_summary": get_cart_summary(request, cart),
     }
     return render(request, "frontend/pages/checkout.html", context)
 
@@ -1,15 +1,37 @@
 import logging
 
-from django.db.models import Prefetch
+from django.db.models import OuterRef
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import View
 
-from catalog.models import (  # ProductSpecification,; ProductVariant,
+from catalog.counters import record_product_view
+from catalog.home_sections import load_home_sections
+from catalog.images import prefetch_derivatives
+from catalog.models import (
     Category,
+    FrequentlyBoughtTogether,
+    ImageDerivativeSet,
     Product,
     ProductFeature,
     ProductImage,
+    ProductSpecification,
+    ProductSummary,
+    ProductVariant,
+    VariantAttribute,
 )
+from catalog.recently_viewed import recently_viewed_cards, remember_product
+from catalog.recommendations import bought_together
+from catalog.variants import get_variant_matrix
+from core.utils.conditional import (
+    annotated_states,
+    rows_state_annotations,
+    state_annotations,
+)
+from frontend.utils import render_conditionally
 
 logger = logging.getLogger(__name__)
 
@@ -20,62 +42,27 @@ class HomePageView(View):
     def get(self, request):
         """Home page get"""
         search = request.GET.get("q", None)
-        base_product_queryset = (
-            Product.objects.filter(is_active=True)
-            .select_related("category", "brand")
-            .prefetch_related(
-                Prefetch(
-                    "images",
-                    queryset=ProductImage.objects.filter(is_primary=True),
-                    to_attr="primary_images",
-                ),
-                Prefetch(
-                    "features",
-                    queryset=ProductFeature.objects.all().order_by("order"),
-                ),
-            )
-        )
+        # lazy: one query on first use, none when every section
+        # comes from the fragment cache
+        sections = SimpleLazyObject(lambda: load_home_sections(search))
 
-        slider_products = base_product_queryset.filter(is_slider=True)
-        most_popular_product = base_product_queryset.filter(
-            is_most_popular=True
-        ).first()  # only one item for home page slider right section
-        categories = Category.objects.filter(is_active=True, is_featured=True)
-
-        featured_products = base_product_queryset.filter(is_featured=True)
-        new_products = base_product_queryset.filter(is_new=True)
-        bestseller_products = base_product_queryset.filter(is_bestseller=True)
-        top_rated_products = base_product_queryset.filter(is_top_rated=True)
-        if search:
-            featured_products = featured_products.filter(
-                name__icontains=search
-            )
-            new_products = new_products.filter(name__icontains=search)
-            bestseller_products = bestseller_products.filter(
-                name__icontains=search
-            )
-            top_rated_products = top_rated_products.filter(
-                name__icontains=search
-            )
-
-        exclude_product_ids = (  # remove when show category
-            slider_products.values_list("id", flat=True).union(
-                featured_products.values_list("id", flat=True),
-                new_products.values_list("id", flat=True),
-                bestseller_products.values_list("id", flat=True),
-                top_rated_products.values_list("id", flat=True),
-            )
-        )
-        logger.info(f"{'*' * 10} exclude_product_ids:{exclude_product_ids}\n")
+        def section(name):
+            return SimpleLazyObject(lambda: sections[name])
 
         context = {
-            "slider_products": slider_products,
-            "most_popular_product": most_popular_product,
-            "categories": categories,
-            "featured_products": featured_products,
-            "new_products": new_products,
-            "bestseller_products": bestseller_products,
-            "top_rated_products": top_rated_products,
+            "slider_products": section("slider"),
+            # only one item for home page slider right section
+            "most_popular_product": SimpleLazyObject(
+                lambda: next(iter(sections["most_popular"]), None)
+            ),
+            "categories": Category.objects.filter(
+                is_active=True, is_featured=True
+            ),
+            "featured_products": section("featured"),
+            "new_products": section("new"),
+            "bestseller_products": section("bestseller"),
+            "top_rated_products": section("top_rated"),
+            "search": search,
         }
         return render(request, self.template_name, context)
 
@@ -83,28 +70,124 @@ class HomePageView(View):
 class ProductDetailPageView(View):
     template_name = "frontend/pages/product/detail.html"
 
+    # related rows the page shows, their states come with the product
+    related_states = {
+        "images": (ProductImage.objects, "product"),
+        "variants": (ProductVariant.objects, "product"),
+        "options": (VariantAttribute.objects, "variant__product"),
+        "features": (ProductFeature.objects, "product"),
+        "specifications": (ProductSpecification.objects, "product"),
+        # frequently bought together, and the cards of those products
+        "bought_together": (FrequentlyBoughtTogether.objects, "product"),
+        "bought_together_cards": (
+            Product.objects,
+            "bought_with__product",
+        ),
+        "bought_together_summaries": (
+            ProductSummary.objects,
+            "product__bought_with__product",
+        ),
+    }
+
+    @staticmethod
+    def derivative_states():
+        """
+        State of the image derivatives of the bought together cards, a
+        page rendered before they existed shows no srcset
+        """
+        images = ProductSummary.objects.filter(
+            product__bought_with__product=OuterRef(OuterRef("pk"))
+        ).values("primary_image")
+        return rows_state_annotations(
+            "derivatives", ImageDerivativeSet.objects.filter(source__in=images)
+        )
+
     def get(self, request, slug):
         """Product Detail page"""
-        product = get_object_or_404(Product, slug=slug)
-        variants = product.variants.all()
-        variant_colors = []
-        for variant in variants:
-            colors = list(
-                variant.variant_attributes.filter(
-                    color__isnull=False
-                ).values_list("color__code", flat=True)
+        names = [*self.related_states, "derivatives"]
+        row = get_object_or_404(
+            Product.objects.filter(slug=slug)
+            .annotate(
+                **state_annotations(**self.related_states),
+                **self.derivative_states(),
+            )
+            .values(
+                "pk",
+                "updated_at",
+                "category__updated_at",
+                "brand__updated_at",
+                *[
+                    f"{name}_{part}"
+                    for name in names
+                    for part in ("count", "latest")
+                ],
             )
-            for color in colors:
-                variant_colors.append(color)
+        )
+        # counted for a 304 too, the visitor is viewing the page
+        record_product_view(row["pk"])
+        states = [
+            (row["pk"], row["updated_at"]),
+            ("category", row["category__updated_at"]),
+            ("brand", row["brand__updated_at"]),
+            *annotated_states(row, *names),
+        ]
+        return render_conditionally(
+            request, states, lambda: self.render_page(request, row["pk"])
+        )
 
-        logger.info(f"{'*' * 10} variant_colors: {variant_colors}\n")
+    def render_page(self, request, product_id):
+        product = get_object_or_404(Product, pk=product_id)
         features = product.features.all()
         specifications = product.specifications.all()
+        related_products = bought_together(product.pk)
+        prefetch_derivatives(
+            related.summary.primary_image for related in related_products
+        )
         context = {
             "product": product,
-            "variants": variants,
-            "variant_colors": variant_colors,
+            "variant_matrix": get_variant_matrix(product.pk),
             "features": features,
             "specifications": specifications,
+            "bought_together": related_products,
         }
         return render(request, self.template_name, context)
+
+
+def product_variants(request, slug):
+    """Variant matrix as JSON, the detail page embeds the same data"""
+    product_id = get_object_or_404(
+        Product.objects.values_list("pk", flat=True),
+        slug=slug,
+        is_active=True,
+    )
+    return JsonResponse(get_variant_matrix(product_id))
+
+
+def recently_viewed_widget(request):
+    """
+    Recently viewed rail, loaded after page load so shared pages stay
+    the same for everyone. ?product=<pk>: the detail page being viewed,
+    remembered here rather than in the page view so views a shared cache
+    answers are remembered too, and left out of the rail.
+    """
+    try:
+        product_id = int(request.GET.get("product", ""))
+    except ValueError:
+        product_id = None
+    response = JsonResponse(
+        {
+            "html": render_to_string(
+                "frontend/includes/product_rail.html",
+                {
+                    "title": "Recently Viewed",
+                    "products": recently_viewed_cards(
+                        request, exclude=[product_id]
+                    ),
+                },
+            )
+        }
+    )
+    if product_id is not None:
+        remember_product(request, response, product_id)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
@@ -0,0 +1,79 @@
+import logging
+from urllib.parse import quote
+
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.views.generic import View
+
+from catalog.autocomplete import suggest
+from catalog.images import prefetch_derivatives
+from catalog.models import Category, Product
+from catalog.search import search_products
+
+logger = logging.getLogger(__name__)
+
+
+class SearchView(View):
+    template_name = "frontend/pages/search_results.html"
+    paginate_by = 24
+
+    def get(self, request):
+        """Ranked product search, optionally inside a category subtree"""
+        search = request.GET.get("q", "")
+        category = None
+        object_list = Product.objects.filter(is_active=True)
+
+        category_slug = request.GET.get("category")
+        if category_slug:
+            category = get_object_or_404(Category, slug=category_slug)
+            object_list = category.get_subtree_products().filter(
+                is_active=True
+            )
+
+        object_list = search_products(object_list, search).select_related(
+            "category", "brand", "summary"
+        )
+        paginator = Paginator(object_list, self.paginate_by)
+        page_obj = paginator.get_page(request.GET.get("page"))
+        prefetch_derivatives(
+            product.summary.primary_image
+            for product in page_obj.object_list
+            if hasattr(product, "summary")
+        )
+
+        context = {
+            "object_list": page_obj.object_list,
+            "page_obj": page_obj,
+            "is_paginated": page_obj.has_other_pages(),
+            "search": search,
+            "category": category,
+        }
+        return render(request, self.template_name, context)
+
+
+SUGGESTION_URL_NAMES = {
+    "product": "product_detail",
+    "category": "category_products",
+}
+
+
+def search_autocomplete(request):
+    """Header search suggestions from the in-process prefix index"""
+    term = request.GET.get("q", "")
+    results = []
+    for kind, label, slug in suggest(term, limit=8):
+        url_name = SUGGESTION_URL_NAMES.get(kind)
+        results.append(
+            {
+                "type": kind,
+                "label": label,
+                "url": (
+                    reverse(url_name, args=[slug])
+                    if url_name
+                    else f"{reverse('search')}?q={quote(label)}"
+                ),
+            }
+        )
+    return JsonResponse({"results": results})
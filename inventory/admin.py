@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from core.utils.exports import ExportActionsMixin
+
 from .models import (
     InventoryStock,
     PurchaseOrder,
@@ -68,7 +70,7 @@ class InventoryStockAdmin(admin.ModelAdmin):
 
 
 @admin.register(StockMovement)
-class StockMovementAdmin(admin.ModelAdmin):
+class StockMovementAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = (
         "created_at",
         "movement_type",
@@ -92,6 +94,27 @@ class StockMovementAdmin(admin.ModelAdmin):
 
     readonly_fields = [field.name for field in StockMovement._meta.fields]
 
+    actions = ["export_csv", "export_xlsx"]
+    export_columns = (
+        ("created_at", "created_at"),
+        ("movement_type", "movement_type"),
+        ("warehouse", "warehouse__code"),
+        ("product_sku", "product__sku"),
+        ("product_name", "product__name"),
+        ("variant_sku", "variant__sku"),
+        ("quantity", "quantity"),
+        ("quantity_before", "quantity_before"),
+        ("quantity_after", "quantity_after"),
+        ("unit_cost", "unit_cost"),
+        ("total_cost", "total_cost"),
+        ("order_number", "order__order_number"),
+        ("reference_number", "reference_number"),
+        ("transfer_to", "transfer_to_warehouse__code"),
+        ("created_by", "created_by__email"),
+        ("notes", "notes"),
+    )
+    export_filename = "stock-movements"
+
     def has_add_permission(self, request):
         return False
 
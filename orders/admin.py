@@ -4,6 +4,8 @@ from django.contrib import admin, messages
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 
+from core.utils.exports import ExportActionsMixin
+
 from .models import Order, OrderItem, OrderStatusHistory
 
 logger = logging.getLogger(__name__)
@@ -47,7 +49,7 @@ class OrderStatusHistoryInline(admin.TabularInline):
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ExportActionsMixin, admin.ModelAdmin):
     list_display = (
         "order_number",
         "customer",
@@ -161,7 +163,38 @@ class OrderAdmin(admin.ModelAdmin):
         "mark_as_shipped",
         "mark_as_delivered",
         "bulk_print_invoice",
+        "export_csv",
+        "export_xlsx",
     ]
+    # one row per line item, with its order's columns repeated
+    export_columns = (
+        ("order_number", "order__order_number"),
+        ("created_at", "order__created_at"),
+        ("order_status", "order__order_status"),
+        ("payment_status", "order__payment_status"),
+        ("payment_method", "order__payment_method"),
+        ("customer_email", "order__customer__email"),
+        ("customer_phone", "order__customer__phone"),
+        ("full_name", "order__shipping_address__full_name"),
+        ("phone", "order__shipping_address__phone"),
+        ("address", "order__shipping_address__address_line1"),
+        ("district", "order__shipping_address__district__name"),
+        ("subtotal", "order__subtotal"),
+        ("shipping_cost", "order__shipping_cost"),
+        ("discount_amount", "order__discount_amount"),
+        ("total_amount", "order__total_amount"),
+        ("sku", "sku"),
+        ("product_name", "product_name"),
+        ("variant_details", "variant_details"),
+        ("quantity", "quantity"),
+        ("unit_price", "unit_price"),
+        ("total_price", "total_price"),
+    )
+    export_ordering = ("order_id", "pk")
+    export_filename = "orders"
+
+    def get_export_queryset(self, queryset):
+        return OrderItem.objects.filter(order__in=queryset.values("pk"))
 
     def full_name(self, obj):
         try:
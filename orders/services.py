@@ -1,7 +1,12 @@
+from collections import Counter
 from decimal import Decimal
 
 from django.db import transaction
 
+from cart.models import Cart, CartItem
+from cart.summary import CartSummary
+from catalog.counters import record_product_sales
+
 from .models import Order, OrderItem
 
 
@@ -15,16 +20,22 @@ def create_order_from_cart(
     customer_notes=None,
 ):
     """
-    Convert Cart → Order safely
+    Convert Cart → Order safely: the cart and its lines are locked and
+    read inside the order's transaction, the order holds exactly the
+    lines it deletes. A line added meanwhile stays in the cart.
     """
 
     with transaction.atomic():
-
-        shipping_cost = cart.get_shipping_charge
-        cod_charge = cart.get_cod_charge(payment_method)
+        cart = Cart.objects.select_for_update().get(pk=cart.pk)
+        # a quantity change of a line waits for the order
+        locked = CartItem.objects.select_for_update().filter(cart=cart)
+        list(locked.values_list("pk", flat=True))
+        summary = CartSummary(cart)
+        shipping_cost = summary.shipping_charge
+        cod_charge = summary.cod_charge(payment_method)
         # cod charge for merchant
 
-        subtotal = cart.subtotal
+        subtotal = summary.subtotal
         total_amount = (subtotal + shipping_cost).quantize(Decimal("0.01"))
         order = Order.objects.create(
             customer=cart.customer,
@@ -43,7 +54,9 @@ def create_order_from_cart(
         )
 
         # Copy cart items → order items
-        for item in cart.items.select_related("product", "variant"):
+        quantities = Counter()
+        for item in summary.items:
+            quantities[item.product_id] += item.quantity
             OrderItem.objects.create(
                 order=order,
                 product=item.product,
@@ -55,7 +68,12 @@ def create_order_from_cart(
                 unit_price=item.unit_price,
             )
 
-        # Clear cart
-        cart.items.all().delete()
+        # Clear the ordered lines of the cart
+        CartItem.objects.filter(
+            pk__in=[item.pk for item in summary.items]
+        ).delete()
+
+        # buffered, only counted once the order is committed
+        transaction.on_commit(lambda: record_product_sales(quantities))
 
         return order
@@ -1,3 +1,61 @@
-from django.test import TestCase  # noqa
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase
+
+from cart.models import Cart, CartItem
+from cart.summary import CartSummary
+from catalog.models import Category, Product
+from core.utils.reference_data import clear_reference_data
+from orders.services import create_order_from_cart
+
+
+class OrderFromCartTest(TestCase):
+    """Test cases for orders made from a cart"""
+
+    def setUp(self):
+        self.addCleanup(clear_reference_data)
+        category = Category.objects.create(name="Phones")
+        self.cart = Cart.objects.create()  # no district, ships free
+        self.products = {
+            name: Product.objects.create(
+                name=name,
+                sku=name,
+                category=category,
+                base_price=Decimal("100.00"),
+            )
+            for name in ("Phone", "Case", "Charger")
+        }
+        for name, quantity in (("Phone", 2), ("Case", 1)):
+            CartItem.objects.create(
+                cart=self.cart, product=self.products[name], quantity=quantity
+            )
+
+    def test_order_from_cart(self):
+        summary = self.cart.summary
+        with self.assertNumQueries(0):  # loaded with the items
+            self.assertTrue(summary.items[0].product.name)
+        order = create_order_from_cart(cart=self.cart)
+        self.assertEqual(order.subtotal, Decimal("300.00"))
+        self.assertEqual(order.shipping_cost, Decimal("0.00"))
+        self.assertEqual(order.total_amount, Decimal("300.00"))
+        self.assertEqual(order.items.count(), 2)
+        self.assertFalse(self.cart.items.exists())
+
+    def test_line_added_meanwhile_stays(self):
+        def summary_then_add(cart):
+            summary = CartSummary(cart)
+            # added by another request once the order has read the cart
+            CartItem.objects.create(
+                cart=cart, product=self.products["Charger"], quantity=1
+            )
+            return summary
+
+        with mock.patch("orders.services.CartSummary", summary_then_add):
+            order = create_order_from_cart(cart=self.cart)
+        self.assertEqual(order.subtotal, Decimal("300.00"))
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(
+            list(self.cart.items.values_list("product__name", flat=True)),
+            ["Charger"],
+        )
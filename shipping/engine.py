@@ -0,0 +1,182 @@
+# shipping/engine.py
+"""
+Shipping charges from rates compiled into plain numbers. The rates of
+each zone and method are read once from the reference data, a quote is
+then a few Decimal operations, no query and no model access.
+
+Rules of one zone and method, in this order:
+- free_shipping_over: orders of at least that value ship free
+- weight slabs, tiered: every slab the weight reaches adds its flat fee
+  and rate_per_kg for each started KG of weight inside it
+  (0-1 KG at 70৳ + 1 KG and up at 20৳ = 70৳ first KG, 20৳ per extra KG)
+- price bands: the flat rate of the band the order value is in
+- flat rate
+COD and VAT come from ShippingSetting. VAT is added on the shipping
+charge, COD is paid by the merchant so it is not part of the charge.
+"""
+import math
+from decimal import Decimal
+
+from core.utils.reference_data import get_reference_data
+from locations.models import District
+from shipping.models import ShippingRate, ShippingSetting
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+HUNDRED = Decimal("100")
+
+
+class CompiledRates:
+    """The rates of one zone and method"""
+
+    __slots__ = ("slabs", "bands", "flat", "free_over")
+
+    def __init__(self, rates):
+        slabs, bands, flats, free_over = [], [], [], []
+        for rate in rates:
+            if rate.free_shipping_over:
+                free_over.append(rate.free_shipping_over)
+            if rate.calculation_type == "weight":
+                slabs.append(
+                    (
+                        rate.min_weight or ZERO,
+                        rate.max_weight,
+                        rate.flat_rate or ZERO,
+                        rate.rate_per_kg or ZERO,
+                    )
+                )
+            elif rate.calculation_type == "price":
+                bands.append(
+                    (
+                        rate.min_order_value,
+                        rate.max_order_value,
+                        rate.flat_rate,
+                    )
+                )
+            else:
+                flats.append(rate.flat_rate)
+        self.slabs = tuple(sorted(slabs, key=lambda slab: slab[0]))
+        self.bands = tuple(bands)
+        self.flat = flats[0] if flats else None
+        self.free_over = min(free_over) if free_over else None
+
+    def charge(self, weight, value):
+        """Shipping charge before VAT of weight KG worth value"""
+        if self.free_over is not None and value >= self.free_over:
+            return ZERO
+        if self.slabs:
+            if weight <= 0:
+                return ZERO
+            total = ZERO
+            for low, high, fee, per_kg in self.slabs:
+                if weight <= low and low > 0:
+                    break
+                top = weight if high is None else min(weight, high)
+                total += fee + math.ceil(top - low) * per_kg
+            return total
+        for low, high, fee in self.bands:
+            if (low is None or value >= low) and (
+                high is None or value <= high
+            ):
+                return fee
+        return ZERO if self.flat is None else self.flat
+
+
+class ShippingQuote:
+    """shipping: what the customer pays for delivery, vat included"""
+
+    __slots__ = ("shipping", "vat")
+
+    def __init__(self, shipping, vat):
+        self.shipping = shipping
+        self.vat = vat
+
+    def __repr__(self):
+        return f"<ShippingQuote {self.shipping} (vat {self.vat})>"
+
+
+FREE = ShippingQuote(ZERO, ZERO)
+
+
+class ShippingEngine:
+    """Every zone's rates compiled, built from one reference data load"""
+
+    def __init__(self, data):
+        setting = data[ShippingSetting].first() or ShippingSetting()
+        self.cod_rate = setting.cod_percentage / HUNDRED
+        self.vat_rate = setting.vat_percentage / HUNDRED
+
+        # {zone id: {method id: CompiledRates}}, the first method is the
+        # zone's default, as ShippingRate ordering lists them
+        self.zones = {}
+        for zone_id, rates in (
+            data[ShippingRate].group_by("shipping_zone_id").items()
+        ):
+            methods = {}
+            for rate in rates:
+                methods.setdefault(rate.shipping_method_id, []).append(rate)
+            self.zones[zone_id] = {
+                method_id: CompiledRates(method_rates)
+                for method_id, method_rates in methods.items()
+            }
+        self.district_zones = {
+            district.pk: district.shipping_zone_id
+            for district in data[District]
+        }
+        self.districts = data[District].active()
+
+    def zone_rates(self, zone_id, method_id=None):
+        methods = self.zones.get(zone_id)
+        if not methods:
+            return None
+        if method_id is None:
+            return next(iter(methods.values()))
+        return methods.get(method_id)
+
+    def _quote(self, rates, weight, value):
+        if rates is None:
+            return FREE
+        charge = rates.charge(weight, value)
+        vat = (charge * self.vat_rate).quantize(CENT)
+        return ShippingQuote((charge + vat).quantize(CENT), vat)
+
+    def quote(self, district_id, weight, value, method_id=None):
+        """
+        ShippingQuote of weight KG worth value to a district. Free for an
+        unknown district or one without a zone or rates.
+        """
+        zone_id = self.district_zones.get(district_id)
+        return self._quote(self.zone_rates(zone_id, method_id), weight, value)
+
+    def district_quotes(self, weight, value, method_id=None):
+        """
+        (district, ShippingQuote) of every active district, for district
+        pickers: one quote per zone, shared by its districts
+        """
+        by_zone = {}
+        quotes = []
+        for district in self.districts:
+            zone_id = district.shipping_zone_id
+            if zone_id not in by_zone:
+                by_zone[zone_id] = self._quote(
+                    self.zone_rates(zone_id, method_id), weight, value
+                )
+            quotes.append((district, by_zone[zone_id]))
+        return quotes
+
+    def cod_charge(self, value):
+        """Cash on delivery charge of value"""
+        if value <= 0:
+            return ZERO
+        return (value * self.cod_rate).quantize(CENT)
+
+
+_state = {"engine": None, "data": None}
+
+
+def get_shipping_engine():
+    """The engine of the current reference data, rebuilt with it"""
+    data = get_reference_data()
+    if _state["data"] is not data:
+        _state.update(engine=ShippingEngine(data), data=data)
+    return _state["engine"]
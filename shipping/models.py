@@ -124,33 +124,15 @@ class ShippingRate(BaseModel):
         return f"{self.shipping_method.name} - {self.shipping_zone.name}"
 
     def calculate_shipping_cost(self, weight=None, order_value=None):
-        """Calculate shipping cost based on weight and order value"""
-        # Check free shipping
-        if (
-            self.free_shipping_over
-            and order_value
-            and order_value >= self.free_shipping_over
-        ):
-            return Decimal("0.00")
-
-        if self.calculation_type == "flat":
-            return self.flat_rate
-
-        elif self.calculation_type == "weight" and weight:
-            if self.min_weight and weight < self.min_weight:
-                return None  # Out of range
-            if self.max_weight and weight > self.max_weight:
-                return None  # Out of range
-            return self.flat_rate + (weight * (self.rate_per_kg or 0))
-
-        elif self.calculation_type == "price" and order_value:
-            if self.min_order_value and order_value < self.min_order_value:
-                return None  # Out of range
-            if self.max_order_value and order_value > self.max_order_value:
-                return None  # Out of range
-            return self.flat_rate
-
-        return self.flat_rate
+        """
+        Cost of this rate alone, before VAT, by the shipping engine's
+        rules. Quotes go through shipping.engine with all of a zone's rates.
+        """
+        from shipping.engine import CompiledRates
+
+        return CompiledRates([self]).charge(
+            weight or Decimal("0"), order_value or Decimal("0")
+        )
 
 
 class ShippingSetting(BaseModel):
@@ -1,3 +1,104 @@
-from django.test import TestCase  # noqa
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase
+
+from core.utils.reference_data import clear_reference_data
+from locations.models import District, Division
+from shipping.engine import get_shipping_engine
+from shipping.models import (
+    ShippingMethod,
+    ShippingRate,
+    ShippingSetting,
+    ShippingZone,
+)
+
+
+class ShippingEngineTest(TestCase):
+    """Test cases for the compiled shipping rates"""
+
+    def setUp(self):
+        self.addCleanup(clear_reference_data)
+        self.method = ShippingMethod.objects.create(
+            name="Standard", delivery_type="standard"
+        )
+        division = Division.objects.create(name="Dhaka")
+        self.city, self.suburbs, self.outside = [
+            ShippingZone.objects.create(name=name)
+            for name in ("Dhaka City", "Dhaka Suburbs", "Outside Dhaka")
+        ]
+        # first KG 70, every extra started KG 20, free from 5000
+        self._rate(self.city, "weight", min_weight=0, max_weight=1, rate=70)
+        self._rate(self.city, "weight", min_weight=1, rate=20, free_over=5000)
+        self._rate(self.suburbs, "flat", flat_rate=100)
+        self._rate(self.outside, "price", flat_rate=150, max_order_value=999)
+        self._rate(self.outside, "price", flat_rate=80, min_order_value=1000)
+        self.districts = {
+            zone: District.objects.create(
+                division=division, shipping_zone=zone, name=zone.name
+            )
+            for zone in (self.city, self.suburbs, self.outside)
+        }
+
+    def _rate(self, zone, kind, rate=None, free_over=None, **fields):
+        ShippingRate.objects.create(
+            shipping_method=self.method,
+            shipping_zone=zone,
+            calculation_type=kind,
+            rate_per_kg=rate,
+            free_shipping_over=free_over,
+            **fields,
+        )
+
+    def _charge(self, zone, weight, value=100):
+        return (
+            get_shipping_engine()
+            .quote(self.districts[zone].pk, Decimal(weight), Decimal(value))
+            .shipping
+        )
+
+    def test_weight_slabs(self):
+        for weight, charge in (
+            ("0", "0"),
+            ("0.5", "70"),
+            ("1", "70"),
+            ("1.6", "90"),
+            ("3", "110"),
+        ):
+            self.assertEqual(self._charge(self.city, weight), Decimal(charge))
+        self.assertEqual(self._charge(self.city, "3", 5000), 0)
+
+    def test_flat_and_price_bands(self):
+        self.assertEqual(self._charge(self.suburbs, "7"), 100)
+        self.assertEqual(self._charge(self.outside, "1", 500), 150)
+        self.assertEqual(self._charge(self.outside, "1", 1200), 80)
+        # a district without a zone ships free
+        self.assertEqual(
+            get_shipping_engine().quote(None, Decimal(1), Decimal(1)).shipping,
+            0,
+        )
+
+    def test_vat_and_cod(self):
+        ShippingSetting.objects.create(
+            cod_percentage=Decimal("2.00"), vat_percentage=Decimal("5.00")
+        )
+        quote = get_shipping_engine().quote(
+            self.districts[self.city].pk, Decimal("1.6"), Decimal(100)
+        )
+        self.assertEqual(quote.vat, Decimal("4.50"))
+        self.assertEqual(quote.shipping, Decimal("94.50"))
+        self.assertEqual(
+            get_shipping_engine().cod_charge(Decimal(300)), Decimal("6.00")
+        )
+
+    def test_district_quotes(self):
+        engine = get_shipping_engine()
+        with self.assertNumQueries(0):
+            quotes = engine.district_quotes(Decimal("1.6"), Decimal(500))
+        self.assertEqual(
+            [(district.name, quote.shipping) for district, quote in quotes],
+            [
+                ("Dhaka City", 90),
+                ("Dhaka Suburbs", 100),
+                ("Outside Dhaka", 150),
+            ],
+        )
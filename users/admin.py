@@ -10,6 +10,8 @@ from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from core.utils.exports import ExportActionsMixin
+
 from .forms import UserChangeForm, UserCreationForm
 from .models import User
 
@@ -116,7 +118,7 @@ class SocialLoginFilter(admin.SimpleListFilter):
 
 # ============== CUSTOM USER ADMIN ==============
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ExportActionsMixin, UserAdmin):
     # Forms
     add_form = UserCreationForm
     form = UserChangeForm
@@ -279,7 +281,25 @@ class CustomUserAdmin(UserAdmin):
         "remove_staff",
         "send_welcome_email",
         "export_selected_users",
+        "export_xlsx",
     ]
+    # never the password or otp columns
+    export_columns = (
+        ("id", "id"),
+        ("email", "email"),
+        ("phone", "phone"),
+        ("username", "username"),
+        ("first_name", "first_name"),
+        ("last_name", "last_name"),
+        ("gender", "gender"),
+        ("date_of_birth", "date_of_birth"),
+        ("is_active", "is_active"),
+        ("is_staff", "is_staff"),
+        ("phone_verified", "phone_verified"),
+        ("date_joined", "date_joined"),
+        ("last_login", "last_login"),
+    )
+    export_filename = "users"
 
     # Custom admin views
     def get_urls(self):
@@ -508,12 +528,7 @@ class CustomUserAdmin(UserAdmin):
 
     @admin.action(description=_("Export selected users to CSV"))
     def export_selected_users(self, request, queryset):
-        # Implement CSV export logic here
-        self.message_user(
-            request,
-            f"Export functionality for {queryset.count()} users.",
-            messages.INFO,
-        )
+        return self.export(queryset, "csv")
 
     # ============ CUSTOM VIEWS ============
 